@@ -1,4 +1,6 @@
 """OpenClaw TraceBridge."""
 
-__all__ = ["__version__"]
+from .runtime_emit import configure, emit, shutdown
+
+__all__ = ["__version__", "configure", "emit", "shutdown"]
 __version__ = "0.1.0a0"
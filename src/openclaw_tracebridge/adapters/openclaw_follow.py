@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from ..schema import IdScheme
+from .openclaw_session import (
+    checkpoint_path_for,
+    discover_session_files,
+    import_openclaw_session,
+    session_run_id,
+)
+
+# (session_jsonl, out_events, run_id)
+_FollowTarget = tuple[Path, Path, str]
+
+
+@dataclass
+class FollowSummary:
+    polls: int
+    sessions: int
+    events_written: int
+
+
+def _stat_key(path: Path) -> tuple[int, int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _follow(
+    targets: Callable[[], list[_FollowTarget]],
+    *,
+    include_content: bool,
+    profile: str,
+    poll_interval: float,
+    max_polls: int | None,
+    strict: bool,
+    id_scheme: IdScheme,
+    start_sequence_id: int = 1,
+    append: bool = False,
+) -> FollowSummary:
+    # Only files whose (inode, size, mtime) moved since the last poll are touched; each import
+    # resumes from its checkpoint, so a poll costs O(new bytes) and its events are flushed
+    # before the next sleep.
+    stat_cache: dict[Path, tuple[int, int, int]] = {}
+    seen: set[Path] = set()
+    polls = 0
+    written = 0
+
+    try:
+        while max_polls is None or polls < max_polls:
+            if polls:
+                time.sleep(poll_interval)
+            polls += 1
+            for session_jsonl, out_events, run_id in targets():
+                key = _stat_key(session_jsonl)
+                if key is None or stat_cache.get(session_jsonl) == key:
+                    continue
+                written += import_openclaw_session(
+                    session_jsonl,
+                    out_events,
+                    run_id=run_id,
+                    include_content=include_content,
+                    start_sequence_id=start_sequence_id,
+                    profile=profile,
+                    checkpoint=checkpoint_path_for(out_events),
+                    strict=strict,
+                    id_scheme=id_scheme,
+                    append=append,
+                )
+                stat_cache[session_jsonl] = key
+                seen.add(session_jsonl)
+    except KeyboardInterrupt:
+        # Ctrl-C is the normal way to stop. An import cut off mid-file has its checkpoint
+        # from the last flush, and the next resume trims anything written after it.
+        pass
+
+    return FollowSummary(polls=polls, sessions=len(seen), events_written=written)
+
+
+def follow_openclaw_session(
+    session_jsonl: Path,
+    out_events: Path,
+    run_id: str,
+    *,
+    include_content: bool = False,
+    profile: str = "lean",
+    poll_interval: float = 1.0,
+    max_polls: int | None = None,
+    strict: bool = False,
+    id_scheme: IdScheme = "uuid4",
+    start_sequence_id: int = 1,
+    append: bool = False,
+) -> FollowSummary:
+    """Tail one session file OpenClaw is still writing; runs until interrupted or ``max_polls``.
+
+    ``start_sequence_id`` numbers the first event when there is no checkpoint to resume from.
+    ``append`` keeps the events already in ``out_events`` instead of rebuilding it on the first poll.
+    """
+    return _follow(
+        lambda: [(session_jsonl, out_events, run_id)],
+        include_content=include_content,
+        profile=profile,
+        poll_interval=poll_interval,
+        max_polls=max_polls,
+        strict=strict,
+        id_scheme=id_scheme,
+        start_sequence_id=start_sequence_id,
+        append=append,
+    )
+
+
+def follow_openclaw_sessions(
+    sessions: str | os.PathLike[str],
+    out_dir: Path,
+    *,
+    run_prefix: str = "run",
+    include_content: bool = False,
+    profile: str = "lean",
+    poll_interval: float = 1.0,
+    max_polls: int | None = None,
+    strict: bool = False,
+    id_scheme: IdScheme = "uuid4",
+    start_sequence_id: int = 1,
+) -> FollowSummary:
+    """Watch a sessions directory or glob, tailing existing files and picking up new ones.
+
+    Each session is written to its own file, numbered from ``start_sequence_id``.
+    """
+
+    out_root = out_dir.resolve()
+
+    def targets() -> list[_FollowTarget]:
+        out: list[_FollowTarget] = []
+        for session_jsonl in discover_session_files(sessions):
+            if out_root in session_jsonl.resolve().parents:
+                continue
+            run_id = session_run_id(session_jsonl, prefix=run_prefix)
+            out.append((session_jsonl, out_dir / f"{run_id}.jsonl", run_id))
+        return out
+
+    return _follow(
+        targets,
+        include_content=include_content,
+        profile=profile,
+        poll_interval=poll_interval,
+        max_polls=max_polls,
+        strict=strict,
+        id_scheme=id_scheme,
+        start_sequence_id=start_sequence_id,
+    )
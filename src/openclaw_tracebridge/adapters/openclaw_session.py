@@ -1,11 +1,45 @@
 from __future__ import annotations
 
+import glob
+import hashlib
 import json
+import os
+import random
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+from pydantic_core import from_json
+
+from ..checkpoint import load_state, only_appended, record_head, save_state
+from ..compression import COMPRESSED_SUFFIXES, compression_suffix, open_binary, strip_compression_suffix
 from ..io import JsonlTraceWriter
-from ..schema import EventKind, TraceEvent
+from ..schema import EventKind, IdScheme, TraceEvent, dump_event_json, event_id_factory
+
+_UUID4_CLEAR = ~((0xF << 76) | (0x3 << 62)) & ((1 << 128) - 1)
+_UUID4_SET = (0x4 << 76) | (0x2 << 62)
+
+# Imported ids come from a private generator seeded from os.urandom rather than a urandom
+# syscall per event. Being private, a host that seeds the global `random` module cannot make
+# ids repeat; forked workers reseed it.
+_id_rng = random.Random(os.urandom(32))
+
+
+def _reseed_id_rng() -> None:
+    _id_rng.seed(os.urandom(32))
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reseed_id_rng)
+
+
+def _fast_event_id() -> str:
+    # Same shape as schema.new_event_id (uuid4 version/variant bits included).
+    bits = (_id_rng.getrandbits(128) & _UUID4_CLEAR) | _UUID4_SET
+    return f"ev_{bits:032x}"
 
 
 def _as_text(value: Any) -> str:
@@ -117,6 +151,95 @@ def _infer_kind(row: dict[str, Any], role: str, text: str, tool_calls: list[str]
     return EventKind.NOTE
 
 
+CHECKPOINT_SCHEMA = "tracebridge.import.checkpoint.v0"
+_CHECKPOINT_EVERY = 200
+
+
+@dataclass
+class ImportCheckpoint:
+    session_jsonl: str
+    run_id: str
+    profile: str
+    offset: int
+    last_sequence_id: int
+    head_bytes: int
+    head_sha256: str
+    # Size of out_events when the checkpoint was taken; anything past it was flushed by an
+    # import that stopped before its next checkpoint and is cut off on resume.
+    events_bytes: int | None = None
+    # Size of out_events before this import wrote its first event. Only non-zero with
+    # ``append``; a rebuild cuts the file back to it instead of deleting it.
+    base_bytes: int = 0
+    schema: str = CHECKPOINT_SCHEMA
+
+
+def checkpoint_path_for(out_events: Path) -> Path:
+    return out_events.with_name(f"{out_events.name}.ckpt.json")
+
+
+def load_import_checkpoint(path: Path) -> ImportCheckpoint | None:
+    return load_state(path, ImportCheckpoint, CHECKPOINT_SCHEMA)
+
+
+def save_import_checkpoint(path: Path, checkpoint: ImportCheckpoint) -> None:
+    save_state(path, checkpoint)
+
+
+def _resume_point(
+    session_jsonl: Path,
+    out_events: Path,
+    checkpoint: ImportCheckpoint | None,
+    run_id: str,
+    profile: str,
+) -> ImportCheckpoint | None:
+    if checkpoint is None or not out_events.exists():
+        return None
+    if checkpoint.run_id != run_id or checkpoint.profile != profile:
+        return None
+    size = session_jsonl.stat().st_size if compression_suffix(session_jsonl) is None else None
+    if not only_appended(
+        session_jsonl, size, checkpoint.offset, checkpoint.head_bytes, checkpoint.head_sha256
+    ):
+        return None
+    if checkpoint.events_bytes is not None and out_events.stat().st_size < checkpoint.events_bytes:
+        return None
+    return checkpoint
+
+
+def _event_fields(row: dict[str, Any], *, profile: str, keep_content: bool) -> dict[str, Any]:
+    role, text, usage, tool_calls = _extract_openclaw_fields(row)
+    usage_cost = usage.get("cost") if isinstance(usage.get("cost"), dict) else {}
+    token_total = usage.get("totalTokens") if isinstance(usage.get("totalTokens"), int) else None
+    cost_usd = usage_cost.get("total") if isinstance(usage_cost.get("total"), (int, float)) else None
+    kind = _infer_kind(row, role=role, text=text, tool_calls=tool_calls)
+
+    attrs: dict[str, Any] = {
+        "role": role or None,
+        "type": row.get("type"),
+        "content_chars": len(text),
+        "profile": profile,
+    }
+    if row.get("customType"):
+        attrs["custom_type"] = row.get("customType")
+    if tool_calls:
+        attrs["tool_calls"] = tool_calls
+        attrs["tool_call_count"] = len(tool_calls)
+    if keep_content:
+        attrs["content"] = text
+        if profile == "debug":
+            attrs["raw"] = row
+
+    return {
+        "kind": kind,
+        "actor": "openclaw",
+        "attrs": attrs,
+        "token_estimate": token_total if token_total is not None else (max(1, len(text) // 4) if text else 0),
+        "prompt_chars": len(text) if role == "user" else None,
+        "response_chars": len(text) if role in {"assistant", "system", "toolresult"} else None,
+        "cost_usd_micros": int(cost_usd * 1_000_000) if cost_usd is not None else None,
+    }
+
+
 def import_openclaw_session(
     session_jsonl: Path,
     out_events: Path,
@@ -124,59 +247,234 @@ def import_openclaw_session(
     include_content: bool = False,
     start_sequence_id: int = 1,
     profile: str = "lean",
+    checkpoint: Path | None = None,
+    strict: bool = False,
+    id_scheme: IdScheme = "uuid4",
+    append: bool = False,
 ) -> int:
-    writer = JsonlTraceWriter(out_events, flush_every=200)
+    """Import one session file and return the number of events written.
+
+    Rows are serialized directly by ``dump_event_json``; ``strict`` routes every row through
+    the validating ``TraceEvent`` model instead, with identical output.
+
+    With ``checkpoint`` set, a matching sidecar lets the import seek past rows it already
+    converted and append only new ones; a missing or stale sidecar rebuilds ``out_events``.
+    Unterminated trailing lines are left for the next run in that mode. The sidecar is saved
+    with every writer flush and records the size of ``out_events``, so an import that is
+    interrupted or fails resumes without writing any event twice. With ``append`` the events
+    already in ``out_events`` before the first checkpointed run are kept through rebuilds.
+
+    ``.gz``/``.xz``/``.bz2`` sessions are decompressed on the fly, and a compressed
+    ``out_events`` is written as appendable frames; checkpoint offsets are in decompressed bytes.
+
+    ``id_scheme="ulid"`` gives the run time-ordered event ids (see ``MonotonicIdGenerator``).
+    """
+    offset = 0
     seq = start_sequence_id
+    base_bytes = 0
+    if checkpoint is not None:
+        saved = load_import_checkpoint(checkpoint)
+        resume = _resume_point(session_jsonl, out_events, saved, run_id=run_id, profile=profile)
+        if resume is not None:
+            offset = resume.offset
+            seq = resume.last_sequence_id + 1
+            base_bytes = resume.base_bytes
+            if resume.events_bytes is not None and out_events.stat().st_size > resume.events_bytes:
+                with out_events.open("r+b") as f:
+                    f.truncate(resume.events_bytes)
+        elif out_events.exists():
+            if append:
+                size = out_events.stat().st_size
+                base_bytes = min(saved.base_bytes, size) if saved is not None else size
+            if base_bytes:
+                with out_events.open("r+b") as f:
+                    f.truncate(base_bytes)
+            else:
+                out_events.unlink()
+
     count = 0
+    new_id = _fast_event_id if id_scheme == "uuid4" else event_id_factory(id_scheme)
 
     keep_content = include_content or profile in {"bridge", "debug"}
 
-    with session_jsonl.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
+    def save_checkpoint() -> None:
+        assert checkpoint is not None
+        head_bytes, head_sha256 = record_head(session_jsonl, offset)
+        save_import_checkpoint(
+            checkpoint,
+            ImportCheckpoint(
+                session_jsonl=str(session_jsonl),
+                run_id=run_id,
+                profile=profile,
+                offset=offset,
+                last_sequence_id=seq - 1,
+                head_bytes=head_bytes,
+                head_sha256=head_sha256,
+                events_bytes=out_events.stat().st_size if out_events.exists() else 0,
+                base_bytes=base_bytes,
+            ),
+        )
+
+    with (
+        open_binary(session_jsonl) as f,
+        JsonlTraceWriter(out_events, flush_every=_CHECKPOINT_EVERY) as writer,
+    ):
+        f.seek(offset)
+        for raw in f:
+            if checkpoint is not None and not raw.endswith(b"\n"):
+                break
+            offset += len(raw)
+            line = raw.strip()
             if not line:
                 continue
             try:
-                row = json.loads(line)
-            except json.JSONDecodeError:
+                row = json.loads(line) if strict else from_json(line)
+            except ValueError:
+                continue
+            if not isinstance(row, dict):
                 continue
 
-            role, text, usage, tool_calls = _extract_openclaw_fields(row)
-            usage_cost = usage.get("cost") if isinstance(usage.get("cost"), dict) else {}
-            token_total = usage.get("totalTokens") if isinstance(usage.get("totalTokens"), int) else None
-            cost_usd = usage_cost.get("total") if isinstance(usage_cost.get("total"), (int, float)) else None
-            kind = _infer_kind(row, role=role, text=text, tool_calls=tool_calls)
-
-            attrs: dict[str, Any] = {
-                "role": role or None,
-                "type": row.get("type"),
-                "content_chars": len(text),
-                "profile": profile,
-            }
-            if row.get("customType"):
-                attrs["custom_type"] = row.get("customType")
-            if tool_calls:
-                attrs["tool_calls"] = tool_calls
-                attrs["tool_call_count"] = len(tool_calls)
-            if keep_content:
-                attrs["content"] = text
-                if profile == "debug":
-                    attrs["raw"] = row
-
-            event = TraceEvent(
-                run_id=run_id,
-                sequence_id=seq,
-                kind=kind,
-                actor="openclaw",
-                attrs=attrs,
-                token_estimate=token_total if token_total is not None else (max(1, len(text) // 4) if text else 0),
-                prompt_chars=len(text) if role == "user" else None,
-                response_chars=len(text) if role in {"assistant", "system", "toolresult"} else None,
-                cost_usd_micros=int(cost_usd * 1_000_000) if cost_usd is not None else None,
-            )
-            writer.append(event)
+            fields = _event_fields(row, profile=profile, keep_content=keep_content)
+            if strict:
+                writer.append(TraceEvent(event_id=new_id(), run_id=run_id, sequence_id=seq, **fields))
+            else:
+                writer.append_json(
+                    dump_event_json(event_id=new_id(), run_id=run_id, sequence_id=seq, **fields)
+                )
             seq += 1
             count += 1
+            if checkpoint is not None and not writer.buffered:
+                save_checkpoint()  # the writer just committed every event up to this row
+
+    if checkpoint is not None:
+        save_checkpoint()
+    return count
+
+
+@dataclass
+class SessionImportResult:
+    session_jsonl: str
+    run_id: str
+    out_events: str
+    start_sequence_id: int
+    events_written: int
 
-    writer.close()
+
+def discover_session_files(spec: str | Path) -> list[Path]:
+    """Resolve a sessions directory (searched recursively) or a glob into sorted session files.
+
+    Directory search also picks up compressed sessions (``*.jsonl.gz`` and friends).
+    """
+    path = Path(spec).expanduser()
+    if path.is_dir():
+        patterns = ["*.jsonl"] + [f"*.jsonl{suffix}" for suffix in COMPRESSED_SUFFIXES]
+        return sorted({p for pattern in patterns for p in path.rglob(pattern) if p.is_file()})
+    return sorted(Path(p) for p in glob.glob(str(path), recursive=True) if Path(p).is_file())
+
+
+def session_run_id(session_jsonl: Path, prefix: str = "run") -> str:
+    # Stable across re-imports of the same file; the path digest keeps equal stems under
+    # different agents apart.
+    digest = hashlib.sha256(str(session_jsonl.resolve()).encode("utf-8")).hexdigest()[:8]
+    return f"{prefix}_{strip_compression_suffix(session_jsonl).stem}_{digest}"
+
+
+def _count_session_rows(session_jsonl: Path) -> int:
+    # Upper bound on events a session can produce (one per non-empty line), used to hand out
+    # non-overlapping sequence_id ranges before any worker starts.
+    count = 0
+    tail = b""
+    with open_binary(session_jsonl) as f:
+        while chunk := f.read(1 << 20):
+            count += chunk.count(b"\n")
+            tail = chunk[-1:]
+    if tail and tail != b"\n":
+        count += 1
     return count
+
+
+def _import_session_job(job: tuple[Path, Path, str, bool, int, str, bool, IdScheme]) -> SessionImportResult:
+    session_jsonl, out_events, run_id, include_content, start_sequence_id, profile, strict, id_scheme = job
+    if out_events.exists():
+        out_events.unlink()
+    n = import_openclaw_session(
+        session_jsonl,
+        out_events,
+        run_id=run_id,
+        include_content=include_content,
+        start_sequence_id=start_sequence_id,
+        profile=profile,
+        strict=strict,
+        id_scheme=id_scheme,
+    )
+    return SessionImportResult(
+        session_jsonl=str(session_jsonl),
+        run_id=run_id,
+        out_events=str(out_events),
+        start_sequence_id=start_sequence_id,
+        events_written=n,
+    )
+
+
+def import_openclaw_sessions(
+    session_files: list[Path],
+    *,
+    out_dir: Path | None = None,
+    out_events: Path | None = None,
+    run_prefix: str = "run",
+    include_content: bool = False,
+    start_sequence_id: int = 1,
+    profile: str = "lean",
+    workers: int | None = None,
+    strict: bool = False,
+    id_scheme: IdScheme = "uuid4",
+) -> list[SessionImportResult]:
+    """Import many session files in parallel.
+
+    Each session gets a deterministic run_id and its own sequence_id range, so the per-session
+    outputs (``out_dir``) or the single merged file (``out_events``) never collide.
+    """
+    if (out_dir is None) == (out_events is None):
+        raise ValueError("exactly one of out_dir or out_events is required")
+
+    files = list(session_files)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        row_counts = list(pool.map(_count_session_rows, files, chunksize=8))
+
+        part_dir = out_dir
+        tmp_dir: str | None = None
+        if part_dir is None:
+            tmp_dir = tempfile.mkdtemp(prefix="tracebridge-import-")
+            part_dir = Path(tmp_dir)
+        part_dir.mkdir(parents=True, exist_ok=True)
+
+        # Parts share the merged file's codec: concatenated gzip members / xz / bz2 streams are
+        # themselves a valid compressed file, so the merge stays a byte copy.
+        part_suffix = ".jsonl" + ((compression_suffix(out_events) or "") if out_events is not None else "")
+        jobs: list[tuple[Path, Path, str, bool, int, str, bool, IdScheme]] = []
+        next_seq = start_sequence_id
+        for session_jsonl, rows in zip(files, row_counts):
+            run_id = session_run_id(session_jsonl, prefix=run_prefix)
+            out_part = part_dir / f"{run_id}{part_suffix}"
+            jobs.append(
+                (session_jsonl, out_part, run_id, include_content, next_seq, profile, strict, id_scheme)
+            )
+            next_seq += rows
+
+        try:
+            results = list(pool.map(_import_session_job, jobs, chunksize=1))
+            if out_events is not None:
+                out_events.parent.mkdir(parents=True, exist_ok=True)
+                with out_events.open("wb") as dst:
+                    for result in results:
+                        part = Path(result.out_events)
+                        if part.exists():
+                            with part.open("rb") as src:
+                                shutil.copyfileobj(src, dst)
+                for result in results:
+                    result.out_events = str(out_events)
+        finally:
+            if tmp_dir is not None:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return results
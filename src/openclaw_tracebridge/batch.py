@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from pydantic_core import from_json
+
+from .columnar import ColumnarSegment, is_columnar
+from .compression import open_binary
+from .index import iter_selected_lines
+from .io import read_segments, split_event_line
+from .schema import EventKind, TraceEvent, micros_to_ts, ts_to_micros
+
+_NULL = -1
+_OPTIONAL_INTS = ("token_estimate", "prompt_chars", "response_chars", "cost_usd_micros")
+
+
+class _Interner:
+    __slots__ = ("codes", "values")
+
+    def __init__(self) -> None:
+        self.values: list[str] = []
+        self.codes: dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class EventView:
+    """Read-only, ``TraceEvent``-shaped view of one row of an ``EventBatch``.
+
+    Attribute access decodes only the field asked for; ``attrs`` is parsed on first use and
+    cached on the view. ``to_event`` builds the validated model when one is really needed.
+    """
+
+    __slots__ = ("_attrs", "_batch", "_row")
+
+    def __init__(self, batch: EventBatch, row: int) -> None:
+        self._batch = batch
+        self._row = row
+        self._attrs: dict[str, Any] | None = None
+
+    @property
+    def schema_version(self) -> str:
+        return self._batch._schemas.values[self._batch.schema_code[self._row]]
+
+    @property
+    def event_id(self) -> str | None:
+        return self._batch.event_ids[self._row]
+
+    @property
+    def run_id(self) -> str:
+        return self._batch._runs.values[self._batch.run_code[self._row]]
+
+    @property
+    def sequence_id(self) -> int:
+        return self._batch.sequence_id[self._row]
+
+    @property
+    def ts(self) -> datetime:
+        return self._batch.ts(self._row)
+
+    @property
+    def kind(self) -> EventKind:
+        return self._batch._kind_enums[self._batch.kind_code[self._row]]
+
+    @property
+    def actor(self) -> str:
+        return self._batch._actors.values[self._batch.actor_code[self._row]]
+
+    @property
+    def attrs(self) -> dict[str, Any]:
+        if self._attrs is None:
+            self._attrs = from_json(self._batch.attrs_json[self._row])
+        return self._attrs
+
+    def _optional(self, name: str) -> int | None:
+        value = self._batch.ints[name][self._row]
+        return None if value == _NULL else value
+
+    @property
+    def token_estimate(self) -> int | None:
+        return self._optional("token_estimate")
+
+    @property
+    def prompt_chars(self) -> int | None:
+        return self._optional("prompt_chars")
+
+    @property
+    def response_chars(self) -> int | None:
+        return self._optional("response_chars")
+
+    @property
+    def cost_usd_micros(self) -> int | None:
+        return self._optional("cost_usd_micros")
+
+    def to_event(self) -> TraceEvent:
+        return self._batch.to_event(self._row)
+
+
+class EventBatch:
+    """Memory-compact, append-only table of trace events.
+
+    Repeated strings (``run_id``, ``actor``, ``kind``, ``schema_version``) are interned into
+    per-batch tables and stored as codes; numeric fields live in typed arrays (``-1`` for
+    null); ``attrs`` is kept as its raw JSON bytes. Rows are loaded without validation and
+    handed out as ``EventView`` objects, with ``to_event`` building a ``TraceEvent`` on demand.
+    """
+
+    __slots__ = (
+        "_actors",
+        "_kind_enums",
+        "_kinds",
+        "_runs",
+        "_schemas",
+        "actor_code",
+        "attrs_json",
+        "event_ids",
+        "ints",
+        "kind_code",
+        "run_code",
+        "schema_code",
+        "sequence_id",
+        "ts_override",
+        "ts_us",
+    )
+
+    def __init__(self) -> None:
+        self._schemas = _Interner()
+        self._runs = _Interner()
+        self._actors = _Interner()
+        self._kinds = _Interner()
+        self._kind_enums: list[EventKind] = []
+        self.schema_code = array("B")
+        self.run_code = array("I")
+        self.actor_code = array("I")
+        self.kind_code = array("B")
+        self.sequence_id = array("q")
+        self.ts_us = array("q")
+        self.ts_override: dict[int, str] = {}
+        self.ints = {name: array("q") for name in _OPTIONAL_INTS}
+        self.event_ids: list[str | None] = []
+        self.attrs_json: list[bytes] = []
+
+    def __len__(self) -> int:
+        return len(self.sequence_id)
+
+    def __getitem__(self, row: int) -> EventView:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return EventView(self, row)
+
+    def __iter__(self) -> Iterator[EventView]:
+        for row in range(len(self)):
+            yield EventView(self, row)
+
+    @property
+    def runs(self) -> list[str]:
+        return self._runs.values
+
+    @property
+    def kinds(self) -> list[str]:
+        return self._kinds.values
+
+    def _add(self, fields: dict[str, Any], attrs_json: bytes) -> None:
+        row = len(self.sequence_id)
+        kind = str(fields.get("kind"))
+        kind_code = self._kinds.code(kind)
+        if kind_code == len(self._kind_enums):
+            self._kind_enums.append(EventKind(kind))
+        self.kind_code.append(kind_code)
+        schema_version = fields.get("schema_version") or "tracebridge.event.v1"
+        self.schema_code.append(self._schemas.code(str(schema_version)))
+        self.run_code.append(self._runs.code(str(fields.get("run_id"))))
+        self.actor_code.append(self._actors.code(str(fields.get("actor") or "openclaw")))
+        self.sequence_id.append(int(fields.get("sequence_id") or 0))
+        ts = fields.get("ts")
+        micros = ts_to_micros(ts) if isinstance(ts, str) and ts.endswith("Z") else None
+        if micros is None:
+            self.ts_override[row] = str(ts)
+            micros = 0
+        self.ts_us.append(micros)
+        for name in _OPTIONAL_INTS:
+            value = fields.get(name)
+            self.ints[name].append(_NULL if value is None else int(value))
+        event_id = fields.get("event_id")
+        self.event_ids.append(None if event_id is None else str(event_id))
+        self.attrs_json.append(attrs_json)
+
+    def append_line(self, line: bytes) -> None:
+        """Add one serialized event line; ``attrs`` is sliced out as bytes, not decoded."""
+        row, attrs_json = split_event_line(line)
+        self._add(row, attrs_json)
+
+    def append_event(self, event: TraceEvent) -> None:
+        self.append_line(event.model_dump_json().encode("utf-8"))
+
+    def ts(self, row: int) -> datetime:
+        text = self.ts_override.get(row)
+        if text is not None:
+            return datetime.fromisoformat(text)
+        return micros_to_ts(self.ts_us[row])
+
+    def to_event(self, row: int) -> TraceEvent:
+        view = EventView(self, row)
+        fields: dict[str, Any] = {} if view.event_id is None else {"event_id": view.event_id}
+        return TraceEvent.model_validate(
+            {
+                **fields,
+                "schema_version": view.schema_version,
+                "run_id": view.run_id,
+                "sequence_id": view.sequence_id,
+                "ts": self.ts_override.get(row) or view.ts,
+                "kind": view.kind,
+                "actor": view.actor,
+                "attrs": view.attrs,
+                **{name: view._optional(name) for name in _OPTIONAL_INTS},
+            }
+        )
+
+    def iter_events(self) -> Iterator[TraceEvent]:
+        for row in range(len(self)):
+            yield self.to_event(row)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[bytes]) -> EventBatch:
+        batch = cls()
+        for line in lines:
+            line = line.strip()
+            if line:
+                batch.append_line(line)
+        return batch
+
+
+def iter_event_lines(path: Path, *, run_id: str | None = None) -> Iterator[bytes]:
+    """Serialized event lines of a JSONL, compressed JSONL or ``.tbcol`` file, in file order.
+
+    A rotated JSONL path is read across its segments (see ``io.read_segments``).
+    """
+    if run_id is not None:
+        yield from iter_selected_lines(path, run_id=run_id)
+        return
+    if is_columnar(path):
+        yield from ColumnarSegment(path).iter_json_lines()
+        return
+    for segment in read_segments(path):
+        with open_binary(segment) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+
+
+def load_event_batch(path: Path, *, run_id: str | None = None) -> EventBatch:
+    """Load an events file (JSONL, compressed JSONL or ``.tbcol``) into one ``EventBatch``."""
+    return EventBatch.from_lines(iter_event_lines(path, run_id=run_id))
+
+
+def iter_line_batches(lines: Iterable[bytes], batch_size: int = 65_536) -> Iterator[EventBatch]:
+    """Group serialized event lines into consecutive batches of at most ``batch_size`` rows."""
+    batch = EventBatch()
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        batch.append_line(line)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = EventBatch()
+    if len(batch):
+        yield batch
+
+
+def iter_event_batches(
+    path: Path, *, batch_size: int = 65_536, run_id: str | None = None
+) -> Iterator[EventBatch]:
+    """Stream an events file as consecutive batches of at most ``batch_size`` rows."""
+    return iter_line_batches(iter_event_lines(path, run_id=run_id), batch_size)
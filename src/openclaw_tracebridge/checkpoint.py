@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from .compression import open_binary
+
+HEAD_FINGERPRINT_BYTES = 4096
+
+
+def head_fingerprint(path: Path, n: int) -> str:
+    """sha256 of the first ``n`` (decompressed) bytes of ``path``."""
+    with open_binary(path) as f:
+        return hashlib.sha256(f.read(n)).hexdigest()
+
+
+def record_head(path: Path, offset: int) -> tuple[int, str]:
+    """``(head_bytes, head_sha256)`` to store with a checkpoint taken at ``offset``."""
+    head_bytes = min(offset, HEAD_FINGERPRINT_BYTES)
+    return head_bytes, head_fingerprint(path, head_bytes)
+
+
+def only_appended(path: Path, size: int | None, offset: int, head_bytes: int, head_sha256: str) -> bool:
+    """Whether a source read up to ``offset`` can only have grown since.
+
+    Sources (session files, events files) only grow by appending; a shorter one or a
+    different head means it was rotated or rewritten and the offset no longer describes it.
+    ``size`` is None when it is not in the offset's units: offsets count decompressed bytes,
+    so the size check only applies to plain files.
+    """
+    if size is not None and size < offset:
+        return False
+    return head_fingerprint(path, head_bytes) == head_sha256
+
+
+def load_state(path: Path, cls: type, schema: str) -> Any:
+    """Read a JSON sidecar written by ``save_state``; None if missing, unreadable or another schema."""
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        if payload.get("schema") != schema:
+            return None
+        return cls(**payload)
+    except (OSError, ValueError, TypeError, AttributeError):
+        return None
+
+
+def save_state(path: Path, state: Any) -> None:
+    """Atomically replace the JSON sidecar at ``path`` with the dataclass ``state``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.tmp")
+    tmp.write_text(json.dumps(asdict(state), ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(path)
@@ -2,39 +2,100 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
+import tempfile
 from collections import Counter
+from dataclasses import asdict, replace
+from datetime import datetime
 from pathlib import Path
 
-from .adapters.openclaw_session import import_openclaw_session
+from .adapters.openclaw_follow import follow_openclaw_session, follow_openclaw_sessions
+from .adapters.openclaw_session import (
+    checkpoint_path_for,
+    discover_session_files,
+    import_openclaw_session,
+    import_openclaw_sessions,
+    load_import_checkpoint,
+)
+from .columnar import columnar_to_jsonl, is_columnar, jsonl_to_columnar
+from .compression import open_binary
 from .consumer_smoke import smoke_check_messages, smoke_check_triplets
 from .exporters.agent_lightning import (
-    export_to_agent_lightning_messages,
-    export_to_agent_lightning_triplets,
+    DEFAULT_WINDOW_TOKENS,
+    EXPORT_FORMATS,
+    ExportTarget,
+    export_agent_lightning,
+    watermark_path_for,
 )
-from .io import iter_events
+from .external_sort import sort_events_file
+from .index import build_event_index, index_path_for, iter_selected_lines, save_event_index
+from .io import iter_event_fields, read_segments
+from .judge import JudgeConfig
 from .optimization_loop import run_optimization_loop
+from .packing import (
+    DEFAULT_BUCKET_EDGES,
+    DEFAULT_OPEN_BINS,
+    DEFAULT_TOKEN_BUDGET,
+    PACKING_STRATEGIES,
+    bucket_dataset,
+    pack_dataset,
+)
 from .replay import build_replay_manifest, split_jsonl_for_replay
+from .rewards import reward_modes
+from .rowstore import (
+    ROWSTORE_SUFFIX,
+    is_rowstore_path,
+    jsonl_to_rowstore,
+    offsets_path_for,
+    rowstore_to_jsonl,
+)
+from .runtime_emit import bench_emit
 from .runtime_hook import run_agent_lightning_runtime_smoke
 from .schema import RunMeta, new_run_id
+from .sharding import ShardSpec, shard_index_path
 
 
 def _cmd_run_init(args: argparse.Namespace) -> int:
-    run_id = args.run_id or new_run_id()
+    run_id = args.run_id or new_run_id(id_scheme=args.id_scheme)
     run_dir = Path(args.root) / run_id
     run_dir.mkdir(parents=True, exist_ok=True)
 
-    meta = RunMeta(run_id=run_id, session_key=args.session_key, source=args.source)
+    meta = RunMeta(
+        run_id=run_id, session_key=args.session_key, source=args.source, event_id_scheme=args.id_scheme
+    )
     (run_dir / "run.json").write_text(meta.model_dump_json(indent=2), encoding="utf-8")
     print(json.dumps({"ok": True, "run_id": run_id, "run_dir": str(run_dir)}))
     return 0
 
 
 def _cmd_import_session(args: argparse.Namespace) -> int:
-    run_id = args.run_id or new_run_id()
     out = Path(args.out)
+    checkpoint = checkpoint_path_for(out) if args.resume or args.follow else None
+    previous = load_import_checkpoint(checkpoint) if checkpoint is not None else None
+    run_id = (
+        args.run_id
+        or (previous.run_id if previous is not None else None)
+        or new_run_id(id_scheme=args.id_scheme)
+    )
     out.parent.mkdir(parents=True, exist_ok=True)
-    if out.exists() and not args.append:
+    if out.exists() and not args.append and checkpoint is None:
         out.unlink()
+    if args.follow:
+        summary = follow_openclaw_session(
+            Path(args.session_jsonl),
+            out,
+            run_id=run_id,
+            include_content=args.include_content,
+            profile=args.profile,
+            poll_interval=args.poll_interval,
+            max_polls=args.max_polls,
+            strict=args.strict,
+            id_scheme=args.id_scheme,
+            start_sequence_id=args.start_sequence_id,
+            append=args.append,
+        )
+        print(json.dumps({"ok": True, "run_id": run_id, "out": str(out), **asdict(summary)}))
+        return 0
     n = import_openclaw_session(
         session_jsonl=Path(args.session_jsonl),
         out_events=out,
@@ -42,54 +103,305 @@ def _cmd_import_session(args: argparse.Namespace) -> int:
         include_content=args.include_content,
         start_sequence_id=args.start_sequence_id,
         profile=args.profile,
+        checkpoint=checkpoint,
+        strict=args.strict,
+        id_scheme=args.id_scheme,
+        append=args.append,
     )
-    print(json.dumps({"ok": True, "run_id": run_id, "events_written": n, "out": str(out)}))
+    payload = {"ok": True, "run_id": run_id, "events_written": n, "out": str(out)}
+    if checkpoint is not None:
+        payload["checkpoint"] = str(checkpoint)
+    print(json.dumps(payload))
+    return 0
+
+
+def _cmd_import_sessions(args: argparse.Namespace) -> int:
+    if args.follow:
+        if not args.out_dir:
+            raise SystemExit("--follow requires --out-dir")
+        summary = follow_openclaw_sessions(
+            args.sessions,
+            Path(args.out_dir),
+            run_prefix=args.run_prefix,
+            include_content=args.include_content,
+            profile=args.profile,
+            poll_interval=args.poll_interval,
+            max_polls=args.max_polls,
+            strict=args.strict,
+            id_scheme=args.id_scheme,
+            start_sequence_id=args.start_sequence_id,
+        )
+        print(json.dumps({"ok": True, "out": args.out_dir, **asdict(summary)}))
+        return 0
+
+    files = discover_session_files(args.sessions)
+    results = import_openclaw_sessions(
+        files,
+        out_dir=Path(args.out_dir) if args.out_dir else None,
+        out_events=Path(args.out) if args.out else None,
+        run_prefix=args.run_prefix,
+        include_content=args.include_content,
+        start_sequence_id=args.start_sequence_id,
+        profile=args.profile,
+        workers=args.workers,
+        strict=args.strict,
+        id_scheme=args.id_scheme,
+    )
+    payload = {
+        "ok": True,
+        "sessions": len(results),
+        "events_written": sum(r.events_written for r in results),
+        "out": args.out or args.out_dir,
+        "runs": [
+            {"session_jsonl": r.session_jsonl, "run_id": r.run_id, "events_written": r.events_written}
+            for r in results
+        ],
+    }
+    print(json.dumps(payload, ensure_ascii=False))
     return 0
 
 
 def _cmd_stats(args: argparse.Namespace) -> int:
-    events = list(iter_events(Path(args.events)))
-    kind_counts = Counter(e.kind for e in events)
-    token_total = sum(e.token_estimate or 0 for e in events)
-    cost_total_micros = sum(e.cost_usd_micros or 0 for e in events)
+    kind_counts: Counter[str] = Counter()
+    token_total = 0
+    cost_total_micros = 0
+    # The totals do not depend on row order, so stats never sorts; it only reports whether the
+    # file is in (run_id, sequence_id) order, i.e. whether sort-events would change it.
+    ordered = True
+    last_key: tuple[str, int] | None = None
+    fields = ("kind", "token_estimate", "cost_usd_micros", "run_id", "sequence_id")
+    for record in iter_event_fields(Path(args.events), fields):
+        kind_counts[record["kind"]] += 1
+        token_total += record["token_estimate"] or 0
+        cost_total_micros += record["cost_usd_micros"] or 0
+        key = (str(record["run_id"]), record["sequence_id"] or 0)
+        if last_key is not None and key < last_key:
+            ordered = False
+        last_key = key
 
     payload = {
         "ok": True,
-        "events": len(events),
+        "events": sum(kind_counts.values()),
         "token_estimate_total": token_total,
         "cost_usd": round(cost_total_micros / 1_000_000, 6),
         "kinds": {str(k): v for k, v in sorted(kind_counts.items(), key=lambda kv: str(kv[0]))},
+        "sorted": ordered,
     }
     print(json.dumps(payload, ensure_ascii=False))
     return 0
 
 
-def _cmd_export_agent_lightning(args: argparse.Namespace) -> int:
-    events_path = Path(args.events)
+def _cmd_convert_dataset(args: argparse.Namespace) -> int:
+    in_path = Path(args.input)
     out_path = Path(args.out)
+    if is_rowstore_path(in_path):
+        rows = rowstore_to_jsonl(in_path, out_path)
+    elif is_rowstore_path(out_path):
+        rows = jsonl_to_rowstore(in_path, out_path)
+    else:
+        raise SystemExit(f"convert-dataset: --input or --out must be a {ROWSTORE_SUFFIX} path")
+    payload = {"ok": True, "out": str(out_path), "rows": rows}
+    if is_rowstore_path(out_path):
+        payload["offsets"] = str(offsets_path_for(out_path))
+    print(json.dumps(payload, ensure_ascii=False))
+    return 0
 
-    if args.format == "messages":
-        summary = export_to_agent_lightning_messages(events_path=events_path, out_path=out_path)
+
+def _cmd_convert_events(args: argparse.Namespace) -> int:
+    in_path = Path(args.input)
+    out_path = Path(args.out)
+    if is_columnar(in_path):
+        rows = columnar_to_jsonl(in_path, out_path)
     else:
-        summary = export_to_agent_lightning_triplets(
-            events_path=events_path,
-            out_path=out_path,
-            reward_mode=args.reward_mode,
+        rows = jsonl_to_columnar(in_path, out_path)
+    payload = {
+        "ok": True,
+        "out": str(out_path),
+        "rows": rows,
+        "input_bytes": in_path.stat().st_size,
+        "output_bytes": out_path.stat().st_size,
+    }
+    print(json.dumps(payload, ensure_ascii=False))
+    return 0
+
+
+def _cmd_index(args: argparse.Namespace) -> int:
+    events_path = Path(args.events)
+    # Each rotated segment gets its own sidecar; query reads them segment by segment.
+    kinds: Counter[str] = Counter()
+    runs: set[str] = set()
+    rows = 0
+    index_bytes = 0
+    segments = read_segments(events_path)
+    for segment in segments:
+        try:
+            index = build_event_index(segment, block_size=args.block_size)
+        except ValueError as exc:
+            raise SystemExit(f"index: {exc}") from exc
+        out_path = index_path_for(segment)
+        save_event_index(index, out_path)
+        rows += len(index)
+        runs.update(index.runs)
+        kinds.update({k: len(v) for k, v in index.postings.items()})
+        index_bytes += out_path.stat().st_size
+    payload = {
+        "ok": True,
+        "out": str(index_path_for(segments[-1])),
+        "segments": len(segments),
+        "rows": rows,
+        "runs": len(runs),
+        "kinds": dict(sorted(kinds.items())),
+        "bytes": index_bytes,
+    }
+    print(json.dumps(payload, ensure_ascii=False))
+    return 0
+
+
+def _parse_ts(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _cmd_query(args: argparse.Namespace) -> int:
+    lines = iter_selected_lines(
+        Path(args.events),
+        kinds=args.kind,
+        run_id=args.run_id,
+        start_sequence_id=args.start_sequence_id,
+        end_sequence_id=args.end_sequence_id,
+        since=_parse_ts(args.since),
+        until=_parse_ts(args.until),
+    )
+    if not args.out:
+        out = sys.stdout.buffer
+        for line in lines:
+            out.write(line + b"\n")
+        out.flush()
+        return 0
+
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with open_binary(out_path, "wb") as f:
+        for line in lines:
+            f.write(line + b"\n")
+            n += 1
+    print(json.dumps({"ok": True, "out": str(out_path), "rows": n}, ensure_ascii=False))
+    return 0
+
+
+def _cmd_sort_events(args: argparse.Namespace) -> int:
+    out_path = Path(args.out)
+    rows = sort_events_file(Path(args.events), out_path, memory_budget_bytes=args.memory_mb << 20)
+    print(json.dumps({"ok": True, "out": str(out_path), "rows": rows}, ensure_ascii=False))
+    return 0
+
+
+def _shard_spec(args: argparse.Namespace) -> ShardSpec | None:
+    if args.shards is None and args.shard_rows is None and args.shard_bytes is None:
+        return None
+    try:
+        return ShardSpec(args.shards, args.shard_rows, args.shard_bytes)
+    except ValueError as exc:
+        raise SystemExit(f"invalid sharding options: {exc}") from exc
+
+
+def _add_shard_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--shards", type=int, help="Write each output as this many byte-balanced shards")
+    parser.add_argument("--shard-rows", type=int, help="Start a new shard after this many rows")
+    parser.add_argument("--shard-bytes", type=int, help="Start a new shard before exceeding this many bytes")
+
+
+def _parse_emit(spec: str, window_tokens: int, shards: ShardSpec | None = None) -> ExportTarget:
+    # FORMAT[:REWARD_MODE]=PATH, e.g. "messages=m.jsonl" or "triplets:heuristic-basic=t.jsonl"
+    head, sep, path = spec.partition("=")
+    if not sep or not path:
+        raise SystemExit(f"--emit expects FORMAT[:REWARD_MODE]=PATH, got {spec!r}")
+    fmt, _, reward_mode = head.partition(":")
+    if fmt not in EXPORT_FORMATS:
+        raise SystemExit(f"--emit: unknown format {fmt!r} (choose from {', '.join(EXPORT_FORMATS)})")
+    if reward_mode and reward_mode not in reward_modes():
+        raise SystemExit(
+            f"--emit: unknown reward mode {reward_mode!r} (choose from {', '.join(reward_modes())})"
         )
+    return ExportTarget(fmt, Path(path), reward_mode or "none", window_tokens, shards)
 
-    print(
-        json.dumps(
-            {
-                "ok": True,
-                "format": summary.format,
-                "out": str(out_path),
-                "rows_written": summary.rows_written,
-                "skipped_missing_content": summary.skipped_missing_content,
-                "skipped_unpaired": summary.skipped_unpaired,
-            },
-            ensure_ascii=False,
+
+def _cmd_export_agent_lightning(args: argparse.Namespace) -> int:
+    events_path = Path(args.events)
+    shards = _shard_spec(args)
+    targets: list[ExportTarget] = []
+    if args.out:
+        targets.append(
+            ExportTarget(args.format, Path(args.out), args.reward_mode, args.window_tokens, shards)
         )
+    targets += [_parse_emit(spec, args.window_tokens, shards) for spec in args.emit or ()]
+    if not targets:
+        raise SystemExit("export-agent-lightning requires --out or at least one --emit")
+    if any(t.reward_mode == "judge" for t in targets):
+        env = JudgeConfig.from_env()
+        judge = JudgeConfig(
+            base_url=args.judge_url or env.base_url,
+            model=args.judge_model or env.model,
+            api_key=env.api_key,
+            cache_path=Path(args.judge_cache) if args.judge_cache else env.cache_path,
+            concurrency=args.judge_concurrency or env.concurrency,
+        )
+        targets = [replace(t, judge=judge) if t.reward_mode == "judge" else t for t in targets]
+
+    summaries = export_agent_lightning(
+        events_path,
+        targets,
+        run_id=args.run_id,
+        sort_memory_bytes=args.sort_memory_mb << 20,
+        workers=args.workers or None,
+        incremental=args.incremental,
+        watermark_path=Path(args.watermark) if args.watermark else None,
+    )
+
+    outputs = [
+        {
+            "format": summary.format,
+            "reward_mode": target.reward_mode,
+            "out": str(target.out_path),
+            "rows_written": summary.rows_written,
+        }
+        for target, summary in zip(targets, summaries)
+    ]
+    if shards is not None:
+        for output, target in zip(outputs, targets):
+            output["shard_index"] = str(shard_index_path(target.out_path))
+    payload: dict[str, object] = {"ok": True}
+    if args.emit:
+        payload["outputs"] = outputs
+    else:
+        payload.update({k: v for k, v in outputs[0].items() if k != "reward_mode"})
+    payload["skipped_missing_content"] = summaries[0].skipped_missing_content
+    payload["skipped_unpaired"] = summaries[0].skipped_unpaired
+    if args.incremental:
+        payload["open_turns"] = summaries[0].open_turns
+        payload["watermark"] = args.watermark or str(watermark_path_for(targets[0].out_path))
+    print(json.dumps(payload, ensure_ascii=False))
+    return 0
+
+
+def _cmd_pack_dataset(args: argparse.Namespace) -> int:
+    out_path = Path(args.out)
+    summary = pack_dataset(
+        Path(args.input),
+        out_path,
+        token_budget=args.token_budget,
+        strategy=args.strategy,
+        open_bins=args.open_bins,
     )
+    print(json.dumps({"ok": True, "out": str(out_path), **asdict(summary)}, ensure_ascii=False))
+    return 0
+
+
+def _cmd_bucket_dataset(args: argparse.Namespace) -> int:
+    out_dir = Path(args.out_dir)
+    edges = tuple(int(edge) for edge in args.edges.split(","))
+    shards = bucket_dataset(Path(args.input), out_dir, edges=edges)
+    print(json.dumps({"ok": True, "out_dir": str(out_dir), "shards": shards}, ensure_ascii=False))
     return 0
 
 
@@ -103,6 +415,7 @@ def _cmd_replay_split(args: argparse.Namespace) -> int:
         key_field=args.key_field,
         sample_size=args.sample_size,
         sample_seed=args.sample_seed,
+        shards=_shard_spec(args),
     )
     print(
         json.dumps(
@@ -213,6 +526,39 @@ def _cmd_agent_lightning_runtime_smoke(args: argparse.Namespace) -> int:
     return 0
 
 
+def _cmd_runtime_emit_bench(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory(prefix="tracebridge-emit-bench-") as tmp:
+        out = Path(args.out) if args.out else Path(tmp) / "events.jsonl"
+        payload = {"ok": True, **bench_emit(out, events=args.events)}
+    print(json.dumps(payload, ensure_ascii=False))
+    if args.strict and not payload["within_budget"]:
+        return 2
+    return 0
+
+
+def _add_strict_arg(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--strict",
+        action="store_true",
+        help="Validate every event through the TraceEvent model instead of the direct serializer",
+    )
+
+
+def _add_id_scheme_arg(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--id-scheme",
+        choices=["uuid4", "ulid"],
+        default="uuid4",
+        help="Event/run id format; ulid ids sort by creation time",
+    )
+
+
+def _add_follow_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--follow", action="store_true", help="Keep running and tail sessions as they grow")
+    p.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between follow polls")
+    p.add_argument("--max-polls", type=int, help="Stop following after this many polls")
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="openclaw-tracebridge")
     sub = parser.add_subparsers(dest="cmd", required=True)
@@ -222,33 +568,142 @@ def build_parser() -> argparse.ArgumentParser:
     p_init.add_argument("--run-id")
     p_init.add_argument("--session-key")
     p_init.add_argument("--source", default="openclaw")
+    _add_id_scheme_arg(p_init)
     p_init.set_defaults(func=_cmd_run_init)
 
-    p_import = sub.add_parser("import-openclaw-session", help="Import OpenClaw session JSONL into trace events")
+    p_import = sub.add_parser(
+        "import-openclaw-session", help="Import OpenClaw session JSONL into trace events"
+    )
     p_import.add_argument("--session-jsonl", required=True)
     p_import.add_argument("--out", required=True)
     p_import.add_argument("--run-id")
     p_import.add_argument("--profile", choices=["lean", "bridge", "debug"], default="lean")
     p_import.add_argument("--include-content", action="store_true", help="Force include text content payload")
-    p_import.add_argument("--append", action="store_true", help="Append to existing output instead of overwrite")
+    p_import.add_argument(
+        "--append", action="store_true", help="Append to existing output instead of overwrite"
+    )
     p_import.add_argument("--start-sequence-id", type=int, default=1)
+    p_import.add_argument(
+        "--resume",
+        action="store_true",
+        help="Keep a byte-offset checkpoint next to --out and only import rows appended since the last run",
+    )
+    _add_strict_arg(p_import)
+    _add_id_scheme_arg(p_import)
+    _add_follow_args(p_import)
     p_import.set_defaults(func=_cmd_import_session)
 
+    p_import_many = sub.add_parser(
+        "import-openclaw-sessions",
+        help="Import every session JSONL under a directory or glob in parallel",
+    )
+    p_import_many.add_argument("--sessions", required=True, help="Sessions directory or glob pattern")
+    p_import_out = p_import_many.add_mutually_exclusive_group(required=True)
+    p_import_out.add_argument("--out-dir", help="Write one events file per session")
+    p_import_out.add_argument("--out", help="Write a single merged events file")
+    p_import_many.add_argument("--run-prefix", default="run")
+    p_import_many.add_argument("--profile", choices=["lean", "bridge", "debug"], default="lean")
+    p_import_many.add_argument(
+        "--include-content", action="store_true", help="Force include text content payload"
+    )
+    p_import_many.add_argument("--start-sequence-id", type=int, default=1)
+    p_import_many.add_argument("--workers", type=int, help="Process pool size (default: CPU count)")
+    _add_strict_arg(p_import_many)
+    _add_id_scheme_arg(p_import_many)
+    _add_follow_args(p_import_many)
+    p_import_many.set_defaults(func=_cmd_import_sessions)
+
     p_stats = sub.add_parser("stats", help="Summarize an events JSONL file")
     p_stats.add_argument("--events", required=True)
     p_stats.set_defaults(func=_cmd_stats)
 
+    p_convert = sub.add_parser(
+        "convert-events",
+        help="Convert an events file between JSONL and the columnar .tbcol segment format",
+    )
+    p_convert.add_argument("--input", required=True, help="JSONL converts to columnar; .tbcol converts back")
+    p_convert.add_argument("--out", required=True)
+    p_convert.set_defaults(func=_cmd_convert_events)
+
+    p_convert_ds = sub.add_parser(
+        "convert-dataset",
+        help="Convert an exported JSONL dataset to/from the random-access .tbrows format",
+    )
+    p_convert_ds.add_argument("--input", required=True, help="JSONL (plain or compressed) or .tbrows")
+    p_convert_ds.add_argument("--out", required=True, help="A .tbrows path, or JSONL when --input is .tbrows")
+    p_convert_ds.set_defaults(func=_cmd_convert_dataset)
+
+    p_index = sub.add_parser("index", help="Build a sidecar offset index (<events>.tbidx) for an events file")
+    p_index.add_argument("--events", required=True)
+    p_index.add_argument("--block-size", type=int, default=1024, help="Rows per min/max ts block")
+    p_index.set_defaults(func=_cmd_index)
+
+    p_query = sub.add_parser("query", help="Select events by kind, run, sequence range or time window")
+    p_query.add_argument("--events", required=True)
+    p_query.add_argument("--kind", action="append", help="Event kind to keep (repeatable)")
+    p_query.add_argument("--run-id")
+    p_query.add_argument("--start-sequence-id", type=int)
+    p_query.add_argument("--end-sequence-id", type=int)
+    p_query.add_argument("--since", help="ISO timestamp, inclusive")
+    p_query.add_argument("--until", help="ISO timestamp, inclusive")
+    p_query.add_argument("--out", help="Write matching rows here instead of stdout")
+    p_query.set_defaults(func=_cmd_query)
+
     p_export = sub.add_parser(
         "export-agent-lightning",
         help="Export trace events into Agent Lightning-friendly datasets",
     )
     p_export.add_argument("--events", required=True)
-    p_export.add_argument("--out", required=True)
-    p_export.add_argument("--format", choices=["messages", "triplets"], default="messages")
-    p_export.add_argument("--reward-mode", choices=["none", "heuristic-basic"], default="none")
+    p_export.add_argument("--out")
+    p_export.add_argument("--format", choices=list(EXPORT_FORMATS), default="messages")
+    p_export.add_argument("--reward-mode", choices=list(reward_modes()), default="none")
+    p_export.add_argument(
+        "--emit",
+        action="append",
+        metavar="FORMAT[:REWARD_MODE]=PATH",
+        help="Write this output too; repeat to fan out several formats from one pairing pass",
+    )
+    p_export.add_argument(
+        "--window-tokens",
+        type=int,
+        default=DEFAULT_WINDOW_TOKENS,
+        help="Token budget of each trajectories window (earlier turns of the run that fit)",
+    )
+    p_export.add_argument("--run-id", help="Only export this run (uses the sidecar index when fresh)")
+    p_export.add_argument(
+        "--sort-memory-mb",
+        type=int,
+        default=256,
+        help="Memory budget for the external sort used when events are out of order",
+    )
+    p_export.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes exporting runs in parallel (0 = CPU count)",
+    )
+    p_export.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Append only turns completed since the last export (tracked in a watermark sidecar)",
+    )
+    p_export.add_argument("--watermark", help="Watermark sidecar path (default: <out>.wm.json)")
+    p_export.add_argument("--judge-url", help="OpenAI-compatible base URL for --reward-mode judge")
+    p_export.add_argument("--judge-model", help="Model name sent to the judge endpoint")
+    p_export.add_argument("--judge-cache", help="SQLite file caching judgments across exports")
+    p_export.add_argument("--judge-concurrency", type=int, help="Judge requests in flight at once")
+    _add_shard_args(p_export)
     p_export.set_defaults(func=_cmd_export_agent_lightning)
 
-    p_split = sub.add_parser("replay-split", help="Create deterministic A/B replay splits from a JSONL dataset")
+    p_sort = sub.add_parser("sort-events", help="Rewrite an events file in (run_id, sequence_id) order")
+    p_sort.add_argument("--events", required=True)
+    p_sort.add_argument("--out", required=True)
+    p_sort.add_argument("--memory-mb", type=int, default=256, help="Spill sorted runs to disk beyond this")
+    p_sort.set_defaults(func=_cmd_sort_events)
+
+    p_split = sub.add_parser(
+        "replay-split", help="Create deterministic A/B replay splits from a JSONL dataset"
+    )
     p_split.add_argument("--input", required=True)
     p_split.add_argument("--out-a", required=True)
     p_split.add_argument("--out-b", required=True)
@@ -257,8 +712,34 @@ def build_parser() -> argparse.ArgumentParser:
     p_split.add_argument("--key-field", default="id")
     p_split.add_argument("--sample-size", type=int)
     p_split.add_argument("--sample-seed", type=int, default=42)
+    _add_shard_args(p_split)
     p_split.set_defaults(func=_cmd_replay_split)
 
+    p_pack = sub.add_parser("pack-dataset", help="Pack exported rows into fixed token-budget bins")
+    p_pack.add_argument("--input", required=True)
+    p_pack.add_argument("--out", required=True)
+    p_pack.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET)
+    p_pack.add_argument(
+        "--strategy",
+        choices=list(PACKING_STRATEGIES),
+        default="ffd",
+        help="ffd: first-fit decreasing over the whole file; streaming: one pass, bounded memory",
+    )
+    p_pack.add_argument(
+        "--open-bins", type=int, default=DEFAULT_OPEN_BINS, help="Bins kept open by --strategy streaming"
+    )
+    p_pack.set_defaults(func=_cmd_pack_dataset)
+
+    p_bucket = sub.add_parser("bucket-dataset", help="Split exported rows into length-bucketed shards")
+    p_bucket.add_argument("--input", required=True)
+    p_bucket.add_argument("--out-dir", required=True)
+    p_bucket.add_argument(
+        "--edges",
+        default=",".join(str(edge) for edge in DEFAULT_BUCKET_EDGES),
+        help="Comma-separated, increasing token edges",
+    )
+    p_bucket.set_defaults(func=_cmd_bucket_dataset)
+
     p_manifest = sub.add_parser("replay-manifest", help="Generate manifest (rows + sha256) for replay input")
     p_manifest.add_argument("--input", required=True)
     p_manifest.add_argument("--out", required=True)
@@ -294,6 +775,17 @@ def build_parser() -> argparse.ArgumentParser:
     p_runtime.add_argument("--strict", action="store_true", help="Exit non-zero when runtime smoke fails")
     p_runtime.set_defaults(func=_cmd_agent_lightning_runtime_smoke)
 
+    p_emit_bench = sub.add_parser(
+        "runtime-emit-bench",
+        help="Microbenchmark the caller-side cost of the in-process emit API",
+    )
+    p_emit_bench.add_argument("--events", type=int, default=200_000)
+    p_emit_bench.add_argument("--out", help="Keep the emitted events here instead of a temp file")
+    p_emit_bench.add_argument(
+        "--strict", action="store_true", help="Exit non-zero when over the per-event budget"
+    )
+    p_emit_bench.set_defaults(func=_cmd_runtime_emit_bench)
+
     return parser
 
 
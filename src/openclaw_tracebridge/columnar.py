@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import json
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from pydantic_core import from_json, to_json
+
+from .compression import open_binary
+from .schema import TraceEvent, dump_event_json, micros_to_ts, ts_to_micros
+
+COLUMNAR_SCHEMA = "tracebridge.columnar.v0"
+COLUMNAR_SUFFIX = ".tbcol"
+_MAGIC = b"TBCOL1\n"
+_HEADER_LEN = struct.Struct("<I")
+_NULL = -1
+
+_INT_COLUMNS = ("sequence_id", "token_estimate", "prompt_chars", "response_chars", "cost_usd_micros")
+_DICT_COLUMNS = ("schema_version", "kind", "actor", "run_id")
+
+
+def is_columnar(path: Path) -> bool:
+    try:
+        with path.open("rb") as f:
+            return f.read(len(_MAGIC)) == _MAGIC
+    except OSError:
+        return False
+
+
+class _SegmentBuilder:
+    def __init__(self) -> None:
+        self.ints = {name: array("q") for name in _INT_COLUMNS}
+        self.ts_us = array("q")
+        self.dicts: dict[str, dict[str, int]] = {name: {} for name in _DICT_COLUMNS}
+        self.codes = {name: array("I") for name in _DICT_COLUMNS}
+        self.ts_override: dict[int, str] = {}
+        self.event_ids: list[bytes] = []
+        self.attrs: list[bytes] = []
+
+    def add(self, row: dict[str, Any]) -> None:
+        n = len(self.ts_us)
+        for name in _INT_COLUMNS:
+            value = row.get(name)
+            self.ints[name].append(_NULL if value is None else int(value))
+        for name in _DICT_COLUMNS:
+            table = self.dicts[name]
+            self.codes[name].append(table.setdefault(str(row.get(name)), len(table)))
+        ts = row.get("ts")
+        # Only canonical UTC stamps ("...Z") go into the ts column; anything else is kept
+        # verbatim so the JSONL round trip stays byte-identical.
+        micros = ts_to_micros(ts) if isinstance(ts, str) and ts.endswith("Z") else None
+        if micros is None:
+            self.ts_override[n] = str(ts)
+            micros = 0
+        self.ts_us.append(micros)
+        self.event_ids.append(str(row.get("event_id", "")).encode("utf-8"))
+        self.attrs.append(to_json(row.get("attrs") or {}, inf_nan_mode="null"))
+
+    def write(self, path: Path) -> int:
+        columns: dict[str, bytes] = {}
+        types: dict[str, str] = {}
+        for name, values in self.ints.items():
+            columns[name] = values.tobytes()
+            types[name] = values.typecode
+        columns["ts_us"] = self.ts_us.tobytes()
+        types["ts_us"] = "q"
+        for name, values in self.codes.items():
+            columns[name] = values.tobytes()
+            types[name] = values.typecode
+        columns["event_id"] = b"\n".join(self.event_ids)
+        types["event_id"] = "lines"
+        columns["attrs"] = b"\n".join(self.attrs)
+        types["attrs"] = "lines"
+
+        layout: dict[str, dict[str, Any]] = {}
+        payloads: list[bytes] = []
+        cursor = 0
+        for name, raw in columns.items():
+            packed = zlib.compress(raw, 6)
+            layout[name] = {"type": types[name], "offset": cursor, "length": len(packed)}
+            payloads.append(packed)
+            cursor += len(packed)
+
+        header = json.dumps(
+            {
+                "schema": COLUMNAR_SCHEMA,
+                "rows": len(self.ts_us),
+                "byteorder": sys.byteorder,
+                "dictionaries": {name: list(table) for name, table in self.dicts.items()},
+                "ts_override": {str(k): v for k, v in self.ts_override.items()},
+                "columns": layout,
+            },
+            ensure_ascii=False,
+        ).encode("utf-8")
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as f:
+            f.write(_MAGIC)
+            f.write(_HEADER_LEN.pack(len(header)))
+            f.write(header)
+            for packed in payloads:
+                f.write(packed)
+        return len(self.ts_us)
+
+
+class ColumnarSegment:
+    """Read side of a ``.tbcol`` segment; columns are decompressed on first access."""
+
+    def __init__(self, path: Path) -> None:
+        data = path.read_bytes()
+        if not data.startswith(_MAGIC):
+            raise ValueError(f"not a tracebridge columnar segment: {path}")
+        (header_len,) = _HEADER_LEN.unpack_from(data, len(_MAGIC))
+        start = len(_MAGIC) + _HEADER_LEN.size
+        self._header = json.loads(data[start : start + header_len])
+        if self._header.get("schema") != COLUMNAR_SCHEMA:
+            raise ValueError(f"unsupported columnar schema: {self._header.get('schema')}")
+        self._data = memoryview(data)[start + header_len :]
+        self._cache: dict[str, Any] = {}
+        self.rows: int = self._header["rows"]
+        self.dictionaries: dict[str, list[str]] = self._header["dictionaries"]
+
+    def column(self, name: str) -> Any:
+        """Typed array for numeric and dictionary-coded columns, list of bytes for blobs."""
+        if name in self._cache:
+            return self._cache[name]
+        spec = self._header["columns"][name]
+        raw = zlib.decompress(self._data[spec["offset"] : spec["offset"] + spec["length"]])
+        if spec["type"] == "lines":
+            values: Any = raw.split(b"\n") if self.rows else []
+        else:
+            values = array(spec["type"])
+            values.frombytes(raw)
+            if self._header["byteorder"] != sys.byteorder:
+                values.byteswap()
+        self._cache[name] = values
+        return values
+
+    def decoded(self, name: str) -> list[Any]:
+        """Column values as plain Python objects (dictionary codes resolved, nulls as None)."""
+        if name in self.dictionaries:
+            table = self.dictionaries[name]
+            return [table[code] for code in self.column(name)]
+        if name in _INT_COLUMNS:
+            return [None if v == _NULL else v for v in self.column(name)]
+        if name == "ts":
+            return [
+                ts if isinstance(ts, str) else ts.isoformat().replace("+00:00", "Z")
+                for ts in self._timestamps()
+            ]
+        if name == "event_id":
+            return [v.decode("utf-8") for v in self.column("event_id")]
+        if name == "attrs":
+            return [from_json(v) for v in self.column("attrs")]
+        raise KeyError(name)
+
+    def _timestamps(self) -> list[datetime | str]:
+        # UTC datetimes from the ts column, or the verbatim text for non-canonical stamps.
+        overrides = self._header["ts_override"]
+        out: list[datetime | str] = []
+        for i, micros in enumerate(self.column("ts_us")):
+            text = overrides.get(str(i))
+            out.append(text if text is not None else micros_to_ts(micros))
+        return out
+
+    def iter_records(self, fields: Iterable[str]) -> Iterator[dict[str, Any]]:
+        wanted = tuple(fields)
+        columns = [self.decoded(f) for f in wanted]
+        for values in zip(*columns):
+            yield dict(zip(wanted, values))
+
+    def iter_json_lines(self) -> Iterator[bytes]:
+        names = ("event_id", "run_id", "sequence_id", "kind", "actor", "attrs") + _INT_COLUMNS[1:]
+        for rec, ts in zip(self.iter_records(names), self._timestamps()):
+            rec["ts"] = ts
+            if not isinstance(ts, datetime):
+                # Non-canonical stamp: let pydantic reproduce it through the model.
+                yield TraceEvent.model_validate(rec).model_dump_json().encode("utf-8")
+                continue
+            yield dump_event_json(**rec)
+
+    def iter_events(self) -> Iterator[TraceEvent]:
+        for line in self.iter_json_lines():
+            yield TraceEvent.model_validate(from_json(line))
+
+
+def jsonl_to_columnar(jsonl_path: Path, out_path: Path) -> int:
+    builder = _SegmentBuilder()
+    with open_binary(jsonl_path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                builder.add(from_json(line))
+    return builder.write(out_path)
+
+
+def columnar_to_jsonl(segment_path: Path, out_path: Path) -> int:
+    segment = ColumnarSegment(segment_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with open_binary(out_path, "wb") as f:
+        for line in segment.iter_json_lines():
+            f.write(line + b"\n")
+            n += 1
+    return n
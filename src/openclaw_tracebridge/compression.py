@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import lzma
+import zlib
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import IO, Any, BinaryIO
+
+# Compressed files are recognised by extension. Every codec here decodes a concatenation of
+# complete members/streams as one file, which is what lets writers append compressed frames.
+_CODECS: dict[str, tuple[Any, Callable[[bytes], bytes], Callable[[], Any]]] = {
+    ".gz": (gzip, lambda data: gzip.compress(data, compresslevel=6, mtime=0), lambda: zlib.decompressobj(31)),
+    ".xz": (lzma, lzma.compress, lzma.LZMADecompressor),
+    ".bz2": (bz2, bz2.compress, bz2.BZ2Decompressor),
+}
+COMPRESSED_SUFFIXES = tuple(_CODECS)
+
+
+def compression_suffix(path: Path) -> str | None:
+    suffix = path.suffix.lower()
+    return suffix if suffix in _CODECS else None
+
+
+def strip_compression_suffix(path: Path) -> Path:
+    return path.with_suffix("") if compression_suffix(path) else path
+
+
+def open_binary(path: Path, mode: str = "rb") -> IO[bytes]:
+    """Open ``path`` in binary mode, transparently (de)compressing ``.gz``/``.xz``/``.bz2``."""
+    suffix = compression_suffix(path)
+    if suffix is None:
+        return path.open(mode)
+    return _CODECS[suffix][0].open(path, mode)
+
+
+def open_text(path: Path, mode: str = "r") -> IO[str]:
+    """UTF-8 text counterpart of ``open_binary``."""
+    suffix = compression_suffix(path)
+    if suffix is None:
+        return path.open(mode, encoding="utf-8")
+    return _CODECS[suffix][0].open(path, mode + "t", encoding="utf-8")
+
+
+def compress_frame(path: Path, payload: bytes) -> bytes:
+    """Encode ``payload`` as one self-contained frame for ``path``'s codec (identity if plain)."""
+    suffix = compression_suffix(path)
+    return payload if suffix is None else _CODECS[suffix][1](payload)
+
+
+def read_frame(f: BinaryIO, suffix: str) -> bytes:
+    """Decode the single frame starting at ``f``'s position from an uncompressed handle."""
+    decoder = _CODECS[suffix][2]()
+    out: list[bytes] = []
+    while not decoder.eof:
+        chunk = f.read(1 << 16)
+        if not chunk:
+            raise EOFError("compressed frame ended before the end-of-stream marker")
+        out.append(decoder.decompress(chunk))
+    return b"".join(out)
+
+
+def iter_frames(path: Path) -> Iterator[tuple[int, bytes]]:
+    """Yield ``(raw_offset, payload)`` for each compressed frame of ``path``.
+
+    A frame is one gzip member or xz/bz2 stream; ``JsonlTraceWriter`` writes one per commit.
+    Files produced by other tools are usually a single frame holding everything.
+    """
+    suffix = compression_suffix(path)
+    if suffix is None:
+        raise ValueError(f"not a compressed path: {path}")
+    new_decoder = _CODECS[suffix][2]
+    with path.open("rb") as f:
+        frame_start = 0
+        fed = 0  # raw bytes of the current frame consumed so far
+        decoder = new_decoder()
+        out: list[bytes] = []
+        pending = b""
+        while True:
+            chunk = pending or f.read(1 << 20)
+            pending = b""
+            if not chunk:
+                break
+            out.append(decoder.decompress(chunk))
+            if not decoder.eof:
+                fed += len(chunk)
+                continue
+            unused = decoder.unused_data
+            yield frame_start, b"".join(out)
+            frame_start += fed + len(chunk) - len(unused)
+            fed = 0
+            decoder = new_decoder()
+            out = []
+            # gzip allows trailing zero padding after the last member.
+            pending = unused if unused.strip(b"\0") else b""
+        if fed:
+            raise EOFError(f"truncated compressed frame at byte {frame_start} of {path}")
@@ -5,6 +5,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+from .compression import open_text
+
 
 @dataclass
 class ConsumerSmokeSummary:
@@ -21,7 +23,7 @@ class ConsumerSmokeSummary:
 
 def _iter_jsonl(path: Path) -> list[dict[str, Any]]:
     rows: list[dict[str, Any]] = []
-    with path.open("r", encoding="utf-8") as f:
+    with open_text(path) as f:
         for line in f:
             line = line.strip()
             if not line:
@@ -1,12 +1,36 @@
 from __future__ import annotations
 
+import hashlib
 import json
-from dataclasses import dataclass
+import os
+import shutil
+import tempfile
+from array import array
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from itertools import islice
 from pathlib import Path
-from typing import Any
-
-from ..io import iter_events
-from ..schema import EventKind, TraceEvent
+from typing import IO, Any
+
+from ..batch import EventView, iter_event_batches, iter_event_lines, iter_line_batches
+from ..checkpoint import load_state, only_appended, record_head, save_state
+from ..columnar import is_columnar
+from ..compression import compression_suffix, open_binary, open_text
+from ..external_sort import DEFAULT_SORT_MEMORY_BYTES, iter_sorted_event_lines
+from ..index import load_fresh_index
+from ..io import iter_event_fields, project_event_line, read_segments
+from ..judge import JudgeCache, JudgeConfig
+from ..rewards import RewardInput, reward_modes, score_rewards
+from ..rowstore import RowStoreWriter, is_rowstore_path
+from ..schema import EventKind
+from ..sharding import ShardedWriter, ShardSpec, open_dataset_writer
+
+_STREAM_BATCH_ROWS = 4096
+_PARTITION_BUFFER_BYTES = 32 << 20
+_REWARD_BATCH_ROWS = 256
+DEFAULT_WINDOW_TOKENS = 4096
 
 
 @dataclass
@@ -15,68 +39,123 @@ class ExportSummary:
     rows_written: int
     skipped_missing_content: int
     skipped_unpaired: int
+    # Inputs still waiting for an output at the end of the events. Incremental exports pair
+    # them on a later call; a full export counts them in skipped_unpaired as well.
+    open_turns: int = 0
+    # Per run, the sequence_id of the last agent.output that closed a turn.
+    watermarks: dict[str, int] = field(default_factory=dict)
+
+
+class _EventLog:
+    """Events of the open turn, addressed by their absolute position in the stream.
+
+    Turns are handed out as index ranges into the log instead of copied lists; ``clear``
+    releases everything logged so far without renumbering later events.
+    """
+
+    __slots__ = ("_events", "base")
+
+    def __init__(self) -> None:
+        self._events: list[EventView] = []
+        self.base = 0
+
+    def append(self, event: EventView) -> int:
+        self._events.append(event)
+        return self.base + len(self._events) - 1
+
+    def __getitem__(self, index: int) -> EventView:
+        return self._events[index - self.base]
+
+    def range(self, start: int, stop: int) -> Iterator[EventView]:
+        return islice(self._events, start - self.base, stop - self.base)
+
+    def clear(self) -> None:
+        self.base += len(self._events)
+        self._events.clear()
 
 
 @dataclass
 class _TurnPair:
-    input_event: TraceEvent
-    output_event: TraceEvent
-    middle_events: list[TraceEvent]
+    """One turn as the index range ``[start, stop]`` of a log; valid until the pairer resumes."""
+
+    log: _EventLog
+    start: int
+    stop: int
+
+    @property
+    def input_event(self) -> EventView:
+        return self.log[self.start]
+
+    @property
+    def output_event(self) -> EventView:
+        return self.log[self.stop]
 
+    @property
+    def middle_events(self) -> Iterator[EventView]:
+        return self.log.range(self.start + 1, self.stop)
 
-def _content_of(event: TraceEvent) -> str:
+
+def _content_of(event: EventView) -> str:
     content = event.attrs.get("content")
     return str(content).strip() if isinstance(content, str) else ""
 
 
-def _iter_turn_pairs(events: list[TraceEvent]) -> tuple[list[_TurnPair], int, int]:
-    ordered = sorted(events, key=lambda e: e.sequence_id)
+class _OutOfOrder(Exception):
+    """Input is not in sequence_id order; the streaming pass cannot pair it."""
 
-    pairs: list[_TurnPair] = []
-    pending_input: TraceEvent | None = None
-    middle: list[TraceEvent] = []
-    skipped_missing = 0
-    skipped_unpaired = 0
 
-    for event in ordered:
-        if event.kind == EventKind.AGENT_INPUT:
-            if pending_input is not None:
-                skipped_unpaired += 1
-            pending_input = event
-            middle = []
-            continue
+class _TurnPairer:
+    """Pairs each ``agent.input`` with the next ``agent.output`` in one pass over the events,
+    holding only the open turn's middle events."""
 
-        if pending_input is None:
-            continue
+    def __init__(self) -> None:
+        self.skipped_missing = 0
+        self.skipped_unpaired = 0
+        self.open_turns = 0
+        self.closed: dict[str, int] = {}
 
-        middle.append(event)
+    def pairs(self, events: Iterable[EventView]) -> Iterator[_TurnPair]:
+        log = _EventLog()
+        pending_input: int | None = None
 
-        if event.kind == EventKind.AGENT_OUTPUT:
-            input_text = _content_of(pending_input)
-            output_text = _content_of(event)
-            if not input_text or not output_text:
-                skipped_missing += 1
-                pending_input = None
-                middle = []
+        for event in events:
+            if event.kind == EventKind.AGENT_INPUT:
+                if pending_input is not None:
+                    self.skipped_unpaired += 1
+                log.clear()
+                pending_input = log.append(event)
                 continue
 
-            pairs.append(
-                _TurnPair(
-                    input_event=pending_input,
-                    output_event=event,
-                    middle_events=middle[:-1],  # exclude output event itself
-                )
-            )
-            pending_input = None
-            middle = []
+            if pending_input is None:
+                continue
+
+            index = log.append(event)
+            if event.kind == EventKind.AGENT_OUTPUT:
+                input_text = _content_of(log[pending_input])
+                output_text = _content_of(event)
+                if input_text and output_text:
+                    yield _TurnPair(log, pending_input, index)
+                else:
+                    self.skipped_missing += 1
+                self.closed[event.run_id] = event.sequence_id
+                pending_input = None
+                log.clear()
+
+        if pending_input is not None:
+            self.open_turns += 1
 
-    if pending_input is not None:
-        skipped_unpaired += 1
 
-    return pairs, skipped_missing, skipped_unpaired
+def _in_sequence_order(events: Iterable[EventView]) -> Iterator[EventView]:
+    last = None
+    for event in events:
+        seq = event.sequence_id
+        if last is not None and seq < last:
+            raise _OutOfOrder
+        last = seq
+        yield event
 
 
-def _count_middle_events(middle: list[TraceEvent]) -> dict[str, int]:
+def _count_middle_events(middle: Iterable[EventView]) -> dict[str, int]:
     counts: dict[str, int] = {}
     for e in middle:
         key = str(e.kind)
@@ -84,111 +163,636 @@ def _count_middle_events(middle: list[TraceEvent]) -> dict[str, int]:
     return counts
 
 
-def _heuristic_reward(pair: _TurnPair) -> float:
-    output = _content_of(pair.output_event).lower()
-    counts = _count_middle_events(pair.middle_events)
+class _PairFeatures:
+    """Per-pair values shared by every output format, computed once per pair."""
+
+    __slots__ = ("input_text", "middle_counts", "output_text", "pair")
+
+    def __init__(self, pair: _TurnPair) -> None:
+        self.pair = pair
+        self.input_text = _content_of(pair.input_event)
+        self.output_text = _content_of(pair.output_event)
+        self.middle_counts = _count_middle_events(pair.middle_events)
+
+    def reward_input(self) -> RewardInput:
+        return RewardInput(self.output_text, self.middle_counts, self.input_text)
+
+
+def _stream_events(events_path: Path, run_id: str | None) -> Iterator[EventView]:
+    for batch in iter_event_batches(events_path, batch_size=_STREAM_BATCH_ROWS, run_id=run_id):
+        yield from batch
+
+
+def _sorted_events(events_path: Path, run_id: str | None, memory_budget_bytes: int) -> Iterator[EventView]:
+    lines = iter_sorted_event_lines(events_path, run_id=run_id, memory_budget_bytes=memory_budget_bytes)
+    for batch in iter_line_batches(lines, _STREAM_BATCH_ROWS):
+        yield from batch
+
+
+# Row ids are anchored on the input event's sequence_id rather than a running counter, so a
+# turn keeps its id when earlier or later events change and across incremental exports.
+def _messages_row(f: _PairFeatures, reward_mode: str) -> dict[str, Any]:
+    pair = f.pair
+    return {
+        "schema": "tracebridge.agent_lightning.messages.v0",
+        "id": f"msgpair_{pair.input_event.run_id}_{pair.input_event.sequence_id:06d}",
+        "run_id": pair.input_event.run_id,
+        "messages": [
+            {"role": "user", "content": f.input_text},
+            {"role": "assistant", "content": f.output_text},
+        ],
+        "metadata": {
+            "input_event_id": pair.input_event.event_id,
+            "output_event_id": pair.output_event.event_id,
+            "input_sequence_id": pair.input_event.sequence_id,
+            "output_sequence_id": pair.output_event.sequence_id,
+            "middle_counts": f.middle_counts,
+            "input_token_estimate": pair.input_event.token_estimate,
+            "output_token_estimate": pair.output_event.token_estimate,
+            "cost_usd_micros": (pair.input_event.cost_usd_micros or 0)
+            + (pair.output_event.cost_usd_micros or 0),
+        },
+    }
+
+
+def _triplet_row(f: _PairFeatures, reward_mode: str) -> dict[str, Any]:
+    pair = f.pair
+    return {
+        "schema": "tracebridge.agent_lightning.triplet.v0",
+        "id": f"triplet_{pair.input_event.run_id}_{pair.input_event.sequence_id:06d}",
+        "run_id": pair.input_event.run_id,
+        "state_text": f.input_text,
+        "action_text": f.output_text,
+        "reward": None,  # scored in batches by _write_targets
+        "metadata": {
+            "input_event_id": pair.input_event.event_id,
+            "output_event_id": pair.output_event.event_id,
+            "input_sequence_id": pair.input_event.sequence_id,
+            "output_sequence_id": pair.output_event.sequence_id,
+            "middle_counts": f.middle_counts,
+            "reward_mode": reward_mode,
+        },
+    }
+
+
+def blocks_path_for(out_path: Path) -> Path:
+    return out_path.with_name(f"{out_path.name}.blocks.jsonl")
+
+
+def _estimate_tokens(text: str) -> int:
+    # Event token_estimate can be the whole request's usage, so windows are sized by text.
+    return max(1, len(text) // 4) if text else 0
+
+
+def _turn_messages(f: _PairFeatures) -> tuple[list[dict[str, Any]], int]:
+    messages: list[dict[str, Any]] = [{"role": "user", "content": f.input_text}]
+    tokens = _estimate_tokens(f.input_text)
+    for event in f.pair.middle_events:
+        if event.kind == EventKind.TOOL_CALL:
+            message: dict[str, Any] = {"role": "assistant", "content": _content_of(event)}
+            if event.attrs.get("tool_calls"):
+                message["tool_calls"] = event.attrs["tool_calls"]
+        elif event.kind == EventKind.TOOL_RESULT:
+            message = {"role": "tool", "content": _content_of(event)}
+        else:
+            continue
+        messages.append(message)
+        tokens += _estimate_tokens(message["content"])
+    messages.append({"role": "assistant", "content": f.output_text})
+    return messages, tokens + _estimate_tokens(f.output_text)
+
+
+class _TrajectoryBuilder:
+    """Rows of the ``trajectories`` format: each closed turn together with the run's preceding
+    turns, as many as fit in the target's ``window_tokens``.
+
+    A turn's messages (user, tool calls and results, assistant) are written once to a
+    content-addressed block table next to the output (``<out>.blocks.jsonl``). Rows list block
+    ids, so consecutive windows share their common turns instead of repeating them and the
+    dataset grows linearly with the number of turns.
+    """
+
+    def __init__(self, target: ExportTarget) -> None:
+        self.window_tokens = target.window_tokens
+        self._blocks = open_text(blocks_path_for(target.out_path), "w")
+        self._seen: set[str] = set()
+        self._windows: dict[str, deque[tuple[str, int]]] = {}
+        self._window_tokens: dict[str, int] = {}
+
+    def __call__(self, f: _PairFeatures, reward_mode: str) -> dict[str, Any]:
+        pair = f.pair
+        run_id = pair.input_event.run_id
+        messages, tokens = _turn_messages(f)
+        canonical = json.dumps(messages, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        block_id = "blk_" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:24]
+        if block_id not in self._seen:
+            self._seen.add(block_id)
+            block = {"id": block_id, "token_estimate": tokens, "messages": messages}
+            self._blocks.write(json.dumps(block, ensure_ascii=False) + "\n")
+
+        window = self._windows.setdefault(run_id, deque())
+        window.append((block_id, tokens))
+        total = self._window_tokens.get(run_id, 0) + tokens
+        while len(window) > 1 and total > self.window_tokens:
+            total -= window.popleft()[1]
+        self._window_tokens[run_id] = total
+
+        return {
+            "schema": "tracebridge.agent_lightning.trajectory.v0",
+            "id": f"traj_{run_id}_{pair.input_event.sequence_id:06d}",
+            "run_id": run_id,
+            "blocks": [b for b, _ in window],
+            "token_estimate": total,
+            "reward": None,  # scored in batches by _write_targets
+            "metadata": {
+                "input_event_id": pair.input_event.event_id,
+                "output_event_id": pair.output_event.event_id,
+                "input_sequence_id": pair.input_event.sequence_id,
+                "output_sequence_id": pair.output_event.sequence_id,
+                "turns": len(window),
+                "middle_counts": f.middle_counts,
+                "reward_mode": reward_mode,
+            },
+        }
+
+    def close(self) -> None:
+        self._blocks.close()
+
+
+# Output formats by name; a new format only needs a row builder here.
+_ROW_BUILDERS: dict[str, Callable[[_PairFeatures, str], dict[str, Any]]] = {
+    "messages": _messages_row,
+    "triplets": _triplet_row,
+}
+# Formats whose rows depend on earlier turns: built per target and closed after the pass.
+_WINDOW_BUILDERS: dict[str, Callable[[ExportTarget], _TrajectoryBuilder]] = {
+    "trajectories": _TrajectoryBuilder,
+}
+EXPORT_FORMATS = tuple(_ROW_BUILDERS) + tuple(_WINDOW_BUILDERS)
+# Formats whose rows carry a "reward" filled in from the target's reward mode.
+_REWARDED_FORMATS = frozenset({"triplets", "trajectories"})
+
+
+@dataclass(frozen=True)
+class ExportTarget:
+    format: str
+    out_path: Path
+    reward_mode: str = "none"
+    window_tokens: int = DEFAULT_WINDOW_TOKENS
+    shards: ShardSpec | None = None
+    judge: JudgeConfig | None = None  # for reward_mode="judge"; None reads TRACEBRIDGE_JUDGE_*
+
+
+def _check_targets(targets: list[ExportTarget]) -> None:
+    if not targets:
+        raise ValueError("at least one export target is required")
+    for target in targets:
+        if target.format not in EXPORT_FORMATS:
+            raise ValueError(f"unknown export format: {target.format}")
+        if target.reward_mode not in reward_modes():
+            raise ValueError(f"unknown reward mode: {target.reward_mode}")
+        if target.judge is not None and target.reward_mode != "judge":
+            raise ValueError(f"judge= is only used by reward mode judge, not {target.reward_mode}")
+    if len({t.out_path for t in targets}) != len(targets):
+        raise ValueError("export targets must write to distinct paths")
+
+
+def _write_targets(targets: list[ExportTarget], pairs: Iterable[_TurnPair], append: bool = False) -> int:
+    # One pass over the pairs feeds every target; the shared features are computed once per pair.
+    builders: list[Callable[[_PairFeatures, str], dict[str, Any]]] = []
+    windowed: list[_TrajectoryBuilder] = []
+    handles: list[IO[str] | RowStoreWriter | ShardedWriter] = []
+    caches: list[JudgeCache] = []
+    n = 0
+    try:
+        for target in targets:
+            target.out_path.parent.mkdir(parents=True, exist_ok=True)
+            handles.append(open_dataset_writer(target.out_path, target.shards, "a" if append else "w"))
+            if target.format in _WINDOW_BUILDERS:
+                windowed.append(_WINDOW_BUILDERS[target.format](target))
+                builders.append(windowed[-1])
+            else:
+                builders.append(_ROW_BUILDERS[target.format])
+
+        # Rows are held for up to _REWARD_BATCH_ROWS pairs so each reward mode scores the
+        # batch in one call; the pairs themselves are not kept.
+        rewarded = [
+            (j, (t.reward_mode, t.judge)) for j, t in enumerate(targets) if t.format in _REWARDED_FORMATS
+        ]
+        # Reward options per scorer. A judge's cache is opened once for the whole pass, not once
+        # per reward batch.
+        options: dict[tuple[str, JudgeConfig | None], dict[str, Any]] = {}
+        for mode, judge in dict.fromkeys(scorer for _, scorer in rewarded):
+            options[(mode, judge)] = {}
+            if judge is not None:
+                options[(mode, judge)]["judge"] = judge
+                if judge.cache_path is not None:
+                    caches.append(JudgeCache(judge.cache_path))
+                    options[(mode, judge)]["cache"] = caches[-1]
+        inputs: list[RewardInput] = []
+        rows: list[list[dict[str, Any]]] = []
+
+        def flush() -> None:
+            for (mode, judge), mode_options in options.items():
+                scores = score_rewards(mode, inputs, **mode_options)
+                for j, scorer in rewarded:
+                    if scorer == (mode, judge):
+                        for pair_rows, score in zip(rows, scores):
+                            pair_rows[j]["reward"] = score
+            for pair_rows in rows:
+                for row, f in zip(pair_rows, handles):
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            inputs.clear()
+            rows.clear()
+
+        for pair in pairs:
+            features = _PairFeatures(pair)
+            inputs.append(features.reward_input())
+            rows.append([build_row(features, t.reward_mode) for t, build_row in zip(targets, builders)])
+            n += 1
+            if len(rows) >= _REWARD_BATCH_ROWS:
+                flush()
+        flush()
+    finally:
+        for f in handles:
+            f.close()
+        for builder in windowed:
+            builder.close()
+        for cache in caches:
+            cache.close()
+    return n
+
+
+def _export_run(
+    events_path: Path,
+    targets: list[ExportTarget],
+    run_id: str | None,
+    sort_memory_bytes: int,
+    append: bool = False,
+) -> ExportSummary:
+    # Export one run's events. Importer output is already in sequence_id order, so rows are
+    # written as each turn closes and memory stays O(longest turn). If the stream turns out not
+    # to be monotonic, the partial output is discarded and the run is re-exported through an
+    # external sort, which holds at most sort_memory_bytes of lines in memory.
+    sizes = [t.out_path.stat().st_size if t.out_path.exists() else 0 for t in targets]
+    pairer = _TurnPairer()
+    try:
+        events = _in_sequence_order(_stream_events(events_path, run_id))
+        n = _write_targets(targets, pairer.pairs(events), append)
+    except _OutOfOrder:
+        if append:
+            # Appended data starts a new line (or compressed frame), so cutting back to the
+            # old size drops exactly the partial rows.
+            for target, size in zip(targets, sizes):
+                os.truncate(target.out_path, size)
+        pairer = _TurnPairer()
+        events = _sorted_events(events_path, run_id, sort_memory_bytes)
+        n = _write_targets(targets, pairer.pairs(events), append)
+    return ExportSummary(
+        format="+".join(t.format for t in targets),
+        rows_written=n,
+        skipped_missing_content=pairer.skipped_missing,
+        skipped_unpaired=pairer.skipped_unpaired,
+        open_turns=pairer.open_turns,
+        watermarks=pairer.closed,
+    )
 
-    reward = 0.4
-    if output:
-        reward += 0.25
-    if counts.get(str(EventKind.TOOL_RESULT), 0) > 0:
-        reward += 0.2
-    if counts.get(str(EventKind.SYSTEM_EVENT), 0) > 0:
-        reward -= 0.1
 
-    if any(word in output for word in ["error", "failed", "exception", "timeout"]):
-        reward -= 0.3
+def _export_run_job(job: tuple[Path, list[ExportTarget], int]) -> ExportSummary:
+    events_path, targets, sort_memory_bytes = job
+    return _export_run(events_path, targets, None, sort_memory_bytes)
+
+
+def _run_order(events_path: Path) -> list[str]:
+    """Distinct run_ids in order of first appearance, from fresh indexes when every segment has one."""
+    indexes = [load_fresh_index(segment) for segment in read_segments(events_path)]
+    if all(index is not None for index in indexes):
+        return list(dict.fromkeys(index.runs[code] for index in indexes for code in index.run))
+    return list(dict.fromkeys(str(rec["run_id"]) for rec in iter_event_fields(events_path, ("run_id",))))
+
+
+def _partition_by_run(events_path: Path, runs: list[str], part_dir: Path) -> list[Path]:
+    parts = [part_dir / f"part{i:06d}.jsonl" for i in range(len(runs))]
+    slot = {run: i for i, run in enumerate(runs)}
+    pending: dict[int, list[bytes]] = {}
+    buffered = 0
+
+    def spill() -> None:
+        for i, lines in pending.items():
+            with parts[i].open("ab") as f:
+                f.write(b"".join(lines))
+        pending.clear()
+
+    # Per-run lines are buffered and appended in bulk, so a file with thousands of runs never
+    # needs thousands of open handles.
+    for line in iter_event_lines(events_path):
+        run = str(project_event_line(line, ("run_id",), True, False)["run_id"])
+        pending.setdefault(slot[run], []).append(line + b"\n")
+        buffered += len(line) + 1
+        if buffered >= _PARTITION_BUFFER_BYTES:
+            spill()
+            buffered = 0
+    spill()
+    return parts
+
+
+def _join_blocks(out_path: Path, parts: list[Path]) -> None:
+    # Runs can produce identical turns; the joined table keeps the first copy of each block.
+    seen: set[str] = set()
+    with open_text(out_path, "w") as dst:
+        for part in parts:
+            with open_text(part) as src:
+                for line in src:
+                    block_id = json.loads(line)["id"]
+                    if block_id not in seen:
+                        seen.add(block_id)
+                        dst.write(line)
+
+
+def _export(
+    events_path: Path,
+    targets: list[ExportTarget],
+    run_id: str | None,
+    sort_memory_bytes: int,
+    workers: int | None,
+    append: bool,
+) -> ExportSummary:
+    runs = [run_id] if run_id is not None else _run_order(events_path)
+    if len(runs) <= 1:
+        return _export_run(events_path, targets, run_id, sort_memory_bytes, append)
+
+    with tempfile.TemporaryDirectory(prefix="tracebridge-export-") as tmp:
+        part_dir = Path(tmp)
+        parts = _partition_by_run(events_path, runs, part_dir)
+        jobs = [
+            (
+                part,
+                [
+                    replace(t, out_path=part_dir / f"{part.stem}.{i}.out", shards=None)
+                    for i, t in enumerate(targets)
+                ],
+                sort_memory_bytes,
+            )
+            for part in parts
+        ]
+        if workers == 1:
+            results = [_export_run_job(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_export_run_job, jobs, chunksize=1))
+
+        for i, target in enumerate(targets):
+            target.out_path.parent.mkdir(parents=True, exist_ok=True)
+            with open_dataset_writer(target.out_path, target.shards, "a" if append else "w") as dst:
+                for _, part_targets, _ in jobs:
+                    with open_text(part_targets[i].out_path) as src:
+                        if isinstance(dst, (RowStoreWriter, ShardedWriter)):
+                            for line in src:  # these writers need whole rows
+                                dst.write(line)
+                        else:
+                            shutil.copyfileobj(src, dst)
+            if target.format in _WINDOW_BUILDERS:
+                part_blocks = [blocks_path_for(part_targets[i].out_path) for _, part_targets, _ in jobs]
+                _join_blocks(blocks_path_for(target.out_path), part_blocks)
 
-    return max(0.0, min(1.0, round(reward, 4)))
+    return ExportSummary(
+        format="",
+        rows_written=sum(r.rows_written for r in results),
+        skipped_missing_content=sum(r.skipped_missing_content for r in results),
+        skipped_unpaired=sum(r.skipped_unpaired for r in results),
+        open_turns=sum(r.open_turns for r in results),
+        watermarks={run: seq for r in results for run, seq in r.watermarks.items()},
+    )
 
 
-def _write_jsonl(path: Path, rows: list[dict[str, Any]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        for row in rows:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+WATERMARK_SCHEMA = "tracebridge.export.watermark.v0"
 
 
-def export_to_agent_lightning_messages(events_path: Path, out_path: Path) -> ExportSummary:
-    events = list(iter_events(events_path))
-    pairs, skipped_missing, skipped_unpaired = _iter_turn_pairs(events)
+@dataclass
+class ExportWatermark:
+    events_path: str
+    run_id: str | None
+    targets: list[list[str]]
+    offset: int
+    head_bytes: int
+    head_sha256: str
+    runs: dict[str, int]
+    schema: str = WATERMARK_SCHEMA
 
-    rows: list[dict[str, Any]] = []
-    for idx, pair in enumerate(pairs, start=1):
-        counts = _count_middle_events(pair.middle_events)
-        rows.append(
-            {
-                "schema": "tracebridge.agent_lightning.messages.v0",
-                "id": f"msgpair_{idx:06d}",
-                "run_id": pair.input_event.run_id,
-                "messages": [
-                    {"role": "user", "content": _content_of(pair.input_event)},
-                    {"role": "assistant", "content": _content_of(pair.output_event)},
-                ],
-                "metadata": {
-                    "input_event_id": pair.input_event.event_id,
-                    "output_event_id": pair.output_event.event_id,
-                    "input_sequence_id": pair.input_event.sequence_id,
-                    "output_sequence_id": pair.output_event.sequence_id,
-                    "middle_counts": counts,
-                    "input_token_estimate": pair.input_event.token_estimate,
-                    "output_token_estimate": pair.output_event.token_estimate,
-                    "cost_usd_micros": (pair.input_event.cost_usd_micros or 0)
-                    + (pair.output_event.cost_usd_micros or 0),
-                },
-            }
+
+def watermark_path_for(out_path: Path) -> Path:
+    return out_path.with_name(f"{out_path.name}.wm.json")
+
+
+def load_export_watermark(path: Path) -> ExportWatermark | None:
+    return load_state(path, ExportWatermark, WATERMARK_SCHEMA)
+
+
+def save_export_watermark(path: Path, watermark: ExportWatermark) -> None:
+    save_state(path, watermark)
+
+
+def _target_spec(targets: list[ExportTarget]) -> list[list[str]]:
+    return [[t.format, t.reward_mode, str(t.out_path)] for t in targets]
+
+
+def _resume_point(
+    events_path: Path,
+    targets: list[ExportTarget],
+    run_id: str | None,
+    watermark: ExportWatermark | None,
+) -> ExportWatermark | None:
+    if watermark is None or watermark.run_id != run_id:
+        return None
+    if watermark.events_path != str(events_path) or watermark.targets != _target_spec(targets):
+        return None
+    if not all(t.out_path.exists() for t in targets):
+        return None
+    # Rotation only appends to the segments read back to back, which is what the offset counts.
+    segments = read_segments(events_path)
+    size = sum(p.stat().st_size for p in segments) if compression_suffix(events_path) is None else None
+    if not only_appended(segments[0], size, watermark.offset, watermark.head_bytes, watermark.head_sha256):
+        return None
+    return watermark
+
+
+class _NewEvents:
+    """Events appended since the last watermark, with their byte offsets in the source stream
+    (the rotated segments and the active file read back to back)."""
+
+    def __init__(self) -> None:
+        self.offsets = array("q")
+        self.sequence_ids = array("q")
+        self.is_input = array("b")
+        self.runs: list[str] = []
+        self.end = 0
+
+    def resume_offset(self, watermarks: dict[str, int]) -> int:
+        # The next export restarts at the earliest turn that may still pair: the last
+        # agent.input of each run past its watermark. Anything else past a watermark can never
+        # start a turn (the pairer ignores events until an input), so a trailing heartbeat in
+        # an idle run does not hold the offset back. With no open turn, resume at the end.
+        open_turns: dict[str, int] = {}
+        for offset, run, seq, is_input in zip(self.offsets, self.runs, self.sequence_ids, self.is_input):
+            if is_input and seq > watermarks.get(run, 0):
+                open_turns[run] = offset
+        return min(open_turns.values(), default=self.end)
+
+
+def _copy_new_events(
+    events_path: Path, start: int, run_id: str | None, watermarks: dict[str, int], out: Path
+) -> _NewEvents:
+    new = _NewEvents()
+    new.end = start
+    position = 0
+    with out.open("wb") as dst:
+        for segment in read_segments(events_path):
+            if compression_suffix(segment) is None and position + segment.stat().st_size <= start:
+                position += segment.stat().st_size
+                continue
+            with open_binary(segment) as src:
+                if position < start:
+                    src.seek(start - position)
+                    position += src.tell()
+                for line in src:
+                    if not line.endswith(b"\n"):
+                        return new  # a writer is mid-line; leave it for the next export
+                    offset = position
+                    position += len(line)
+                    new.end = position
+                    body = line.strip()
+                    if not body:
+                        continue
+                    rec = project_event_line(body, ("run_id", "sequence_id", "kind"), True, False)
+                    run = str(rec["run_id"])
+                    seq = int(rec["sequence_id"] or 0)
+                    if (run_id is not None and run != run_id) or seq <= watermarks.get(run, 0):
+                        continue
+                    dst.write(body + b"\n")
+                    new.offsets.append(offset)
+                    new.sequence_ids.append(seq)
+                    new.is_input.append(rec["kind"] == EventKind.AGENT_INPUT)
+                    new.runs.append(run)
+    return new
+
+
+def _export_incremental(
+    events_path: Path,
+    targets: list[ExportTarget],
+    run_id: str | None,
+    sort_memory_bytes: int,
+    workers: int | None,
+    watermark_path: Path,
+) -> ExportSummary:
+    if is_columnar(events_path):
+        raise ValueError("incremental export needs a JSONL events file")
+    if any(t.format in _WINDOW_BUILDERS for t in targets):
+        # A window reaches back into turns before the watermark, which are not re-read.
+        raise ValueError("incremental export does not support windowed formats (trajectories)")
+    if any(t.shards is not None or is_rowstore_path(t.out_path) for t in targets):
+        raise ValueError("incremental export appends to one JSONL file per target; no shards or .tbrows")
+    resume = _resume_point(events_path, targets, run_id, load_export_watermark(watermark_path))
+    watermarks = dict(resume.runs) if resume is not None else {}
+
+    with tempfile.TemporaryDirectory(prefix="tracebridge-export-") as tmp:
+        delta = Path(tmp) / "new.jsonl"
+        new = _copy_new_events(events_path, resume.offset if resume else 0, run_id, watermarks, delta)
+        if resume is not None and not new.runs:
+            summary = ExportSummary(format="", rows_written=0, skipped_missing_content=0, skipped_unpaired=0)
+        else:
+            summary = _export(delta, targets, run_id, sort_memory_bytes, workers, append=resume is not None)
+
+    watermarks.update(summary.watermarks)
+    offset = new.resume_offset(watermarks)
+    head_bytes, head_sha256 = record_head(read_segments(events_path)[0], offset)
+    save_export_watermark(
+        watermark_path,
+        ExportWatermark(
+            events_path=str(events_path),
+            run_id=run_id,
+            targets=_target_spec(targets),
+            offset=offset,
+            head_bytes=head_bytes,
+            head_sha256=head_sha256,
+            runs=watermarks,
+        ),
+    )
+    return replace(summary, watermarks=watermarks)
+
+
+def export_agent_lightning(
+    events_path: Path,
+    targets: list[ExportTarget],
+    *,
+    run_id: str | None = None,
+    sort_memory_bytes: int = DEFAULT_SORT_MEMORY_BYTES,
+    workers: int | None = 1,
+    incremental: bool = False,
+    watermark_path: Path | None = None,
+) -> list[ExportSummary]:
+    """Write every target (format, reward mode, path) from a single pairing pass.
+
+    Turns never span runs, so each run is paired on its own: rows are grouped by run in order
+    of first appearance, with ids anchored on each turn's input sequence_id. Multi-run files are
+    split into per-run parts that a process pool exports independently before the outputs are
+    joined.
+
+    With ``incremental``, a watermark sidecar (``<first out>.wm.json`` by default) records the
+    last paired ``output_sequence_id`` per run and where in the events file to resume; later
+    calls read only events past it and append the newly completed turns to the outputs. A
+    missing or stale watermark falls back to a full export. Inputs still waiting for their output
+    are reported as ``open_turns`` rather than ``skipped_unpaired``, since a later call pairs them.
+    """
+    _check_targets(targets)
+    if incremental:
+        summary = _export_incremental(
+            events_path,
+            targets,
+            run_id,
+            sort_memory_bytes,
+            workers,
+            watermark_path or watermark_path_for(targets[0].out_path),
         )
+    else:
+        summary = _export(events_path, targets, run_id, sort_memory_bytes, workers, append=False)
+        summary = replace(summary, skipped_unpaired=summary.skipped_unpaired + summary.open_turns)
+    return [replace(summary, format=t.format) for t in targets]
 
-    _write_jsonl(out_path, rows)
-    return ExportSummary(
-        format="messages",
-        rows_written=len(rows),
-        skipped_missing_content=skipped_missing,
-        skipped_unpaired=skipped_unpaired,
+
+def export_to_agent_lightning_messages(
+    events_path: Path,
+    out_path: Path,
+    run_id: str | None = None,
+    sort_memory_bytes: int = DEFAULT_SORT_MEMORY_BYTES,
+    workers: int | None = 1,
+    incremental: bool = False,
+) -> ExportSummary:
+    (summary,) = export_agent_lightning(
+        events_path,
+        [ExportTarget("messages", out_path)],
+        run_id=run_id,
+        sort_memory_bytes=sort_memory_bytes,
+        workers=workers,
+        incremental=incremental,
     )
+    return summary
 
 
 def export_to_agent_lightning_triplets(
     events_path: Path,
     out_path: Path,
     reward_mode: str = "none",
+    run_id: str | None = None,
+    sort_memory_bytes: int = DEFAULT_SORT_MEMORY_BYTES,
+    workers: int | None = 1,
+    incremental: bool = False,
 ) -> ExportSummary:
-    events = list(iter_events(events_path))
-    pairs, skipped_missing, skipped_unpaired = _iter_turn_pairs(events)
-
-    rows: list[dict[str, Any]] = []
-    for idx, pair in enumerate(pairs, start=1):
-        counts = _count_middle_events(pair.middle_events)
-
-        reward: float | None
-        if reward_mode == "heuristic-basic":
-            reward = _heuristic_reward(pair)
-        else:
-            reward = None
-
-        rows.append(
-            {
-                "schema": "tracebridge.agent_lightning.triplet.v0",
-                "id": f"triplet_{idx:06d}",
-                "run_id": pair.input_event.run_id,
-                "state_text": _content_of(pair.input_event),
-                "action_text": _content_of(pair.output_event),
-                "reward": reward,
-                "metadata": {
-                    "input_event_id": pair.input_event.event_id,
-                    "output_event_id": pair.output_event.event_id,
-                    "input_sequence_id": pair.input_event.sequence_id,
-                    "output_sequence_id": pair.output_event.sequence_id,
-                    "middle_counts": counts,
-                    "reward_mode": reward_mode,
-                },
-            }
-        )
-
-    _write_jsonl(out_path, rows)
-    return ExportSummary(
-        format="triplets",
-        rows_written=len(rows),
-        skipped_missing_content=skipped_missing,
-        skipped_unpaired=skipped_unpaired,
+    (summary,) = export_agent_lightning(
+        events_path,
+        [ExportTarget("triplets", out_path, reward_mode)],
+        run_id=run_id,
+        sort_memory_bytes=sort_memory_bytes,
+        workers=workers,
+        incremental=incremental,
     )
+    return summary
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import heapq
+import tempfile
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import IO
+
+from .batch import iter_event_lines
+from .compression import open_binary
+from .io import project_event_line
+
+DEFAULT_SORT_MEMORY_BYTES = 256 << 20
+# Rough per-line bookkeeping on top of the line bytes: the key tuple, its str/int and list slots.
+_LINE_OVERHEAD_BYTES = 160
+_KEY_FIELDS = ("run_id", "sequence_id")
+_MAX_MERGE_FANIN = 64  # spill files open at once; beyond this they are pre-merged into one
+
+SortKey = tuple[str, int]
+
+
+def event_sort_key(line: bytes) -> SortKey:
+    rec = project_event_line(line, _KEY_FIELDS, True, False)
+    return str(rec["run_id"]), int(rec["sequence_id"] or 0)
+
+
+def _spill(run: list[tuple[SortKey, int, bytes]], directory: Path, index: int) -> Path:
+    run.sort()
+    path = directory / f"spill{index:012d}.jsonl"
+    with path.open("wb") as f:
+        for _, _, line in run:
+            f.write(line + b"\n")
+    return path
+
+
+def _read_run(f: IO[bytes]) -> Iterator[bytes]:
+    for line in f:
+        yield line.rstrip(b"\n")
+
+
+def _merge(paths: list[Path]) -> Iterator[bytes]:
+    handles = [path.open("rb") for path in paths]
+    try:
+        # Spill files are in input order, so merge() breaking key ties by iterator position
+        # keeps the overall sort stable.
+        yield from heapq.merge(*(_read_run(f) for f in handles), key=event_sort_key)
+    finally:
+        for f in handles:
+            f.close()
+
+
+def _compact(spills: list[Path], directory: Path) -> list[Path]:
+    merged = directory / f"{spills[0].stem}.merged.jsonl"
+    with merged.open("wb") as f:
+        for line in _merge(spills):
+            f.write(line + b"\n")
+    for path in spills:
+        path.unlink()
+    return [merged]
+
+
+def sort_event_lines(
+    lines: Iterable[bytes],
+    *,
+    memory_budget_bytes: int = DEFAULT_SORT_MEMORY_BYTES,
+    tmp_dir: Path | None = None,
+) -> Iterator[bytes]:
+    """Yield event lines ordered by ``(run_id, sequence_id)``, stable for equal keys.
+
+    Lines are buffered until their estimated footprint reaches ``memory_budget_bytes``, then
+    sorted and spilled to a temporary run file; the runs are k-way merged at the end. Input
+    that fits the budget never touches disk.
+    """
+    run: list[tuple[SortKey, int, bytes]] = []
+    used = 0
+    position = 0
+    with tempfile.TemporaryDirectory(prefix="tracebridge-sort-", dir=tmp_dir) as tmp:
+        spills: list[Path] = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            # The position keeps equal keys in input order, within a run and across the merge.
+            run.append((event_sort_key(line), position, line))
+            position += 1
+            used += len(line) + _LINE_OVERHEAD_BYTES
+            if used >= memory_budget_bytes:
+                spills.append(_spill(run, Path(tmp), position))
+                run = []
+                used = 0
+                if len(spills) >= _MAX_MERGE_FANIN:
+                    spills = _compact(spills, Path(tmp))
+
+        if not spills:
+            run.sort()
+            for _, _, line in run:
+                yield line
+            return
+
+        if run:
+            spills.append(_spill(run, Path(tmp), position))
+            run = []
+        yield from _merge(spills)
+
+
+def iter_sorted_event_lines(
+    events_path: Path,
+    *,
+    run_id: str | None = None,
+    memory_budget_bytes: int = DEFAULT_SORT_MEMORY_BYTES,
+) -> Iterator[bytes]:
+    return sort_event_lines(
+        iter_event_lines(events_path, run_id=run_id), memory_budget_bytes=memory_budget_bytes
+    )
+
+
+def sort_events_file(
+    events_path: Path, out_path: Path, *, memory_budget_bytes: int = DEFAULT_SORT_MEMORY_BYTES
+) -> int:
+    """Write ``events_path`` to ``out_path`` ordered by ``(run_id, sequence_id)``."""
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with open_binary(out_path, "wb") as f:
+        for line in iter_sorted_event_lines(events_path, memory_budget_bytes=memory_budget_bytes):
+            f.write(line + b"\n")
+            n += 1
+    return n
@@ -0,0 +1,490 @@
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from pydantic_core import from_json
+
+from .columnar import ColumnarSegment, is_columnar
+from .compression import compression_suffix, iter_frames, open_binary, read_frame
+from .io import project_event_line, read_segments
+from .schema import TraceEvent, ts_to_micros
+
+INDEX_SCHEMA = "tracebridge.event_index.v0"
+_MAGIC = b"TBIDX1\n"
+_HEADER_LEN = struct.Struct("<I")
+DEFAULT_BLOCK_SIZE = 1024
+
+
+def index_path_for(events_path: Path) -> Path:
+    return events_path.with_name(f"{events_path.name}.tbidx")
+
+
+@dataclass
+class EventIndex:
+    """Sidecar over an events JSONL file: per-row byte offsets and keys, kind posting lists
+    and per-block ts bounds, all held in typed arrays.
+
+    For compressed event files ``frame`` holds the raw offset of the frame containing each row
+    and ``offset`` the row's position inside that frame's decompressed bytes.
+    """
+
+    events_size: int
+    events_mtime_ns: int
+    block_size: int
+    kinds: list[str]
+    runs: list[str]
+    offset: array
+    sequence_id: array
+    ts_us: array
+    kind: array
+    run: array
+    by_sequence: array | None
+    postings: dict[str, array]
+    block_ts_min: array
+    block_ts_max: array
+    frame: array | None = None
+
+    def __len__(self) -> int:
+        return len(self.offset)
+
+    def is_fresh(self, events_path: Path) -> bool:
+        try:
+            st = events_path.stat()
+        except OSError:
+            return False
+        return st.st_size == self.events_size and st.st_mtime_ns == self.events_mtime_ns
+
+    def _rows_in_sequence_range(self, lo: int | None, hi: int | None) -> list[int]:
+        if self.by_sequence is None:
+            keys: Any = self.sequence_id
+            start = 0 if lo is None else bisect_left(keys, lo)
+            end = len(keys) if hi is None else bisect_right(keys, hi)
+            return list(range(start, end))
+        seqs = self.sequence_id
+        order = self.by_sequence
+        keyed = _SortedView(seqs, order)
+        start = 0 if lo is None else bisect_left(keyed, lo)
+        end = len(order) if hi is None else bisect_right(keyed, hi)
+        return sorted(order[start:end])
+
+    def select_rows(
+        self,
+        *,
+        kinds: Iterable[str] | None = None,
+        run_id: str | None = None,
+        start_sequence_id: int | None = None,
+        end_sequence_id: int | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> list[int]:
+        """Row numbers (file order) matching every given filter."""
+        rows: Sequence[int]
+        if kinds is not None:
+            merged: set[int] = set()
+            for k in kinds:
+                merged.update(self.postings.get(str(k), ()))
+            rows = sorted(merged)
+        elif start_sequence_id is not None or end_sequence_id is not None:
+            rows = self._rows_in_sequence_range(start_sequence_id, end_sequence_id)
+        else:
+            rows = range(len(self))
+
+        run_code = None
+        if run_id is not None:
+            if run_id not in self.runs:
+                return []
+            run_code = self.runs.index(run_id)
+        t0 = ts_to_micros(since)
+        t1 = ts_to_micros(until)
+        timed = t0 is not None or t1 is not None
+
+        out: list[int] = []
+        seqs, ts, runs = self.sequence_id, self.ts_us, self.run
+        bmin, bmax, bsize = self.block_ts_min, self.block_ts_max, self.block_size
+        i = 0
+        while i < len(rows):
+            check_ts = False
+            if timed:
+                # Candidates are in file order, so one block's rows are the contiguous run [i, j).
+                # Its ts range is tested once: disjoint blocks are skipped whole, and blocks
+                # inside the window skip the per-row ts check.
+                block = rows[i] // bsize
+                j = bisect_left(rows, (block + 1) * bsize, i)
+                lo, hi = bmin[block], bmax[block]
+                if (t0 is not None and hi < t0) or (t1 is not None and lo > t1):
+                    i = j
+                    continue
+                check_ts = (t0 is not None and lo < t0) or (t1 is not None and hi > t1)
+            else:
+                j = len(rows)
+            for row in rows[i:j]:
+                if check_ts and ((t0 is not None and ts[row] < t0) or (t1 is not None and ts[row] > t1)):
+                    continue
+                if run_code is not None and runs[row] != run_code:
+                    continue
+                if start_sequence_id is not None and seqs[row] < start_sequence_id:
+                    continue
+                if end_sequence_id is not None and seqs[row] > end_sequence_id:
+                    continue
+                out.append(row)
+            i = j
+        return out
+
+
+class _SortedView:
+    """Sequence facade so bisect can search sequence_id through the by_sequence permutation."""
+
+    def __init__(self, keys: array, order: array) -> None:
+        self._keys = keys
+        self._order = order
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __getitem__(self, i: int) -> int:
+        return self._keys[self._order[i]]
+
+
+def build_event_index(events_path: Path, *, block_size: int = DEFAULT_BLOCK_SIZE) -> EventIndex:
+    if is_columnar(events_path):
+        raise ValueError(
+            f"{events_path}: columnar segments cannot be indexed; convert back to JSONL with convert-events"
+        )
+    kinds: dict[str, int] = {}
+    runs: dict[str, int] = {}
+    offsets = array("q")
+    seqs = array("q")
+    ts_us = array("q")
+    kind_codes = array("B")
+    run_codes = array("I")
+    fields = ("run_id", "sequence_id", "ts", "kind")
+
+    frames = array("q") if compression_suffix(events_path) else None
+
+    def add(raw: bytes, start: int, frame_start: int) -> None:
+        line = raw.strip()
+        if not line:
+            return
+        rec = project_event_line(line, fields, True, False)
+        kind = str(rec["kind"])
+        run = str(rec["run_id"])
+        offsets.append(start)
+        if frames is not None:
+            frames.append(frame_start)
+        seqs.append(int(rec["sequence_id"] or 0))
+        ts_us.append(ts_to_micros(rec["ts"]) or 0)
+        kind_codes.append(kinds.setdefault(kind, len(kinds)))
+        run_codes.append(runs.setdefault(run, len(runs)))
+
+    st = events_path.stat()
+    if frames is None:
+        pos = 0
+        with events_path.open("rb") as f:
+            for raw in f:
+                add(raw, pos, 0)
+                pos += len(raw)
+    else:
+        for frame_start, payload in iter_frames(events_path):
+            if payload and not payload.endswith(b"\n"):
+                raise ValueError(f"{events_path}: a row straddles compressed frames at byte {frame_start}")
+            pos = 0
+            for raw in payload.splitlines(keepends=True):
+                add(raw, pos, frame_start)
+                pos += len(raw)
+
+    postings: dict[str, array] = {k: array("I") for k in kinds}
+    kind_names = list(kinds)
+    for row, code in enumerate(kind_codes):
+        postings[kind_names[code]].append(row)
+
+    by_sequence = None
+    if any(seqs[i] > seqs[i + 1] for i in range(len(seqs) - 1)):
+        by_sequence = array("I", sorted(range(len(seqs)), key=seqs.__getitem__))
+
+    block_min = array("q")
+    block_max = array("q")
+    for b in range(0, len(ts_us), block_size):
+        chunk = ts_us[b : b + block_size]
+        block_min.append(min(chunk))
+        block_max.append(max(chunk))
+
+    return EventIndex(
+        events_size=st.st_size,
+        events_mtime_ns=st.st_mtime_ns,
+        block_size=block_size,
+        kinds=kind_names,
+        runs=list(runs),
+        offset=offsets,
+        sequence_id=seqs,
+        ts_us=ts_us,
+        kind=kind_codes,
+        run=run_codes,
+        by_sequence=by_sequence,
+        postings=postings,
+        block_ts_min=block_min,
+        block_ts_max=block_max,
+        frame=frames,
+    )
+
+
+def _named_arrays(index: EventIndex) -> dict[str, array]:
+    arrays = {
+        "offset": index.offset,
+        "sequence_id": index.sequence_id,
+        "ts_us": index.ts_us,
+        "kind": index.kind,
+        "run": index.run,
+        "block_ts_min": index.block_ts_min,
+        "block_ts_max": index.block_ts_max,
+    }
+    if index.by_sequence is not None:
+        arrays["by_sequence"] = index.by_sequence
+    if index.frame is not None:
+        arrays["frame"] = index.frame
+    for name, posting in index.postings.items():
+        arrays[f"posting:{name}"] = posting
+    return arrays
+
+
+def save_event_index(index: EventIndex, path: Path) -> None:
+    arrays = _named_arrays(index)
+    layout: dict[str, list[Any]] = {}
+    cursor = 0
+    for name, values in arrays.items():
+        nbytes = len(values) * values.itemsize
+        layout[name] = [values.typecode, cursor, len(values)]
+        cursor += nbytes
+    header = json.dumps(
+        {
+            "schema": INDEX_SCHEMA,
+            "byteorder": sys.byteorder,
+            "events_size": index.events_size,
+            "events_mtime_ns": index.events_mtime_ns,
+            "block_size": index.block_size,
+            "kinds": index.kinds,
+            "runs": index.runs,
+            "arrays": layout,
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+    tmp = path.with_name(f"{path.name}.tmp")
+    with tmp.open("wb") as f:
+        f.write(_MAGIC)
+        f.write(_HEADER_LEN.pack(len(header)))
+        f.write(header)
+        for values in arrays.values():
+            values.tofile(f)
+    tmp.replace(path)
+
+
+def load_event_index(path: Path) -> EventIndex:
+    data = path.read_bytes()
+    if not data.startswith(_MAGIC):
+        raise ValueError(f"not a tracebridge event index: {path}")
+    (header_len,) = _HEADER_LEN.unpack_from(data, len(_MAGIC))
+    body = len(_MAGIC) + _HEADER_LEN.size
+    header = json.loads(data[body : body + header_len])
+    if header.get("schema") != INDEX_SCHEMA:
+        raise ValueError(f"unsupported index schema: {header.get('schema')}")
+    base = body + header_len
+
+    arrays: dict[str, array] = {}
+    for name, (typecode, start, count) in header["arrays"].items():
+        values = array(typecode)
+        values.frombytes(data[base + start : base + start + count * values.itemsize])
+        if header["byteorder"] != sys.byteorder:
+            values.byteswap()
+        arrays[name] = values
+
+    return EventIndex(
+        events_size=header["events_size"],
+        events_mtime_ns=header["events_mtime_ns"],
+        block_size=header["block_size"],
+        kinds=header["kinds"],
+        runs=header["runs"],
+        offset=arrays["offset"],
+        sequence_id=arrays["sequence_id"],
+        ts_us=arrays["ts_us"],
+        kind=arrays["kind"],
+        run=arrays["run"],
+        by_sequence=arrays.get("by_sequence"),
+        postings={k: arrays[f"posting:{k}"] for k in header["kinds"]},
+        block_ts_min=arrays["block_ts_min"],
+        block_ts_max=arrays["block_ts_max"],
+        frame=arrays.get("frame"),
+    )
+
+
+def load_fresh_index(events_path: Path) -> EventIndex | None:
+    """The sidecar index for ``events_path`` if present and built against its current bytes."""
+    path = index_path_for(events_path)
+    if not path.exists():
+        return None
+    try:
+        index = load_event_index(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    return index if index.is_fresh(events_path) else None
+
+
+def _matches(
+    row: dict[str, Any],
+    *,
+    kinds: set[str] | None,
+    run_id: str | None,
+    start_sequence_id: int | None,
+    end_sequence_id: int | None,
+    t0: int | None,
+    t1: int | None,
+) -> bool:
+    if kinds is not None and str(row.get("kind")) not in kinds:
+        return False
+    if run_id is not None and row.get("run_id") != run_id:
+        return False
+    seq = row.get("sequence_id") or 0
+    if start_sequence_id is not None and seq < start_sequence_id:
+        return False
+    if end_sequence_id is not None and seq > end_sequence_id:
+        return False
+    if t0 is not None or t1 is not None:
+        ts = ts_to_micros(row.get("ts")) or 0
+        if (t0 is not None and ts < t0) or (t1 is not None and ts > t1):
+            return False
+    return True
+
+
+def iter_selected_lines(
+    events_path: Path,
+    *,
+    kinds: Iterable[str] | None = None,
+    run_id: str | None = None,
+    start_sequence_id: int | None = None,
+    end_sequence_id: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> Iterator[bytes]:
+    """Raw JSONL lines matching the filters, in file order.
+
+    Seeks straight to matching rows through a fresh sidecar index; without one it scans the
+    file and filters on projected fields. Rotated segments are read in order, each through its
+    own sidecar. A ``.tbcol`` segment has no sidecar and is always scanned.
+    """
+    kind_set = {str(k) for k in kinds} if kinds is not None else None
+    for segment in read_segments(events_path):
+        yield from _iter_segment_lines(
+            segment,
+            kind_set=kind_set,
+            run_id=run_id,
+            start_sequence_id=start_sequence_id,
+            end_sequence_id=end_sequence_id,
+            since=since,
+            until=until,
+        )
+
+
+def _iter_segment_lines(
+    events_path: Path,
+    *,
+    kind_set: set[str] | None,
+    run_id: str | None,
+    start_sequence_id: int | None,
+    end_sequence_id: int | None,
+    since: datetime | None,
+    until: datetime | None,
+) -> Iterator[bytes]:
+    index = load_fresh_index(events_path)
+    if index is not None:
+        rows = index.select_rows(
+            kinds=kind_set,
+            run_id=run_id,
+            start_sequence_id=start_sequence_id,
+            end_sequence_id=end_sequence_id,
+            since=since,
+            until=until,
+        )
+        suffix = compression_suffix(events_path)
+        with events_path.open("rb") as f:
+            if index.frame is None or suffix is None:
+                for row in rows:
+                    f.seek(index.offset[row])
+                    yield f.readline().strip()
+                return
+            # Rows come in file order, so each frame is decoded at most once.
+            current = -1
+            payload = b""
+            for row in rows:
+                if index.frame[row] != current:
+                    current = index.frame[row]
+                    f.seek(current)
+                    payload = read_frame(f, suffix)
+                start = index.offset[row]
+                end = payload.find(b"\n", start)
+                yield payload[start : end if end >= 0 else len(payload)].strip()
+        return
+
+    if is_columnar(events_path):
+        yield from _filter_lines(
+            ColumnarSegment(events_path).iter_json_lines(),
+            kind_set=kind_set,
+            run_id=run_id,
+            start_sequence_id=start_sequence_id,
+            end_sequence_id=end_sequence_id,
+            since=since,
+            until=until,
+        )
+        return
+    with open_binary(events_path) as f:
+        yield from _filter_lines(
+            f,
+            kind_set=kind_set,
+            run_id=run_id,
+            start_sequence_id=start_sequence_id,
+            end_sequence_id=end_sequence_id,
+            since=since,
+            until=until,
+        )
+
+
+def _filter_lines(
+    lines: Iterable[bytes],
+    *,
+    kind_set: set[str] | None,
+    run_id: str | None,
+    start_sequence_id: int | None,
+    end_sequence_id: int | None,
+    since: datetime | None,
+    until: datetime | None,
+) -> Iterator[bytes]:
+    t0 = ts_to_micros(since)
+    t1 = ts_to_micros(until)
+    fields = ("run_id", "sequence_id", "ts", "kind")
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            continue
+        rec = project_event_line(line, fields, True, False)
+        if _matches(
+            rec,
+            kinds=kind_set,
+            run_id=run_id,
+            start_sequence_id=start_sequence_id,
+            end_sequence_id=end_sequence_id,
+            t0=t0,
+            t1=t1,
+        ):
+            yield line
+
+
+def iter_selected_events(events_path: Path, **filters: Any) -> Iterator[TraceEvent]:
+    for line in iter_selected_lines(events_path, **filters):
+        yield TraceEvent.model_validate(from_json(line))
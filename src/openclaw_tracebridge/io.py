@@ -1,39 +1,475 @@
 from __future__ import annotations
 
 import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Iterable
+from typing import Any, BinaryIO, Literal, Self
 
+from pydantic_core import from_json, to_json
+
+from .columnar import ColumnarSegment, is_columnar
+from .compression import compress_frame, open_binary, open_text, strip_compression_suffix
 from .schema import TraceEvent
 
+FsyncPolicy = Literal["none", "batch", "always"]
+DropPolicy = Literal["oldest", "newest", "sampled"]
+
+
+def segment_path(path: Path, index: int) -> Path:
+    base = strip_compression_suffix(path)
+    codec = path.suffix if base != path else ""
+    return path.with_name(f"{base.stem}.{index:05d}{base.suffix}{codec}")
+
+
+def _numbered_segments(path: Path) -> list[tuple[int, Path]]:
+    base = strip_compression_suffix(path)
+    codec = path.suffix if base != path else ""
+    pattern = re.compile(rf"^{re.escape(base.stem)}\.(\d{{5}}){re.escape(base.suffix + codec)}$")
+    numbered: list[tuple[int, Path]] = []
+    if path.parent.is_dir():
+        for candidate in path.parent.iterdir():
+            m = pattern.match(candidate.name)
+            if m:
+                numbered.append((int(m.group(1)), candidate))
+    return sorted(numbered)
+
+
+def event_segments(path: Path) -> list[Path]:
+    """Rotated segments of ``path`` oldest first, followed by the active file itself."""
+    out = [p for _, p in _numbered_segments(path)]
+    if path.exists():
+        out.append(path)
+    return out
+
+
+def read_segments(path: Path) -> list[Path]:
+    """The files a reader of ``path`` walks: ``event_segments`` for a JSONL path, else ``path``.
+
+    A path with no rotated segments reads as itself, so a missing file still fails on open.
+    """
+    if is_columnar(path):
+        return [path]
+    return event_segments(path) or [path]
+
 
 class JsonlTraceWriter:
-    def __init__(self, path: Path, flush_every: int = 1) -> None:
+    """Buffered JSONL event writer holding one append handle open.
+
+    Buffered lines are committed in one write once ``flush_every`` lines, ``flush_bytes`` bytes
+    or ``flush_interval_s`` seconds (checked on append and by ``flush_if_due``) have accumulated.
+    ``fsync`` controls durability: ``none`` leaves it to the OS, ``batch`` syncs once per commit
+    and ``always`` commits and syncs every append. With ``rotate_bytes`` set, a full active file
+    is renamed to the next numbered segment (``events.00001.jsonl``) and writing continues in a
+    fresh file; the readers in this package walk the segments and the active file in order.
+
+    For a ``.gz``/``.xz``/``.bz2`` path each commit is compressed as its own frame, so the file
+    stays valid after every flush and a later writer can keep appending.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        flush_every: int = 1,
+        *,
+        flush_bytes: int | None = None,
+        flush_interval_s: float | None = None,
+        fsync: FsyncPolicy = "none",
+        rotate_bytes: int | None = None,
+    ) -> None:
+        if fsync not in ("none", "batch", "always"):
+            raise ValueError(f"unknown fsync policy: {fsync}")
         self.path = path
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self.flush_every = max(1, flush_every)
-        self._buffer: list[str] = []
+        self.flush_bytes = flush_bytes
+        self.flush_interval_s = flush_interval_s
+        self.fsync = fsync
+        self.rotate_bytes = rotate_bytes
+        self._buffer: list[bytes] = []
+        self._buffered_bytes = 0
+        self._last_commit = time.monotonic()
+        self._handle: BinaryIO | None = None
+        self._segment_bytes = 0
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
 
     def append(self, event: TraceEvent) -> None:
-        self._buffer.append(event.model_dump_json())
-        if len(self._buffer) >= self.flush_every:
+        self.append_json(event.model_dump_json().encode("utf-8"))
+
+    def append_json(self, line: bytes) -> None:
+        """Append one already-serialized event (see ``schema.dump_event_json``)."""
+        self._buffer.append(line)
+        self._buffered_bytes += len(line) + 1
+        if self._should_commit():
             self.flush()
 
+    def _should_commit(self) -> bool:
+        if self.fsync == "always" or len(self._buffer) >= self.flush_every:
+            return True
+        if self.flush_bytes is not None and self._buffered_bytes >= self.flush_bytes:
+            return True
+        return (
+            self.flush_interval_s is not None
+            and time.monotonic() - self._last_commit >= self.flush_interval_s
+        )
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    def flush_if_due(self) -> None:
+        """Commit a partial buffer whose ``flush_interval_s`` has passed with no further append."""
+        if (
+            self._buffer
+            and self.flush_interval_s is not None
+            and time.monotonic() - self._last_commit >= self.flush_interval_s
+        ):
+            self.flush()
+
+    def _open(self) -> BinaryIO:
+        if self._handle is None:
+            self._handle = self.path.open("ab")
+            self._segment_bytes = self._handle.tell()
+        return self._handle
+
     def flush(self) -> None:
+        self._last_commit = time.monotonic()
         if not self._buffer:
             return
-        with self.path.open("a", encoding="utf-8") as f:
-            f.write("\n".join(self._buffer) + "\n")
+        self._buffer.append(b"")
+        payload = compress_frame(self.path, b"\n".join(self._buffer))
         self._buffer.clear()
+        self._buffered_bytes = 0
+
+        handle = self._open()
+        handle.write(payload)
+        handle.flush()
+        if self.fsync != "none":
+            os.fsync(handle.fileno())
+        self._segment_bytes += len(payload)
+
+        if self.rotate_bytes is not None and self._segment_bytes >= self.rotate_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        self._close_handle()
+        existing = _numbered_segments(self.path)
+        next_index = existing[-1][0] + 1 if existing else 1
+        self.path.replace(segment_path(self.path, next_index))
+        self._segment_bytes = 0
+
+    def _close_handle(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
 
     def close(self) -> None:
         self.flush()
+        self._close_handle()
+
+
+@dataclass
+class AsyncWriterStats:
+    enqueued: int
+    written: int
+    dropped: int
+    write_errors: int
+    queue_depth: int
+    max_queue_depth: int
+    write_batches: int
+    write_latency_ms_avg: float
+    write_latency_ms_max: float
+
+
+class AsyncTraceWriter:
+    """Queue events for a background thread that serializes and writes them.
+
+    ``append`` never touches disk. When ``max_queue`` events are already waiting, the writer
+    fails open and drops per ``drop_policy``: ``oldest`` evicts the head of the queue,
+    ``newest`` rejects the incoming event and ``sampled`` admits one in ``sample_every``
+    overflowing events (evicting the oldest) and rejects the rest. Every drop is counted.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_queue: int = 10_000,
+        drop_policy: DropPolicy = "oldest",
+        sample_every: int = 10,
+        batch_size: int = 512,
+        flush_interval_s: float = 0.2,
+        fsync: FsyncPolicy = "none",
+        rotate_bytes: int | None = None,
+    ) -> None:
+        if drop_policy not in ("oldest", "newest", "sampled"):
+            raise ValueError(f"unknown drop policy: {drop_policy}")
+        self.max_queue = max(1, max_queue)
+        self.drop_policy = drop_policy
+        self.sample_every = max(1, sample_every)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_s = flush_interval_s
+        self._writer = JsonlTraceWriter(
+            path,
+            flush_every=self.batch_size,
+            flush_interval_s=flush_interval_s,
+            fsync=fsync,
+            rotate_bytes=rotate_bytes,
+        )
+        # Guards the queue hand-off, _stopping and every counter producers touch; the drain
+        # thread takes it per batch, never while writing.
+        self._lock = threading.Lock()
+        self._queue: deque[TraceEvent | bytes] = deque()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._overflow_seen = 0
+        self._enqueued = 0
+        self._dropped = 0
+        self._written = 0
+        self._uncommitted = 0
+        self._write_errors = 0
+        self._max_depth = 0
+        self._batches = 0
+        self._latency_total_s = 0.0
+        self._latency_max_s = 0.0
+        self._thread = threading.Thread(target=self._run, name="tracebridge-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def path(self) -> Path:
+        return self._writer.path
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def append(self, event: TraceEvent) -> bool:
+        return self._offer(event)
+
+    def append_json(self, line: bytes) -> bool:
+        return self._offer(line)
+
+    def _offer(self, item: TraceEvent | bytes) -> bool:
+        with self._lock:
+            if self._stopping:
+                self._dropped += 1
+                return False
+            queue = self._queue
+            if len(queue) >= self.max_queue:
+                if self.drop_policy == "newest":
+                    self._dropped += 1
+                    return False
+                if self.drop_policy == "sampled":
+                    self._overflow_seen += 1
+                    if self._overflow_seen % self.sample_every:
+                        self._dropped += 1
+                        return False
+                if queue:
+                    queue.popleft()
+                    self._dropped += 1
+            queue.append(item)
+            self._enqueued += 1
+            depth = len(queue)
+            self._max_depth = max(self._max_depth, depth)
+        if depth >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval_s)
+            self._wakeup.clear()
+            self._drain()
+            with self._lock:
+                # _offer checks _stopping under the same lock, so once the queue is seen empty
+                # here no later event can slip in unwritten and uncounted.
+                done = self._stopping and not self._queue
+            if done:
+                self._commit(self._writer.close)
+                return
+            # A partial batch is committed once it is flush_interval_s old even when no
+            # further event arrives to trigger the writer's own check.
+            self._commit(self._writer.flush_if_due)
+
+    def _commit(self, step: Callable[[], None]) -> None:
+        # Runs one writer step and settles the lines buffered since the last commit: written
+        # once the writer's buffer is empty, dropped if the step failed (the buffer is gone).
+        try:
+            step()
+        except (OSError, ValueError):
+            with self._lock:
+                self._write_errors += 1
+                self._dropped += self._uncommitted
+            self._uncommitted = 0
+            return
+        if not self._writer.buffered:
+            with self._lock:
+                self._written += self._uncommitted
+            self._uncommitted = 0
+
+    def _drain(self) -> None:
+        # Every item is handled on its own, so one that cannot be serialized or written is
+        # counted and the thread keeps draining; letting it raise would stop all later writes.
+        queue = self._queue
+        while True:
+            with self._lock:
+                batch = [queue.popleft() for _ in range(min(len(queue), self.batch_size))]
+            if not batch:
+                return
+            started = time.perf_counter()
+            for item in batch:
+                if isinstance(item, TraceEvent):
+                    try:
+                        item = item.model_dump_json().encode("utf-8")
+                    except ValueError:  # PydanticSerializationError
+                        with self._lock:
+                            self._write_errors += 1
+                            self._dropped += 1
+                        continue
+                self._uncommitted += 1
+                self._commit(partial(self._writer.append_json, item))
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._batches += 1
+                self._latency_total_s += elapsed
+                self._latency_max_s = max(self._latency_max_s, elapsed)
+
+    def stats(self) -> AsyncWriterStats:
+        with self._lock:
+            batches = self._batches
+            return AsyncWriterStats(
+                enqueued=self._enqueued,
+                written=self._written,
+                dropped=self._dropped,
+                write_errors=self._write_errors,
+                queue_depth=len(self._queue),
+                max_queue_depth=self._max_depth,
+                write_batches=batches,
+                write_latency_ms_avg=round(self._latency_total_s / batches * 1000, 3) if batches else 0.0,
+                write_latency_ms_max=round(self._latency_max_s * 1000, 3),
+            )
+
+    def close(self, timeout: float | None = None) -> None:
+        """Stop accepting events and wait for the drain thread, which closes the file once the
+        queue is empty. Events offered after this are counted as dropped. After a ``timeout``
+        the thread is left to finish on its own."""
+        with self._lock:
+            self._stopping = True
+        self._wakeup.set()
+        self._thread.join(timeout)
+
+
+def iter_events(path: Path, **filters: Any) -> Iterable[TraceEvent]:
+    """Events of a JSONL, compressed JSONL or ``.tbcol`` file, rotated segments included.
+
+    Keyword filters (``kinds``, ``run_id``, ``start_sequence_id``, ``end_sequence_id``,
+    ``since``, ``until``) are answered through the sidecar index when a fresh one exists
+    (see ``index.iter_selected_lines``), so only matching rows are read and parsed.
+    """
+    if filters:
+        from .index import iter_selected_events  # index builds on this module
+
+        yield from iter_selected_events(path, **filters)
+        return
+    if is_columnar(path):
+        yield from ColumnarSegment(path).iter_events()
+        return
+    for segment in read_segments(path):
+        with open_text(segment) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                yield TraceEvent.model_validate(json.loads(line))
+
+
+_ATTRS_MARKER = b',"attrs":'
+_TAIL_MARKER = b',"token_estimate":'
+_HEAD_FIELDS = frozenset({"schema_version", "event_id", "run_id", "sequence_id", "ts", "kind", "actor"})
+_TAIL_FIELDS = frozenset({"token_estimate", "prompt_chars", "response_chars", "cost_usd_micros"})
+
+
+def _attrs_bounds(line: bytes) -> tuple[int, int] | None:
+    # Events written by this package put the scalar fields around a single top-level "attrs"
+    # object. An unescaped `,"attrs":` cannot occur inside a JSON string, so the first match is
+    # either the top-level key or a nested one (which leaves the head unbalanced and unparseable);
+    # the last `,"token_estimate":` is the top-level key for the same reason.
+    start = line.find(_ATTRS_MARKER)
+    end = line.rfind(_TAIL_MARKER)
+    return (start, end) if start > 0 and end > start else None
+
+
+def project_event_line(
+    line: bytes, fields: tuple[str, ...], need_head: bool = True, need_tail: bool = True
+) -> dict[str, Any]:
+    """Decode only ``fields`` of one serialized event line (see ``iter_event_fields``)."""
+    # Anything that does not fit the layout described in _attrs_bounds falls back to a full parse.
+    row: dict[str, Any] = {}
+    bounds = _attrs_bounds(line)
+    if bounds is not None:
+        start, end = bounds
+        try:
+            if need_head:
+                row.update(from_json(line[:start] + b"}"))
+            if need_tail:
+                row.update(from_json(b"{" + line[end + 1 :]))
+        except ValueError:
+            row = {}
+    if not all(f in row for f in fields):
+        row = from_json(line)
+    return {f: row.get(f) for f in fields}
+
+
+def split_event_line(line: bytes) -> tuple[dict[str, Any], bytes]:
+    """Every field of an event line except ``attrs``, plus the raw ``attrs`` JSON bytes."""
+    bounds = _attrs_bounds(line)
+    if bounds is not None:
+        start, end = bounds
+        try:
+            row = from_json(line[:start] + b"}")
+            row.update(from_json(b"{" + line[end + 1 :]))
+        except ValueError:
+            row = {}
+        if _HEAD_FIELDS <= row.keys() and _TAIL_FIELDS <= row.keys():
+            return row, line[start + len(_ATTRS_MARKER) : end]
+    row = from_json(line)
+    return row, to_json(row.pop("attrs", None) or {}, inf_nan_mode="null")
+
 
+def iter_event_fields(path: Path, fields: Iterable[str]) -> Iterator[dict[str, Any]]:
+    """Yield only ``fields`` of each event as a plain dict, without building ``TraceEvent``.
 
-def iter_events(path: Path) -> Iterable[TraceEvent]:
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            yield TraceEvent.model_validate(json.loads(line))
+    For aggregates that never look at ``attrs``: unless ``attrs`` is requested, its payload
+    (``content``, ``raw``) is skipped rather than decoded.
+    """
+    wanted = tuple(fields)
+    if is_columnar(path):
+        yield from ColumnarSegment(path).iter_records(wanted)
+        return
+    need_head = any(f in _HEAD_FIELDS for f in wanted)
+    need_tail = any(f in _TAIL_FIELDS for f in wanted)
+    full = "attrs" in wanted or not set(wanted) <= _HEAD_FIELDS | _TAIL_FIELDS
+    for segment in read_segments(path):
+        with open_binary(segment) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                if full:
+                    row = from_json(line)
+                    yield {k: row.get(k) for k in wanted}
+                else:
+                    yield project_event_line(line, wanted, need_head, need_tail)
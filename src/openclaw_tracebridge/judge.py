@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import http.client
+import json
+import os
+import random
+import re
+import sqlite3
+import urllib.error
+import urllib.request
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .rewards import RewardInput
+
+DEFAULT_JUDGE_PROMPT = (
+    "You grade one turn of an AI assistant. Given the user's message and the assistant's reply, "
+    "rate how well the reply addresses the message: correct, complete, and free of errors. "
+    "Answer with a single number between 0 and 1 and nothing else."
+)
+_SCORE = re.compile(r"[-+]?(?:\d+\.\d*|\.\d+|\d+)")
+_RETRY_STATUS = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+_CACHE_QUERY_CHUNK = 500
+
+
+def _default_cache_path() -> Path:
+    root = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(root) / "openclaw-tracebridge" / "judge.sqlite3"
+
+
+@dataclass(frozen=True)
+class JudgeConfig:
+    """How the ``judge`` reward mode reaches an OpenAI-compatible chat completions endpoint."""
+
+    base_url: str = "http://127.0.0.1:8000/v1"
+    model: str = "judge"
+    prompt: str = DEFAULT_JUDGE_PROMPT
+    api_key: str | None = None
+    cache_path: Path | None = field(default_factory=_default_cache_path)
+    concurrency: int = 8
+    max_retries: int = 4
+    backoff_s: float = 0.5
+    timeout_s: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> JudgeConfig:
+        env = os.environ
+        config = cls()
+        cache = env.get("TRACEBRIDGE_JUDGE_CACHE")
+        return cls(
+            base_url=env.get("TRACEBRIDGE_JUDGE_URL", config.base_url),
+            model=env.get("TRACEBRIDGE_JUDGE_MODEL", config.model),
+            api_key=env.get("TRACEBRIDGE_JUDGE_API_KEY"),
+            cache_path=Path(cache) if cache else config.cache_path,
+            concurrency=int(env.get("TRACEBRIDGE_JUDGE_CONCURRENCY", config.concurrency)),
+        )
+
+
+def judge_key(config: JudgeConfig, item: RewardInput) -> str:
+    payload = json.dumps([config.model, config.prompt, item.input_text, item.output_text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class JudgeCache:
+    """On-disk judgments keyed by ``judge_key``; shared by every export using the same file."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS judgments (key TEXT PRIMARY KEY, score REAL NOT NULL)")
+
+    def get_many(self, keys: Sequence[str]) -> dict[str, float]:
+        found: dict[str, float] = {}
+        for i in range(0, len(keys), _CACHE_QUERY_CHUNK):
+            chunk = keys[i : i + _CACHE_QUERY_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            found.update(self._db.execute(f"SELECT key, score FROM judgments WHERE key IN ({marks})", chunk))
+        return found
+
+    def put_many(self, scores: dict[str, float]) -> None:
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO judgments VALUES (?, ?)", scores.items())
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class _Retryable(Exception):
+    pass
+
+
+def _parse_score(text: str) -> float | None:
+    match = _SCORE.search(text)
+    if match is None:
+        return None
+    return max(0.0, min(1.0, round(float(match.group(0)), 4)))
+
+
+def _post(config: JudgeConfig, item: RewardInput) -> float | None:
+    body = {
+        "model": config.model,
+        "temperature": 0,
+        "max_tokens": 8,
+        "messages": [
+            {"role": "system", "content": config.prompt},
+            {
+                "role": "user",
+                "content": f"User message:\n{item.input_text}\n\nAssistant reply:\n{item.output_text}",
+            },
+        ],
+    }
+    headers = {"Content-Type": "application/json"}
+    if config.api_key:
+        headers["Authorization"] = f"Bearer {config.api_key}"
+    request = urllib.request.Request(
+        config.base_url.rstrip("/") + "/chat/completions",
+        data=json.dumps(body, ensure_ascii=False).encode("utf-8"),
+        headers=headers,
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=config.timeout_s) as response:
+            payload = json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        if exc.code in _RETRY_STATUS:
+            raise _Retryable from exc
+        return None
+    except (urllib.error.URLError, http.client.HTTPException, TimeoutError, ConnectionError) as exc:
+        raise _Retryable from exc  # includes a body cut short (IncompleteRead)
+    except ValueError:
+        return None  # a 200 whose body is not JSON
+    try:
+        return _parse_score(str(payload["choices"][0]["message"]["content"]))
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+async def _judge_all(config: JudgeConfig, items: Sequence[RewardInput]) -> list[float | None]:
+    # Chat completions take one conversation per request, so a batch is sent as concurrent
+    # requests: every row is in flight at once up to `concurrency`, and the server (vLLM's
+    # continuous batching) groups them on the GPU. Throughput is set by the endpoint rather
+    # than by sequential round trips. Backoff sleeps happen outside the semaphore, leaving
+    # the slot to other rows.
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(config.concurrency)
+
+    async def judge_one(pool: ThreadPoolExecutor, item: RewardInput) -> float | None:
+        for attempt in range(config.max_retries + 1):
+            async with slots:
+                try:
+                    return await loop.run_in_executor(pool, _post, config, item)
+                except _Retryable:
+                    pass
+            if attempt < config.max_retries:
+                delay = config.backoff_s * 2**attempt
+                await asyncio.sleep(delay + random.uniform(0, delay))
+        return None
+
+    with ThreadPoolExecutor(max_workers=config.concurrency, thread_name_prefix="tracebridge-judge") as pool:
+        return list(await asyncio.gather(*(judge_one(pool, item) for item in items)))
+
+
+def _run_judge_all(config: JudgeConfig, items: Sequence[RewardInput]) -> list[float | None]:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_judge_all(config, items))
+    # Called from code already running an event loop (an async host, a notebook), where
+    # asyncio.run refuses to start: run the batch on a helper thread with its own loop.
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="tracebridge-judge-loop") as pool:
+        return pool.submit(asyncio.run, _judge_all(config, items)).result()
+
+
+def judge_rewards(
+    items: Sequence[RewardInput], config: JudgeConfig | None = None, cache: JudgeCache | None = None
+) -> list[float | None]:
+    """Judge a batch of turns, asking the endpoint only about rows not already in the cache.
+
+    Identical rows in a batch share one request. Rows the judge could not score (after
+    retries, or with an unparsable answer) get ``None`` and are not cached. Safe to call from
+    inside a running event loop; it blocks that thread until the batch is judged.
+
+    Pass an open ``cache`` to share one connection across many batches; otherwise
+    ``config.cache_path`` is opened and closed around this call.
+    """
+    config = config or JudgeConfig.from_env()
+    keys = [judge_key(config, item) for item in items]
+    owned = cache is None and config.cache_path is not None
+    if owned:
+        cache = JudgeCache(config.cache_path)
+    try:
+        known = cache.get_many(list(dict.fromkeys(keys))) if cache is not None else {}
+        missing: dict[str, RewardInput] = {}
+        for key, item in zip(keys, items):
+            if key not in known:
+                missing.setdefault(key, item)
+        if missing:
+            scores = _run_judge_all(config, list(missing.values()))
+            fresh = {key: score for key, score in zip(missing, scores) if score is not None}
+            if cache is not None:
+                cache.put_many(fresh)
+            known.update(fresh)
+    finally:
+        if owned:
+            cache.close()
+    return [known.get(key) for key in keys]
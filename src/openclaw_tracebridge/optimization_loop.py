@@ -7,7 +7,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
-NEGATIVE_KEYWORDS = ("error", "failed", "exception", "timeout")
+from .compression import open_text
+from .rewards import RewardInput, score_rewards
 
 
 @dataclass
@@ -27,7 +28,7 @@ class OptimizationReport:
 
 def _read_jsonl(path: Path) -> list[dict[str, Any]]:
     rows: list[dict[str, Any]] = []
-    with path.open("r", encoding="utf-8") as f:
+    with open_text(path) as f:
         for line in f:
             line = line.strip()
             if not line:
@@ -62,17 +63,17 @@ def _split_train_val(rows: list[dict[str, Any]], *, val_ratio: float, seed: int)
     return train, val
 
 
+_ERROR_TERM_REPLACEMENTS = {
+    "error": "issue",
+    "failed": "not completed",
+    "exception": "unexpected condition",
+    "timeout": "time limit",
+}
+_ERROR_TERMS = re.compile("|".join(_ERROR_TERM_REPLACEMENTS), re.IGNORECASE)
+
+
 def _sanitize_error_terms(text: str) -> str:
-    out = text
-    replacements = {
-        "error": "issue",
-        "failed": "not completed",
-        "exception": "unexpected condition",
-        "timeout": "time limit",
-    }
-    for src, dst in replacements.items():
-        out = re.sub(src, dst, out, flags=re.IGNORECASE)
-    return out
+    return _ERROR_TERMS.sub(lambda m: _ERROR_TERM_REPLACEMENTS[m.group(0).lower()], text)
 
 
 def _apply_policy(action_text: str, policy: str) -> str:
@@ -94,36 +95,19 @@ def _apply_policy(action_text: str, policy: str) -> str:
     raise ValueError(f"unknown policy: {policy}")
 
 
-def _reward_from_action(action_text: str, middle_counts: dict[str, int]) -> float:
-    output = action_text.lower()
-
-    reward = 0.4
-    if action_text.strip():
-        reward += 0.25
-    if middle_counts.get("tool.result", 0) > 0:
-        reward += 0.2
-    if middle_counts.get("system.event", 0) > 0:
-        reward -= 0.1
-
-    if any(word in output for word in NEGATIVE_KEYWORDS):
-        reward -= 0.3
-
-    return max(0.0, min(1.0, round(reward, 4)))
-
-
 def _avg_reward(rows: list[dict[str, Any]], policy: str) -> float:
     if not rows:
         return 0.0
-    values: list[float] = []
+    inputs: list[RewardInput] = []
     for row in rows:
         action = str(row.get("action_text", ""))
         transformed = _apply_policy(action, policy)
         middle_counts = row.get("metadata", {}).get("middle_counts", {})
         if not isinstance(middle_counts, dict):
             middle_counts = {}
-        reward = _reward_from_action(transformed, middle_counts)
-        values.append(reward)
-    return round(sum(values) / len(values), 6)
+        inputs.append(RewardInput(transformed, middle_counts))
+    values = score_rewards("heuristic-basic", inputs)
+    return round(sum(v or 0.0 for v in values) / len(values), 6)
 
 
 def run_optimization_loop(
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import json
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any
+
+from .compression import open_text
+
+PACK_SCHEMA = "tracebridge.packed.v0"
+PACKING_STRATEGIES = ("ffd", "streaming")
+DEFAULT_TOKEN_BUDGET = 4096
+DEFAULT_OPEN_BINS = 64
+DEFAULT_BUCKET_EDGES = (512, 1024, 2048, 4096, 8192)
+
+
+@dataclass
+class PackSummary:
+    input_rows: int
+    bins: int
+    oversized_rows: int
+    row_tokens: int
+    padding_tokens: int
+
+
+def row_tokens(row: dict[str, Any]) -> int:
+    """Token size of one exported row.
+
+    Uses the ``input_token_estimate``/``output_token_estimate`` carried by ``messages`` rows,
+    then a row-level ``token_estimate`` (trajectories), and falls back to chars/4 of the text.
+    """
+    meta = row.get("metadata") if isinstance(row.get("metadata"), dict) else {}
+    estimates = [meta.get("input_token_estimate"), meta.get("output_token_estimate")]
+    if any(isinstance(v, int) for v in estimates):
+        return sum(v for v in estimates if isinstance(v, int))
+    if isinstance(row.get("token_estimate"), int):
+        return row["token_estimate"]
+    texts = [str(m.get("content") or "") for m in row.get("messages") or () if isinstance(m, dict)]
+    texts += [str(row.get(k) or "") for k in ("state_text", "action_text")]
+    chars = sum(len(t) for t in texts)
+    return max(1, chars // 4) if chars else 0
+
+
+def _iter_sized_lines(path: Path) -> Iterator[tuple[str, int]]:
+    with open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line, row_tokens(json.loads(line))
+
+
+class _FirstFit:
+    """Remaining capacity of every bin in a max segment tree, so first-fit finds the lowest
+    bin with room in O(log bins) instead of scanning them all. Leaves past ``opened`` are
+    bins not used yet, still at full capacity."""
+
+    def __init__(self, capacity: int, max_bins: int) -> None:
+        self.capacity = capacity
+        self.leaves = 1
+        while self.leaves < max(1, max_bins):
+            self.leaves *= 2
+        self.tree = array("q", [capacity]) * (2 * self.leaves)
+        self.opened = 0
+
+    def _take(self, leaf: int, size: int) -> None:
+        node = leaf + self.leaves
+        self.tree[node] -= size
+        node //= 2
+        while node:
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+            node //= 2
+        self.opened = max(self.opened, leaf + 1)
+
+    def place(self, size: int) -> int:
+        if size > self.capacity:
+            # Larger than any bin: it gets a bin of its own, marked full.
+            leaf = self.opened
+            self._take(leaf, self.capacity)
+            return leaf
+        node = 1
+        while node < self.leaves:
+            node = 2 * node if self.tree[2 * node] >= size else 2 * node + 1
+        leaf = node - self.leaves
+        self._take(leaf, size)
+        return leaf
+
+
+def _write_bin(f: IO[str], index: int, token_budget: int, lines: list[str], sizes: list[int]) -> int:
+    offsets = [0]
+    for size in sizes:
+        offsets.append(offsets[-1] + size)
+    head = json.dumps(
+        {
+            "schema": PACK_SCHEMA,
+            "id": f"pack_{index:06d}",
+            "token_budget": token_budget,
+            "tokens": offsets[-1],
+            "offsets": offsets,
+        },
+        ensure_ascii=False,
+    )
+    # Rows are spliced in as the exporter wrote them; they are never re-serialized.
+    f.write(f'{head[:-1]}, "rows": [{", ".join(lines)}]}}\n')
+    return offsets[-1]
+
+
+class _BinWriter:
+    def __init__(self, f: IO[str], token_budget: int) -> None:
+        self.f = f
+        self.token_budget = token_budget
+        self.bins = 0
+        self.row_tokens = 0
+        self.padding_tokens = 0
+
+    def write(self, lines: list[str], sizes: list[int]) -> None:
+        self.bins += 1
+        tokens = _write_bin(self.f, self.bins, self.token_budget, lines, sizes)
+        self.row_tokens += tokens
+        self.padding_tokens += max(0, self.token_budget - tokens)
+
+
+def _pack_ffd(input_path: Path, out: _BinWriter) -> tuple[int, int]:
+    lines: list[str] = []
+    sizes = array("q")
+    for line, size in _iter_sized_lines(input_path):
+        lines.append(line)
+        sizes.append(size)
+
+    # Largest first; sorted() is stable, so equal sizes keep their input order.
+    order = sorted(range(len(sizes)), key=sizes.__getitem__, reverse=True)
+    fit = _FirstFit(out.token_budget, len(order))
+    members: list[list[int]] = []
+    for row in order:
+        leaf = fit.place(sizes[row])
+        if leaf == len(members):
+            members.append([])
+        members[leaf].append(row)
+
+    for rows in members:
+        out.write([lines[r] for r in rows], [sizes[r] for r in rows])
+    return len(lines), sum(1 for s in sizes if s > out.token_budget)
+
+
+def _pack_streaming(input_path: Path, out: _BinWriter, open_bins: int) -> tuple[int, int]:
+    # First fit over at most open_bins bins; when a row fits none and the limit is reached,
+    # the fullest bin is written out. Memory is bounded by open_bins * token_budget.
+    bins: list[tuple[list[str], list[int]]] = []
+    used: list[int] = []
+    n = 0
+    oversized = 0
+    for line, size in _iter_sized_lines(input_path):
+        n += 1
+        if size > out.token_budget:
+            oversized += 1
+            out.write([line], [size])
+            continue
+        for i, total in enumerate(used):
+            if total + size <= out.token_budget:
+                bins[i][0].append(line)
+                bins[i][1].append(size)
+                used[i] += size
+                break
+        else:
+            if len(bins) >= open_bins:
+                fullest = max(range(len(used)), key=used.__getitem__)
+                out.write(*bins.pop(fullest))
+                used.pop(fullest)
+            bins.append(([line], [size]))
+            used.append(size)
+    for lines, sizes in bins:
+        out.write(lines, sizes)
+    return n, oversized
+
+
+def pack_dataset(
+    input_path: Path,
+    out_path: Path,
+    *,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    strategy: str = "ffd",
+    open_bins: int = DEFAULT_OPEN_BINS,
+) -> PackSummary:
+    """Pack exported rows into bins of at most ``token_budget`` tokens.
+
+    Each output line is one bin: the original rows under ``rows`` and cumulative token
+    ``offsets`` marking where each row starts and ends inside the packed sequence. ``ffd``
+    (first-fit decreasing) loads the dataset and gives the tightest packing; ``streaming`` is
+    a single pass over the file with at most ``open_bins`` bins in memory. Rows larger than
+    the budget are kept, alone in their own bin.
+    """
+    if token_budget <= 0:
+        raise ValueError("token_budget must be positive")
+    if strategy not in PACKING_STRATEGIES:
+        raise ValueError(f"unknown packing strategy: {strategy}")
+    if open_bins <= 0:
+        raise ValueError("open_bins must be positive")
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open_text(out_path, "w") as f:
+        out = _BinWriter(f, token_budget)
+        if strategy == "ffd":
+            n, oversized = _pack_ffd(input_path, out)
+        else:
+            n, oversized = _pack_streaming(input_path, out, open_bins)
+
+    return PackSummary(
+        input_rows=n,
+        bins=out.bins,
+        oversized_rows=oversized,
+        row_tokens=out.row_tokens,
+        padding_tokens=out.padding_tokens,
+    )
+
+
+def bucket_path(out_dir: Path, edges: tuple[int, ...], bucket: int) -> Path:
+    if bucket < len(edges):
+        return out_dir / f"le{edges[bucket]:06d}.jsonl"
+    return out_dir / f"gt{edges[-1]:06d}.jsonl"
+
+
+def bucket_dataset(
+    input_path: Path, out_dir: Path, *, edges: tuple[int, ...] = DEFAULT_BUCKET_EDGES
+) -> dict[str, int]:
+    """Split exported rows into length-bucketed shards: ``leNNNNNN.jsonl`` holds rows of at
+    most that many tokens (and more than the previous edge), ``gtNNNNNN.jsonl`` the rest.
+
+    Returns rows per shard file name; empty buckets produce no file.
+    """
+    if not edges or list(edges) != sorted(set(edges)):
+        raise ValueError("bucket edges must be increasing")
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    handles: dict[int, IO[str]] = {}
+    counts = [0] * (len(edges) + 1)
+    try:
+        for line, size in _iter_sized_lines(input_path):
+            bucket = bisect_left(edges, size)
+            f = handles.get(bucket)
+            if f is None:
+                f = handles[bucket] = open_text(bucket_path(out_dir, edges, bucket), "w")
+            f.write(line + "\n")
+            counts[bucket] += 1
+    finally:
+        for f in handles.values():
+            f.close()
+    return {bucket_path(out_dir, edges, b).name: n for b, n in enumerate(counts) if n}
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 import hashlib
+import heapq
 import json
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
+from .compression import compression_suffix, open_binary, open_text
+from .sharding import ShardSpec, open_dataset_writer
+
 
 @dataclass
 class ReplaySplitSummary:
@@ -22,22 +27,28 @@ def _hash_to_unit(value: str) -> float:
     return (bucket % 1_000_000) / 1_000_000.0
 
 
-def _read_jsonl(path: Path) -> list[dict[str, Any]]:
-    rows: list[dict[str, Any]] = []
-    with path.open("r", encoding="utf-8") as f:
+def _iter_rows(path: Path) -> Iterator[tuple[int, dict[str, Any]]]:
+    # (byte offset into the decoded stream, row) for each non-blank line.
+    offset = 0
+    with open_binary(path) as f:
         for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            rows.append(json.loads(line))
-    return rows
+            if line.strip():
+                yield offset, json.loads(line)
+            offset += len(line)
 
 
-def _write_jsonl(path: Path, rows: list[dict[str, Any]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        for row in rows:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+def _read_rows_at(path: Path, offsets: list[int]) -> Iterator[dict[str, Any]]:
+    if compression_suffix(path) is None:
+        with path.open("rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                yield json.loads(f.readline())
+        return
+    # Compressed streams only seek forward cheaply, so collect the k rows in one pass instead.
+    wanted = set(offsets)
+    found = {offset: row for offset, row in _iter_rows(path) if offset in wanted}
+    for offset in offsets:
+        yield found[offset]
 
 
 def _stable_key(row: dict[str, Any], key_field: str, idx: int) -> str:
@@ -59,51 +70,66 @@ def split_jsonl_for_replay(
     key_field: str = "id",
     sample_size: int | None = None,
     sample_seed: int = 42,
+    shards: ShardSpec | None = None,
 ) -> ReplaySplitSummary:
     if not 0 < split_ratio < 1:
         raise ValueError("split_ratio must be between 0 and 1")
 
-    rows = _read_jsonl(input_path)
-
+    # Rows are streamed straight to the outputs. Sampling keeps the k lowest
+    # (score, input index) pairs in a bounded max-heap of offsets, then seeks back to write
+    # them in score order, so memory is O(k) whatever the input size.
+    input_rows = 0
+    sampled: list[tuple[float, int, int]] = []
     if sample_size is not None:
-        scored: list[tuple[float, dict[str, Any]]] = []
-        for idx, row in enumerate(rows):
+        for idx, (offset, row) in enumerate(_iter_rows(input_path)):
+            input_rows += 1
             key = _stable_key(row, key_field=key_field, idx=idx)
-            s = _hash_to_unit(f"sample:{sample_seed}:{key}")
-            scored.append((s, row))
-        sampled_rows = [row for _, row in sorted(scored, key=lambda t: t[0])[:sample_size]]
-    else:
-        sampled_rows = rows
-
-    out_a: list[dict[str, Any]] = []
-    out_b: list[dict[str, Any]] = []
-
-    for idx, row in enumerate(sampled_rows):
-        key = _stable_key(row, key_field=key_field, idx=idx)
-        score = _hash_to_unit(f"split:{seed}:{key}")
-        if score < split_ratio:
-            out_a.append(row)
+            entry = (-_hash_to_unit(f"sample:{sample_seed}:{key}"), -idx, offset)
+            if len(sampled) < sample_size:
+                heapq.heappush(sampled, entry)
+            elif sample_size > 0 and entry > sampled[0]:
+                heapq.heapreplace(sampled, entry)
+        sampled.sort(reverse=True)
+
+    out_a_rows = out_b_rows = 0
+    out_a_path.parent.mkdir(parents=True, exist_ok=True)
+    out_b_path.parent.mkdir(parents=True, exist_ok=True)
+    with open_dataset_writer(out_a_path, shards) as out_a, open_dataset_writer(out_b_path, shards) as out_b:
+        if sample_size is not None:
+            rows: Iterable[dict[str, Any]] = _read_rows_at(input_path, [offset for _, _, offset in sampled])
         else:
-            out_b.append(row)
-
-    _write_jsonl(out_a_path, out_a)
-    _write_jsonl(out_b_path, out_b)
+            rows = (row for _, row in _iter_rows(input_path))
+        for idx, row in enumerate(rows):
+            key = _stable_key(row, key_field=key_field, idx=idx)
+            line = json.dumps(row, ensure_ascii=False) + "\n"
+            if _hash_to_unit(f"split:{seed}:{key}") < split_ratio:
+                out_a.write(line)
+                out_a_rows += 1
+            else:
+                out_b.write(line)
+                out_b_rows += 1
+        if sample_size is None:
+            input_rows = out_a_rows + out_b_rows
 
     return ReplaySplitSummary(
-        input_rows=len(rows),
-        sampled_rows=len(sampled_rows),
-        out_a_rows=len(out_a),
-        out_b_rows=len(out_b),
+        input_rows=input_rows,
+        sampled_rows=out_a_rows + out_b_rows,
+        out_a_rows=out_a_rows,
+        out_b_rows=out_b_rows,
     )
 
 
 def build_replay_manifest(input_path: Path) -> dict[str, Any]:
-    payload = input_path.read_bytes()
-    rows = _read_jsonl(input_path)
+    digest = hashlib.sha256()
+    with input_path.open("rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    with open_text(input_path) as f:
+        rows = sum(1 for line in f if line.strip())
     return {
         "schema": "tracebridge.replay.manifest.v0",
         "input": str(input_path),
-        "rows": len(rows),
-        "sha256": hashlib.sha256(payload).hexdigest(),
-        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "rows": rows,
+        "sha256": digest.hexdigest(),
+        "generated_at": datetime.now(UTC).isoformat(),
     }
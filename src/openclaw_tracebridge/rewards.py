@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .judge import JudgeCache, JudgeConfig
+
+NEGATIVE_KEYWORDS = ("error", "failed", "exception", "timeout")
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    trie: dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict[str, dict]) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # A keyword ends here; the rest is optional (greedy, so the longest keyword wins).
+            body = body + "?" if len(branches) == 1 and len(branches[0]) == 1 else f"(?:{body})?"
+        return body
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """Case-insensitive search for any of many keywords in one pass over the text.
+
+    The keywords are compiled into a single regex shaped like their prefix trie
+    (``e(?:rror|xception)|failed|...``), so each position of the text is tested against the
+    trie rather than against every keyword in turn. The text is lowercased once and matched
+    case-sensitively: ``re.IGNORECASE`` disables the engine's first-character scan and is
+    several times slower.
+    """
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        self.keywords = tuple(sorted({k.lower() for k in keywords if k}))
+        self._regex = re.compile(_trie_pattern(self.keywords)) if self.keywords else None
+
+    def search(self, text: str) -> bool:
+        return self._regex is not None and self._regex.search(text.lower()) is not None
+
+    def findall(self, text: str) -> set[str]:
+        """Distinct keywords found (non-overlapping, longest match at each position)."""
+        if self._regex is None:
+            return set()
+        return set(self._regex.findall(text.lower()))
+
+
+@dataclass(frozen=True)
+class RewardInput:
+    """What a reward mode sees of one turn."""
+
+    output_text: str
+    middle_counts: Mapping[str, int] = field(default_factory=dict)
+    input_text: str = ""
+
+
+# Called as fn(items, **options); options are whatever keyword arguments the mode declares.
+RewardFn = Callable[..., list[float | None]]
+
+_REWARD_MODES: dict[str, RewardFn] = {}
+
+
+def register_reward_mode(name: str) -> Callable[[RewardFn], RewardFn]:
+    """Register a batch reward function under ``name``; it must return one value per input.
+
+    Per-call settings arrive as keyword-only arguments (see ``score_rewards``).
+    """
+
+    def decorator(fn: RewardFn) -> RewardFn:
+        if name in _REWARD_MODES:
+            raise ValueError(f"reward mode already registered: {name}")
+        _REWARD_MODES[name] = fn
+        return fn
+
+    return decorator
+
+
+def reward_modes() -> tuple[str, ...]:
+    return tuple(_REWARD_MODES)
+
+
+def score_rewards(mode: str, items: Sequence[RewardInput], **options: Any) -> list[float | None]:
+    """Score a batch of turns with one call to the reward mode.
+
+    ``options`` are passed through to the mode's function, e.g. ``judge=JudgeConfig(...)`` for
+    the ``judge`` mode. They travel with each call rather than living in a module global so
+    export worker processes, which may be spawned rather than forked, score the same way.
+    """
+    fn = _REWARD_MODES.get(mode)
+    if fn is None:
+        raise ValueError(f"unknown reward mode: {mode}")
+    scores = fn(items, **options)
+    if len(scores) != len(items):
+        raise ValueError(f"reward mode {mode} returned {len(scores)} scores for {len(items)} rows")
+    return scores
+
+
+def _clamp(reward: float) -> float:
+    return max(0.0, min(1.0, round(reward, 4)))
+
+
+_NEGATIVE = KeywordMatcher(NEGATIVE_KEYWORDS)
+
+
+@register_reward_mode("none")
+def _no_reward(items: Sequence[RewardInput]) -> list[float | None]:
+    return [None] * len(items)
+
+
+@register_reward_mode("heuristic-basic")
+def _heuristic_basic(items: Sequence[RewardInput]) -> list[float | None]:
+    scores: list[float | None] = []
+    for item in items:
+        reward = 0.4
+        if item.output_text.strip():
+            reward += 0.25
+        if item.middle_counts.get("tool.result", 0) > 0:
+            reward += 0.2
+        if item.middle_counts.get("system.event", 0) > 0:
+            reward -= 0.1
+        if _NEGATIVE.search(item.output_text):
+            reward -= 0.3
+        scores.append(_clamp(reward))
+    return scores
+
+
+@register_reward_mode("heuristic-text")
+def _heuristic_text(items: Sequence[RewardInput]) -> list[float | None]:
+    # Text-only variant for rows without middle-event counts (runtime smoke on messages rows).
+    scores: list[float | None] = []
+    for item in items:
+        reward = 0.5
+        if item.output_text.strip():
+            reward += 0.2
+        if _NEGATIVE.search(item.output_text):
+            reward -= 0.3
+        scores.append(_clamp(reward))
+    return scores
+
+
+@register_reward_mode("judge")
+def _judge(
+    items: Sequence[RewardInput], *, judge: JudgeConfig | None = None, cache: JudgeCache | None = None
+) -> list[float | None]:
+    # LLM-as-judge against an OpenAI-compatible endpoint; see judge.py for configuration.
+    from .judge import judge_rewards
+
+    return judge_rewards(items, judge, cache)
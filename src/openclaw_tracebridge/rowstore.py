@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import json
+import mmap
+import random
+import sys
+from array import array
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Self
+
+from .compression import open_text
+
+ROWSTORE_SUFFIX = ".tbrows"
+_MAGIC = b"TBROWS1\n"
+_OFFSET_FLUSH_ROWS = 1 << 16
+
+
+def is_rowstore_path(path: Path) -> bool:
+    return path.suffix.lower() == ROWSTORE_SUFFIX
+
+
+def offsets_path_for(path: Path) -> Path:
+    return path.with_name(f"{path.name}.offsets")
+
+
+def _to_le(values: array) -> array:
+    if sys.byteorder != "little":
+        values = array("Q", values)
+        values.byteswap()
+    return values
+
+
+class RowStoreWriter:
+    """Writes a ``.tbrows`` dataset: a payload file holding the rows back to back (one JSON
+    object per line, so it is still readable as JSONL) and an ``<out>.offsets`` table of
+    ``len + 1`` little-endian uint64 byte offsets after an 8-byte magic. Row ``i`` is
+    ``payload[offsets[i]:offsets[i + 1]]``. ``write`` takes one complete line.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._payload = path.open("wb")
+        self._offsets = offsets_path_for(path).open("wb")
+        self._offsets.write(_MAGIC)
+        self._end = 0
+        self._pending = array("Q", [0])
+        self.rows = 0
+
+    def write(self, line: str) -> int:
+        data = line.encode("utf-8")
+        self._payload.write(data)
+        self._end += len(data)
+        self._pending.append(self._end)
+        self.rows += 1
+        if len(self._pending) >= _OFFSET_FLUSH_ROWS:
+            self._flush_offsets()
+        return len(line)
+
+    def _flush_offsets(self) -> None:
+        self._offsets.write(_to_le(self._pending).tobytes())
+        self._pending = array("Q")
+
+    def close(self) -> None:
+        if self._offsets.closed:
+            return
+        self._flush_offsets()
+        self._payload.close()
+        self._offsets.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class RowStore:
+    """Random access to a ``.tbrows`` dataset through memory maps.
+
+    Nothing is read up front: ``row_bytes(i)`` is a zero-copy view into the mapped payload,
+    and the offset table is mapped too, so opening a store of any size costs two ``mmap``
+    calls and a shuffled epoch only touches the pages of the rows it visits. Views returned
+    by ``row_bytes`` must be released (or dropped) before ``close``.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._maps: list[mmap.mmap] = []
+        self._offsets: memoryview | array = array("Q", [0])
+        self._payload = self._map(path)
+        table = self._map(offsets_path_for(path))
+        if bytes(table[: len(_MAGIC)]) != _MAGIC:
+            self.close()
+            raise ValueError(f"not a row store offset table: {offsets_path_for(path)}")
+        width = len(table) - len(_MAGIC)
+        if width % 8 or width < 8:
+            self.close()
+            raise ValueError(f"truncated row store offset table: {offsets_path_for(path)}")
+        if sys.byteorder == "little":
+            self._offsets = memoryview(table)[len(_MAGIC) :].cast("Q")
+        else:
+            self._offsets = array("Q", table[len(_MAGIC) :])
+            self._offsets.byteswap()
+        if self._offsets[-1] != len(self._payload):
+            self.close()
+            raise ValueError(f"row store payload does not match its offset table: {path}")
+
+    def _map(self, path: Path) -> mmap.mmap | bytes:
+        with path.open("rb") as f:
+            if not path.stat().st_size:
+                return b""
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return mapped
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def row_bytes(self, i: int) -> memoryview:
+        """Row ``i``'s JSON as a view into the payload (no trailing newline, no copy)."""
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        end = self._offsets[i + 1]
+        if end > self._offsets[i] and self._payload[end - 1] == 0x0A:
+            end -= 1
+        return memoryview(self._payload)[self._offsets[i] : end]
+
+    def __getitem__(self, i: int) -> dict[str, Any]:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        # Slicing the map copies just this row, which json.loads needs as bytes anyway.
+        return json.loads(self._payload[self._offsets[i] : self._offsets[i + 1]])
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def shuffled_indices(self, seed: int) -> array:
+        """A seeded permutation of row indices, held as a compact uint64 array."""
+        order = array("Q", range(len(self)))
+        random.Random(seed).shuffle(order)
+        return order
+
+    def iter_shuffled(self, seed: int) -> Iterator[dict[str, Any]]:
+        for i in self.shuffled_indices(seed):
+            yield self[i]
+
+    def close(self) -> None:
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def jsonl_to_rowstore(in_path: Path, out_path: Path) -> int:
+    """Convert a JSONL dataset (plain or compressed) to ``.tbrows``; returns rows written."""
+    with open_text(in_path) as src, RowStoreWriter(out_path) as dst:
+        for line in src:
+            if line.strip():
+                dst.write(line if line.endswith("\n") else line + "\n")
+        return dst.rows
+
+
+def rowstore_to_jsonl(in_path: Path, out_path: Path) -> int:
+    with RowStore(in_path) as store, open_text(out_path, "w") as dst:
+        for i in range(len(store)):
+            dst.write(bytes(store.row_bytes(i)).decode("utf-8") + "\n")
+        return len(store)
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from .io import FsyncPolicy, JsonlTraceWriter
+from .schema import EventKind, IdScheme, MonotonicIdGenerator, dump_event_json, new_run_id
+
+DEFAULT_BUDGET_NS = 5_000
+_TIMING_MASK = 1023  # time one emit call in every 1024
+
+
+@dataclass
+class EmitterStats:
+    emitted: int
+    sampled_out: int
+    overruns: int
+    rejected: int
+    written: int
+    write_errors: int
+    sample_every: int
+    emit_ns_ewma: float
+
+
+class TraceEmitter:
+    """In-process event sink for OpenClaw with a bounded caller-side cost.
+
+    ``emit`` only claims a sequence id, stamps ``time.time_ns()`` and stores a tuple into a
+    preallocated ring slot; a drain thread validates the kind, serializes with
+    ``dump_event_json`` and writes through ``JsonlTraceWriter``. Ownership of ``attrs`` passes
+    to the emitter, so callers must not mutate it afterwards.
+
+    Nothing on the caller thread blocks. If producers lap the drain thread, the overwritten
+    events are counted as overruns. With ``adaptive_sampling`` the emitter samples one call in
+    1024, and doubles ``sample_every`` when the smoothed emit cost exceeds ``budget_ns`` or
+    the ring overruns. It halves ``sample_every`` again once the cost is back under half the
+    budget.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        run_id: str | None = None,
+        *,
+        actor: str = "openclaw",
+        capacity: int = 1 << 16,
+        budget_ns: int = DEFAULT_BUDGET_NS,
+        sample_every: int = 1,
+        adaptive_sampling: bool = True,
+        max_sample_every: int = 1024,
+        drain_interval_s: float = 0.05,
+        fsync: FsyncPolicy = "none",
+        rotate_bytes: int | None = None,
+        id_scheme: IdScheme = "uuid4",
+    ) -> None:
+        if id_scheme not in ("uuid4", "ulid"):
+            raise ValueError(f"unknown id scheme: {id_scheme}")
+        size = 1
+        while size < max(2, capacity):
+            size <<= 1
+        self.run_id = run_id or new_run_id(id_scheme=id_scheme)
+        # ULIDs are minted on the drain thread from the emit timestamp, not on the caller.
+        self._ids = MonotonicIdGenerator() if id_scheme == "ulid" else None
+        self.actor = actor
+        self.budget_ns = budget_ns
+        self.base_sample_every = max(1, sample_every)
+        self.sample_every = self.base_sample_every
+        self.adaptive_sampling = adaptive_sampling
+        self.max_sample_every = max(self.base_sample_every, max_sample_every)
+        self.drain_interval_s = drain_interval_s
+        self._writer = JsonlTraceWriter(path, flush_every=1 << 30, fsync=fsync, rotate_bytes=rotate_bytes)
+        self._ring: list[tuple[Any, ...] | None] = [None] * size
+        self._mask = size - 1
+        self._calls = itertools.count(1)
+        self._seq = itertools.count(1)
+        self._next_read = 1
+        self._emitted = 0
+        self._sampled_out = 0
+        self._overruns = 0
+        self._rejected = 0
+        self._written = 0
+        self._uncommitted = 0
+        self._write_errors = 0
+        self._ewma_ns = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="tracebridge-emit-drain", daemon=True)
+        self._thread.start()
+
+    @property
+    def path(self) -> Path:
+        return self._writer.path
+
+    def emit(
+        self,
+        kind: EventKind | str,
+        attrs: dict[str, Any] | None = None,
+        *,
+        token_estimate: int | None = None,
+        prompt_chars: int | None = None,
+        response_chars: int | None = None,
+        cost_usd_micros: int | None = None,
+    ) -> bool:
+        call = next(self._calls)
+        if self.sample_every > 1 and call % self.sample_every:
+            self._sampled_out += 1
+            return False
+        timed = not call & _TIMING_MASK
+        if timed:
+            started = time.perf_counter_ns()
+        seq = next(self._seq)
+        self._ring[seq & self._mask] = (
+            seq,
+            time.time_ns(),
+            kind,
+            attrs,
+            token_estimate,
+            prompt_chars,
+            response_chars,
+            cost_usd_micros,
+        )
+        self._emitted += 1
+        if timed:
+            self._observe_cost(time.perf_counter_ns() - started)
+        return True
+
+    def _observe_cost(self, elapsed_ns: int) -> None:
+        self._ewma_ns = elapsed_ns if not self._ewma_ns else 0.8 * self._ewma_ns + 0.2 * elapsed_ns
+        if not self.adaptive_sampling:
+            return
+        if self._ewma_ns > self.budget_ns:
+            self._raise_sampling()
+        elif self._ewma_ns < self.budget_ns / 2 and self.sample_every > self.base_sample_every:
+            self.sample_every = max(self.base_sample_every, self.sample_every // 2)
+
+    def _raise_sampling(self) -> None:
+        self.sample_every = min(self.max_sample_every, self.sample_every * 2)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.drain_interval_s):
+            self._drain()
+        self._drain()
+
+    def _drain(self) -> None:
+        ring = self._ring
+        mask = self._mask
+        read = self._next_read
+        overran = False
+        while True:
+            item = ring[read & mask]
+            if item is None or item[0] < read:
+                break  # slot claimed but not yet stored, or nothing new
+            if item[0] > read:
+                self._overruns += item[0] - read
+                overran = True
+            seq, ts_ns, kind, attrs, token_estimate, prompt_chars, response_chars, cost = item
+            read = seq + 1
+            # Each event is rejected on its own (unknown kind, attrs that cannot be serialized),
+            # so one bad payload never stops the drain thread.
+            try:
+                line = dump_event_json(
+                    event_id=f"ev_{self._ids.new(ts_ns // 1_000_000)}" if self._ids is not None else None,
+                    run_id=self.run_id,
+                    sequence_id=seq,
+                    kind=EventKind(kind),
+                    actor=self.actor,
+                    attrs=attrs,
+                    token_estimate=token_estimate,
+                    prompt_chars=prompt_chars,
+                    response_chars=response_chars,
+                    cost_usd_micros=cost,
+                    ts=datetime.fromtimestamp(ts_ns / 1e9, UTC),
+                )
+            except (ValueError, TypeError, OverflowError):
+                self._rejected += 1
+                continue
+            self._uncommitted += 1
+            self._commit(partial(self._writer.append_json, line))
+        self._next_read = read
+        self._commit(self._writer.flush)
+        if overran and self.adaptive_sampling:
+            self._raise_sampling()
+
+    def _commit(self, step: Callable[[], None]) -> None:
+        # Events count as written only once the writer has committed them; a failed write
+        # loses the whole buffer, which is counted in write_errors instead.
+        try:
+            step()
+        except OSError:
+            self._write_errors += self._uncommitted
+            self._uncommitted = 0
+            return
+        if not self._writer.buffered:
+            self._written += self._uncommitted
+            self._uncommitted = 0
+
+    def stats(self) -> EmitterStats:
+        return EmitterStats(
+            emitted=self._emitted,
+            sampled_out=self._sampled_out,
+            overruns=self._overruns,
+            rejected=self._rejected,
+            written=self._written,
+            write_errors=self._write_errors,
+            sample_every=self.sample_every,
+            emit_ns_ewma=round(self._ewma_ns, 1),
+        )
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._writer.close()
+
+
+_default: TraceEmitter | None = None
+
+
+def configure(path: Path, run_id: str | None = None, **kwargs: Any) -> TraceEmitter:
+    """Install the process-wide emitter used by ``emit`` (replacing any previous one)."""
+    global _default
+    shutdown()
+    _default = TraceEmitter(path, run_id, **kwargs)
+    return _default
+
+
+def emit(kind: EventKind | str, attrs: dict[str, Any] | None = None, **fields: Any) -> bool:
+    """Record one runtime event on the configured emitter; a no-op returning False if unset."""
+    emitter = _default
+    if emitter is None:
+        return False
+    return emitter.emit(kind, attrs, **fields)
+
+
+def shutdown() -> None:
+    global _default
+    emitter, _default = _default, None
+    if emitter is not None:
+        emitter.close()
+
+
+def bench_emit(path: Path, events: int = 200_000) -> dict[str, Any]:
+    """Measure caller-thread cost of ``TraceEmitter.emit`` with sampling disabled."""
+    emitter = TraceEmitter(path, run_id="run_emit_bench", capacity=events, adaptive_sampling=False)
+    attrs = {"role": "assistant", "type": "message", "content_chars": 42}
+    emit_fn = emitter.emit
+    kind = EventKind.TOOL_CALL
+    started = time.perf_counter_ns()
+    for _ in range(events):
+        emit_fn(kind, attrs, token_estimate=12)
+    elapsed = time.perf_counter_ns() - started
+    emitter.close()
+    stats = emitter.stats()
+    per_event = elapsed / events
+    return {
+        "events": events,
+        "ns_per_event": round(per_event, 1),
+        "budget_ns": DEFAULT_BUDGET_NS,
+        "within_budget": per_event <= DEFAULT_BUDGET_NS,
+        "written": stats.written,
+        "overruns": stats.overruns,
+    }
@@ -6,6 +6,9 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+from .compression import open_text
+from .rewards import RewardInput, score_rewards
+
 
 @dataclass
 class RuntimeSmokeSummary:
@@ -20,7 +23,7 @@ class RuntimeSmokeSummary:
 
 def _read_jsonl(path: Path) -> list[dict[str, Any]]:
     rows: list[dict[str, Any]] = []
-    with path.open("r", encoding="utf-8") as f:
+    with open_text(path) as f:
         for line in f:
             line = line.strip()
             if not line:
@@ -47,16 +50,6 @@ def _valid_messages_rows(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
     return out
 
 
-def _reward_from_assistant_text(text: str) -> float:
-    low = text.lower()
-    reward = 0.5
-    if len(text.strip()) > 0:
-        reward += 0.2
-    if any(k in low for k in ["error", "failed", "exception", "timeout"]):
-        reward -= 0.3
-    return max(0.0, min(1.0, round(reward, 4)))
-
-
 def run_agent_lightning_runtime_smoke(messages_path: Path, *, max_rows: int = 10) -> RuntimeSmokeSummary:
     try:
         from agentlightning import OtelTracer, emit_reward
@@ -87,17 +80,21 @@ def run_agent_lightning_runtime_smoke(messages_path: Path, *, max_rows: int = 10
             rollout_id=None,
         )
 
+    rewards = score_rewards(
+        "heuristic-text",
+        [RewardInput(str(row["messages"][1].get("content", ""))) for row in rows_used],
+    )
+
     async def _run() -> tuple[int, str]:
         tracer = OtelTracer()
         store = InMemoryLightningStore()
         rollout = await store.start_rollout(input={"origin": "tracebridge.runtime_smoke"})
 
         with tracer.lifespan(store):
-            for i, row in enumerate(rows_used, start=1):
+            for i, (row, reward) in enumerate(zip(rows_used, rewards), start=1):
                 messages = row["messages"]
                 user_text = str(messages[0].get("content", ""))
                 assistant_text = str(messages[1].get("content", ""))
-                reward = _reward_from_assistant_text(assistant_text)
 
                 async with tracer.trace_context(
                     f"tb-runtime-{i}",
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import os
+import random
+import threading
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
 from enum import StrEnum
 from typing import Any, Literal
 from uuid import uuid4
 
 from pydantic import BaseModel, Field
+from pydantic_core import to_json
 
 
 class EventKind(StrEnum):
@@ -21,12 +27,146 @@ class EventKind(StrEnum):
     NOTE = "note"
 
 
+# ULIDs draw from a private generator seeded from os.urandom, so a host process that seeds the
+# global `random` module (OpenClaw, a trainer) cannot make ids repeat across runs or processes.
+_rng = random.Random(os.urandom(32))
+
+
+def _reseed_rng() -> None:
+    _rng.seed(os.urandom(32))
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reseed_rng)
+
+
+def new_event_id() -> str:
+    return f"ev_{uuid4().hex}"
+
+
+IdScheme = Literal["uuid4", "ulid"]
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_CROCKFORD_PAIRS = [a + b for a in _CROCKFORD for b in _CROCKFORD]  # 10 bits per lookup
+_ULID_RANDOM_BITS = 80
+_ULID_LOW_BITS = 30
+_ULID_LOW_MASK = (1 << _ULID_LOW_BITS) - 1
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def ts_to_micros(value: Any) -> int | None:
+    """Microseconds since ``EPOCH`` for a datetime or ISO-8601 string, naive ones taken as UTC.
+
+    None for anything else, including strings that do not parse.
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    delta = value - EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def micros_to_ts(micros: int) -> datetime:
+    """Inverse of ``ts_to_micros``: a UTC datetime."""
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def _encode_crockford(value: int, chars: int) -> str:
+    pairs = _CROCKFORD_PAIRS
+    return "".join(pairs[(value >> shift) & 0x3FF] for shift in range((chars - 2) * 5, -1, -10))
+
+
+class MonotonicIdGenerator:
+    """ULID-style identifiers: a 48-bit Unix millisecond timestamp followed by 80 random bits,
+    written as 26 Crockford base32 characters so string order is creation order.
+
+    Within one millisecond (or if the clock steps back) the random part is incremented rather
+    than redrawn, so ids from one generator are strictly increasing. Fresh random bits per
+    millisecond keep concurrent processes apart; forked children start from a clean state.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._last_ms = -1
+        self._high = 0  # upper 50 random bits, encoded into self._head with the timestamp
+        self._low = 0  # lower 30 random bits, the part that counts within a millisecond
+        self._head = ""
+
+    def _reseed(self, ms: int) -> None:
+        self._last_ms = ms
+        # One bit of headroom so increments within a millisecond never overflow in practice.
+        bits = _rng.getrandbits(_ULID_RANDOM_BITS - 1)
+        self._high = bits >> _ULID_LOW_BITS
+        self._low = bits & _ULID_LOW_MASK
+        self._head = _encode_crockford(ms, 10) + _encode_crockford(self._high, 10)
+
+    def new(self, timestamp_ms: int | None = None) -> str:
+        ms = time.time_ns() // 1_000_000 if timestamp_ms is None else timestamp_ms
+        with self._lock:
+            if ms > self._last_ms:
+                self._reseed(ms)
+            else:
+                self._low += 1
+                if self._low > _ULID_LOW_MASK:
+                    self._low = 0
+                    self._high += 1
+                    if self._high >> (_ULID_RANDOM_BITS - _ULID_LOW_BITS):
+                        self._reseed(self._last_ms + 1)
+                    else:
+                        self._head = self._head[:10] + _encode_crockford(self._high, 10)
+            head, low = self._head, self._low
+        p = _CROCKFORD_PAIRS
+        return head + p[low >> 20] + p[low >> 10 & 0x3FF] + p[low & 0x3FF]
+
+
+_ulid = MonotonicIdGenerator()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_ulid._reset)
+
+
+def new_ulid(timestamp_ms: int | None = None) -> str:
+    return _ulid.new(timestamp_ms)
+
+
+def new_ulid_event_id(timestamp_ms: int | None = None) -> str:
+    return f"ev_{_ulid.new(timestamp_ms)}"
+
+
+def event_id_factory(scheme: IdScheme = "uuid4") -> Callable[[], str]:
+    if scheme == "uuid4":
+        return new_event_id
+    if scheme == "ulid":
+        return new_ulid_event_id
+    raise ValueError(f"unknown id scheme: {scheme}")
+
+
+def ulid_timestamp(value: str) -> datetime:
+    """Creation time encoded in a ULID, a ULID event id (``ev_...``) or a ULID run id."""
+    ms = int("".join(f"{_CROCKFORD.index(c):05b}" for c in value[-26:-16].upper()), 2)
+    return EPOCH + timedelta(milliseconds=ms)
+
+
+def ulid_lower_bound(ts: datetime, prefix: str = "ev_") -> str:
+    """Smallest id of ``prefix`` created at or after ``ts``, for range lookups on sorted ids."""
+    ms = ts_to_micros(ts) // 1000
+    return prefix + _encode_crockford(ms, 10) + "0" * 16
+
+
 class TraceEvent(BaseModel):
     schema_version: Literal["tracebridge.event.v1"] = "tracebridge.event.v1"
-    event_id: str = Field(default_factory=lambda: f"ev_{uuid4().hex}")
+    event_id: str = Field(default_factory=new_event_id)
     run_id: str
     sequence_id: int = Field(ge=1)
-    ts: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    ts: datetime = Field(default_factory=lambda: datetime.now(UTC))
     kind: EventKind
     actor: str = "openclaw"
     attrs: dict[str, Any] = Field(default_factory=dict)
@@ -37,12 +177,51 @@ class TraceEvent(BaseModel):
     cost_usd_micros: int | None = Field(default=None, ge=0)
 
 
+def dump_event_json(
+    *,
+    run_id: str,
+    sequence_id: int,
+    kind: EventKind | str,
+    actor: str = "openclaw",
+    attrs: dict[str, Any] | None = None,
+    token_estimate: int | None = None,
+    prompt_chars: int | None = None,
+    response_chars: int | None = None,
+    cost_usd_micros: int | None = None,
+    event_id: str | None = None,
+    ts: datetime | None = None,
+) -> bytes:
+    """Serialize an event straight to JSON bytes without building or validating a TraceEvent.
+
+    Meant for trusted producers such as the importer. For the same field values the output is
+    byte-identical to ``TraceEvent(...).model_dump_json()``.
+    """
+    return to_json(
+        {
+            "schema_version": "tracebridge.event.v1",
+            "event_id": event_id if event_id is not None else new_event_id(),
+            "run_id": run_id,
+            "sequence_id": sequence_id,
+            "ts": ts if ts is not None else datetime.now(UTC),
+            "kind": str(kind),
+            "actor": actor,
+            "attrs": attrs if attrs is not None else {},
+            "token_estimate": token_estimate,
+            "prompt_chars": prompt_chars,
+            "response_chars": response_chars,
+            "cost_usd_micros": cost_usd_micros,
+        },
+        inf_nan_mode="null",
+    )
+
+
 class RunMeta(BaseModel):
     schema_version: Literal["tracebridge.run.v1"] = "tracebridge.run.v1"
     run_id: str
     session_key: str | None = None
     source: str = "openclaw"
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    event_id_scheme: IdScheme = "uuid4"
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
     capabilities: list[str] = Field(
         default_factory=lambda: [
             "tracebridge.event.v1",
@@ -53,5 +232,7 @@ class RunMeta(BaseModel):
     )
 
 
-def new_run_id(prefix: str = "run") -> str:
-    return f"{prefix}_{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}_{uuid4().hex[:8]}"
+def new_run_id(prefix: str = "run", id_scheme: IdScheme = "uuid4") -> str:
+    if id_scheme == "ulid":
+        return f"{prefix}_{new_ulid()}"
+    return f"{prefix}_{datetime.now(UTC).strftime('%Y%m%dT%H%M%SZ')}_{uuid4().hex[:8]}"
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import IO, Any, Self
+
+from .compression import open_text
+from .io import event_segments, segment_path
+from .rowstore import RowStoreWriter, is_rowstore_path, offsets_path_for
+
+SHARD_INDEX_SCHEMA = "tracebridge.shards.v0"
+_HASH_CHUNK_BYTES = 1 << 20
+
+
+@dataclass(frozen=True)
+class ShardSpec:
+    """How to split one dataset file: into ``shards`` files of roughly equal size, or into as
+    many files as needed to keep each under ``max_rows`` rows and ``max_bytes`` bytes."""
+
+    shards: int | None = None
+    max_rows: int | None = None
+    max_bytes: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.shards is not None and (self.max_rows is not None or self.max_bytes is not None):
+            raise ValueError("use either a shard count or per-shard row/byte targets, not both")
+        for name in ("shards", "max_rows", "max_bytes"):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} must be positive")
+        if self.shards is None and self.max_rows is None and self.max_bytes is None:
+            raise ValueError("a shard spec needs shards, max_rows or max_bytes")
+
+
+@dataclass
+class ShardInfo:
+    path: str
+    rows: int
+    bytes: int
+    sha256: str
+    # Files written next to the shard that its readers need (the ``.offsets`` table of a
+    # ``.tbrows`` shard).
+    sidecars: list[str] = field(default_factory=list)
+
+
+def _shard_files(shard: Path) -> list[Path]:
+    return [shard, offsets_path_for(shard)] if is_rowstore_path(shard) else [shard]
+
+
+def shard_path(out_path: Path, index: int) -> Path:
+    """``messages.jsonl`` -> ``messages.00000.jsonl`` (codec suffix kept outermost)."""
+    return segment_path(out_path, index)
+
+
+def shard_index_path(out_path: Path) -> Path:
+    return out_path.with_name(f"{out_path.name}.shards.json")
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(_HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ShardedWriter:
+    """Line writer that spreads one dataset over shard files and, on close, writes a shard
+    index (``<out>.shards.json``) with each shard's rows, on-disk bytes and sha256.
+
+    Shards left over from an earlier export under the same name are removed first, so a
+    re-export with fewer shards does not leave stale files next to the new index.
+
+    With a shard count every shard is created up front and each line goes to the shard with
+    the fewest bytes so far, so data-parallel readers get near-equal work. With row/byte
+    targets shards are filled in order and a new one starts when the next line would cross
+    a target. ``write`` takes one complete line.
+    """
+
+    def __init__(self, out_path: Path, spec: ShardSpec) -> None:
+        self.out_path = out_path
+        self.spec = spec
+        self._handles: list[IO[str] | RowStoreWriter] = []
+        self._rows: list[int] = []
+        self._bytes: list[int] = []
+        self._smallest: list[tuple[int, int]] = []
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        for stale in event_segments(out_path):
+            if stale != out_path:
+                for path in _shard_files(stale):
+                    path.unlink(missing_ok=True)
+        if spec.shards is not None:
+            for _ in range(spec.shards):
+                self._open_next()
+            self._smallest = [(0, i) for i in range(spec.shards)]
+
+    def _open_next(self) -> None:
+        self._handles.append(open_dataset_writer(shard_path(self.out_path, len(self._handles))))
+        self._rows.append(0)
+        self._bytes.append(0)
+
+    def _target(self, size: int) -> int:
+        if self.spec.shards is not None:
+            written, i = heapq.heappop(self._smallest)
+            heapq.heappush(self._smallest, (written + size, i))
+            return i
+        i = len(self._handles) - 1
+        if i < 0 or self._full(i, size):
+            if i >= 0:
+                self._handles[i].close()
+            self._open_next()
+            i += 1
+        return i
+
+    def _full(self, i: int, size: int) -> bool:
+        if not self._rows[i]:
+            return False  # a line over the byte target still gets a shard of its own
+        if self.spec.max_rows is not None and self._rows[i] >= self.spec.max_rows:
+            return True
+        return self.spec.max_bytes is not None and self._bytes[i] + size > self.spec.max_bytes
+
+    def write(self, line: str) -> int:
+        size = len(line.encode("utf-8"))
+        i = self._target(size)
+        self._handles[i].write(line)
+        self._rows[i] += 1
+        self._bytes[i] += size
+        return len(line)
+
+    def close(self) -> list[ShardInfo]:
+        if self.spec.shards is None and not self._handles:
+            self._open_next()  # an empty dataset still has one (empty) shard
+        for f in self._handles:
+            f.close()
+        shards = []
+        for i, rows in enumerate(self._rows):
+            path = shard_path(self.out_path, i)
+            sidecars = [p.name for p in _shard_files(path)[1:]]
+            shards.append(ShardInfo(path.name, rows, path.stat().st_size, _file_sha256(path), sidecars))
+        write_shard_index(self.out_path, shards)
+        return shards
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def write_shard_index(out_path: Path, shards: list[ShardInfo]) -> Path:
+    index_path = shard_index_path(out_path)
+    payload: dict[str, Any] = {
+        "schema": SHARD_INDEX_SCHEMA,
+        "dataset": out_path.name,
+        "rows": sum(s.rows for s in shards),
+        "bytes": sum(s.bytes for s in shards),
+        "shards": [asdict(s) for s in shards],
+    }
+    tmp = index_path.with_name(f"{index_path.name}.tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(index_path)
+    return index_path
+
+
+def load_shard_index(out_path: Path) -> list[ShardInfo]:
+    payload = json.loads(shard_index_path(out_path).read_text(encoding="utf-8"))
+    if payload.get("schema") != SHARD_INDEX_SCHEMA:
+        raise ValueError(f"unsupported shard index schema: {payload.get('schema')}")
+    return [ShardInfo(**s) for s in payload["shards"]]
+
+
+def open_dataset_writer(
+    out_path: Path, shards: ShardSpec | None = None, mode: str = "w"
+) -> IO[str] | RowStoreWriter | ShardedWriter:
+    """A single text file, a ``RowStoreWriter`` for ``.tbrows`` paths, or a ``ShardedWriter``
+    (whose shards are either) when ``shards`` is given."""
+    if mode != "w" and (shards is not None or is_rowstore_path(out_path)):
+        raise ValueError("sharded and .tbrows datasets are written in one go; appending is not supported")
+    if shards is not None:
+        return ShardedWriter(out_path, shards)
+    if is_rowstore_path(out_path):
+        return RowStoreWriter(out_path)
+    return open_text(out_path, mode)
@@ -0,0 +1,56 @@
+from datetime import UTC, datetime
+from pathlib import Path
+
+from openclaw_tracebridge.batch import EventBatch, iter_event_batches, load_event_batch
+from openclaw_tracebridge.columnar import jsonl_to_columnar
+from openclaw_tracebridge.io import JsonlTraceWriter, iter_events
+from openclaw_tracebridge.schema import EventKind, TraceEvent
+
+
+def _write(path: Path) -> None:
+    with JsonlTraceWriter(path, flush_every=50) as writer:
+        for seq in range(1, 11):
+            writer.append(
+                TraceEvent(
+                    run_id="run_a" if seq <= 6 else "run_b",
+                    sequence_id=seq,
+                    ts=datetime(2026, 2, 9, 0, 0, seq, 500, tzinfo=UTC),
+                    kind=EventKind.AGENT_INPUT if seq % 2 else EventKind.AGENT_OUTPUT,
+                    attrs={"content": f"text {seq}", "nested": {"attrs": [1, 2]}},
+                    token_estimate=seq if seq % 3 else None,
+                )
+            )
+
+
+def test_event_batch_round_trips_to_trace_events(tmp_path: Path) -> None:
+    events = tmp_path / "events.jsonl"
+    _write(events)
+
+    batch = load_event_batch(events)
+    assert len(batch) == 10
+    assert batch.runs == ["run_a", "run_b"]
+    assert batch.kinds == ["agent.input", "agent.output"]
+    assert list(batch.iter_events()) == list(iter_events(events))
+
+    view = batch[2]
+    assert view.kind == EventKind.AGENT_INPUT
+    assert view.attrs["content"] == "text 3"
+    assert view.token_estimate is None and batch[-1].token_estimate == 10
+    assert view.to_event().model_dump_json() == batch.to_event(2).model_dump_json()
+
+
+def test_event_batch_sources_and_chunking(tmp_path: Path) -> None:
+    events = tmp_path / "events.jsonl"
+    _write(events)
+    segment = tmp_path / "events.tbcol"
+    jsonl_to_columnar(events, segment)
+
+    assert [e.event_id for e in load_event_batch(segment)] == [e.event_id for e in iter_events(events)]
+    assert [v.sequence_id for v in load_event_batch(events, run_id="run_b")] == [7, 8, 9, 10]
+    assert [len(b) for b in iter_event_batches(events, batch_size=4)] == [4, 4, 2]
+
+    line = b'{"kind":"note","run_id":"r","sequence_id":1,"ts":"2026-02-09T00:00:00+02:00"}'
+    odd = EventBatch.from_lines([line])
+    assert odd[0].ts == datetime(2026, 2, 8, 22, 0, tzinfo=UTC)
+    assert odd[0].to_event().actor == "openclaw"
+    assert odd[0].to_event().event_id.startswith("ev_")
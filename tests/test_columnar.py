@@ -0,0 +1,57 @@
+import json
+from datetime import UTC, datetime
+from pathlib import Path
+
+from openclaw_tracebridge.cli import main
+from openclaw_tracebridge.columnar import ColumnarSegment, columnar_to_jsonl, jsonl_to_columnar
+from openclaw_tracebridge.io import JsonlTraceWriter, iter_event_fields, iter_events
+from openclaw_tracebridge.schema import EventKind, TraceEvent
+
+
+def _write_events(path: Path) -> None:
+    with JsonlTraceWriter(path, flush_every=100) as writer:
+        for seq in range(1, 31):
+            writer.append(
+                TraceEvent(
+                    run_id="run_col",
+                    sequence_id=seq,
+                    ts=datetime(2026, 2, 9, 0, 0, seq % 60, seq * 7, tzinfo=UTC),
+                    kind=EventKind.TOOL_CALL if seq % 2 else EventKind.AGENT_OUTPUT,
+                    attrs={"role": "assistant", "type": "message", "content_chars": seq, "profile": "lean"},
+                    token_estimate=seq,
+                    cost_usd_micros=None if seq % 3 else seq,
+                )
+            )
+
+
+def test_columnar_roundtrip_is_byte_identical(tmp_path: Path) -> None:
+    src = tmp_path / "events.jsonl"
+    seg = tmp_path / "events.tbcol"
+    back = tmp_path / "back.jsonl"
+    _write_events(src)
+
+    assert jsonl_to_columnar(src, seg) == 30
+    assert columnar_to_jsonl(seg, back) == 30
+    assert back.read_bytes() == src.read_bytes()
+    assert seg.stat().st_size < src.stat().st_size
+
+    segment = ColumnarSegment(seg)
+    assert segment.dictionaries["run_id"] == ["run_col"]
+    assert sum(segment.column("token_estimate")) == sum(range(1, 31))
+
+
+def test_iter_events_and_stats_dispatch_on_columnar(tmp_path: Path, capsys) -> None:
+    src = tmp_path / "events.jsonl"
+    seg = tmp_path / "events.tbcol"
+    _write_events(src)
+    assert main(["convert-events", "--input", str(src), "--out", str(seg)]) == 0
+    capsys.readouterr()
+
+    assert [e.model_dump() for e in iter_events(seg)] == [e.model_dump() for e in iter_events(src)]
+    fields = ("kind", "cost_usd_micros")
+    assert list(iter_event_fields(seg, fields)) == list(iter_event_fields(src, fields))
+
+    assert main(["stats", "--events", str(seg)]) == 0
+    col_stats = json.loads(capsys.readouterr().out)
+    assert main(["stats", "--events", str(src)]) == 0
+    assert col_stats == json.loads(capsys.readouterr().out)
@@ -0,0 +1,90 @@
+import gzip
+import json
+import lzma
+from pathlib import Path
+
+from openclaw_tracebridge.adapters.openclaw_session import (
+    checkpoint_path_for,
+    discover_session_files,
+    import_openclaw_session,
+    session_run_id,
+)
+from openclaw_tracebridge.compression import iter_frames
+from openclaw_tracebridge.index import (
+    build_event_index,
+    index_path_for,
+    iter_selected_events,
+    save_event_index,
+)
+from openclaw_tracebridge.io import JsonlTraceWriter, event_segments, iter_event_fields, iter_events
+from openclaw_tracebridge.replay import split_jsonl_for_replay
+from openclaw_tracebridge.schema import EventKind, TraceEvent
+
+
+def _event(seq: int, kind: EventKind = EventKind.NOTE) -> TraceEvent:
+    return TraceEvent(run_id="run_gz", sequence_id=seq, kind=kind, attrs={"i": seq})
+
+
+def test_compressed_writer_appends_frames_and_index_seeks(tmp_path: Path) -> None:
+    out = tmp_path / "events.jsonl.gz"
+    with JsonlTraceWriter(out, flush_every=4) as writer:
+        for seq in range(1, 11):
+            writer.append(_event(seq, EventKind.TOOL_CALL if seq % 3 == 0 else EventKind.NOTE))
+    # A second writer appends to the same file without rewriting it.
+    with JsonlTraceWriter(out, flush_every=100) as writer:
+        writer.append(_event(11, EventKind.TOOL_CALL))
+
+    assert len(list(iter_frames(out))) == 4
+    with gzip.open(out, "rt", encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 11
+    assert [e.sequence_id for e in iter_events(out)] == list(range(1, 12))
+    assert [r["sequence_id"] for r in iter_event_fields(out, ["sequence_id"])][-1] == 11
+
+    save_event_index(build_event_index(out), index_path_for(out))
+    picked = list(iter_selected_events(out, kinds=["tool.call"]))
+    assert [e.sequence_id for e in picked] == [3, 6, 9, 11]
+
+
+def test_compressed_writer_rotation_keeps_codec_suffix(tmp_path: Path) -> None:
+    out = tmp_path / "events.jsonl.xz"
+    with JsonlTraceWriter(out, flush_every=1, rotate_bytes=1) as writer:
+        for seq in range(1, 4):
+            writer.append(_event(seq))
+
+    names = [p.name for p in event_segments(out)]
+    assert names == ["events.00001.jsonl.xz", "events.00002.jsonl.xz", "events.00003.jsonl.xz"]
+    assert [e.sequence_id for p in event_segments(out) for e in iter_events(p)] == [1, 2, 3]
+
+
+def test_import_compressed_session_with_resume(tmp_path: Path) -> None:
+    src = tmp_path / "sessions" / "abc.jsonl.gz"
+    src.parent.mkdir()
+    rows = [{"type": "message", "message": {"role": "user", "content": f"q{i}"}} for i in range(3)]
+    with gzip.open(src, "wt", encoding="utf-8") as f:
+        f.write("".join(json.dumps(r) + "\n" for r in rows))
+
+    assert discover_session_files(src.parent) == [src]
+    assert session_run_id(src).startswith("run_abc_")
+
+    out = tmp_path / "events.jsonl.gz"
+    ckpt = checkpoint_path_for(out)
+    assert import_openclaw_session(src, out, run_id="run_abc", checkpoint=ckpt) == 3
+
+    with gzip.open(src, "at", encoding="utf-8") as f:
+        f.write(json.dumps({"type": "message", "message": {"role": "assistant", "content": "a"}}) + "\n")
+    assert import_openclaw_session(src, out, run_id="run_abc", checkpoint=ckpt) == 1
+    assert [e.sequence_id for e in iter_events(out)] == [1, 2, 3, 4]
+
+
+def test_replay_split_reads_and_writes_compressed(tmp_path: Path) -> None:
+    src = tmp_path / "messages.jsonl.xz"
+    with lzma.open(src, "wt", encoding="utf-8") as f:
+        for i in range(20):
+            f.write(json.dumps({"id": f"row_{i}"}) + "\n")
+
+    out_a = tmp_path / "a.jsonl.gz"
+    out_b = tmp_path / "b.jsonl.gz"
+    summary = split_jsonl_for_replay(src, out_a, out_b)
+    assert summary.input_rows == 20
+    with gzip.open(out_a, "rt", encoding="utf-8") as fa, gzip.open(out_b, "rt", encoding="utf-8") as fb:
+        assert len(fa.read().splitlines()) + len(fb.read().splitlines()) == 20
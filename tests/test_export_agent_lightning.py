@@ -2,12 +2,26 @@ import json
 from pathlib import Path
 
 from openclaw_tracebridge.cli import main
+from openclaw_tracebridge.exporters.agent_lightning import (
+    ExportTarget,
+    blocks_path_for,
+    export_agent_lightning,
+    export_to_agent_lightning_messages,
+    export_to_agent_lightning_triplets,
+    load_export_watermark,
+    watermark_path_for,
+)
+from openclaw_tracebridge.io import JsonlTraceWriter
 
 
 def _write_events(path: Path, rows: list[dict]) -> None:
     path.write_text("\n".join(json.dumps(r) for r in rows) + "\n", encoding="utf-8")
 
 
+def _event(run: str, seq: int, kind: str, content: str = "x") -> dict:
+    return {"run_id": run, "sequence_id": seq, "kind": kind, "attrs": {"content": content}}
+
+
 def test_export_agent_lightning_messages(tmp_path: Path) -> None:
     events = tmp_path / "events.jsonl"
     out = tmp_path / "messages.jsonl"
@@ -126,3 +140,227 @@ def test_export_agent_lightning_triplets_heuristic_reward(tmp_path: Path) -> Non
     assert lines[0]["schema"] == "tracebridge.agent_lightning.triplet.v0"
     assert isinstance(lines[0]["reward"], float)
     assert 0.0 <= lines[0]["reward"] <= 1.0
+
+
+def test_export_streams_in_order_input_and_sorts_out_of_order_input(tmp_path: Path) -> None:
+    rows = []
+    for turn in range(3):
+        base = turn * 3 + 1
+        rows += [
+            _event("run_demo", base, "agent.input", f"q{turn}"),
+            _event("run_demo", base + 1, "tool.result", "r"),
+            _event("run_demo", base + 2, "agent.output", f"a{turn}"),
+        ]
+    ordered = tmp_path / "ordered.jsonl"
+    shuffled = tmp_path / "shuffled.jsonl"
+    _write_events(ordered, rows)
+    _write_events(shuffled, rows[4:] + rows[:4])
+
+    outputs = []
+    for events in (ordered, shuffled):
+        out = tmp_path / f"{events.stem}.triplets.jsonl"
+        summary = export_to_agent_lightning_triplets(events, out, reward_mode="heuristic-basic")
+        assert (summary.rows_written, summary.skipped_unpaired) == (3, 0)
+        outputs.append(out.read_text(encoding="utf-8"))
+
+    assert outputs[0] == outputs[1]
+    assert [json.loads(line)["metadata"]["middle_counts"] for line in outputs[0].splitlines()] == [
+        {"tool.result": 1}
+    ] * 3
+
+
+def test_export_pairs_within_runs_and_parallel_matches_serial(tmp_path: Path) -> None:
+    # Two runs interleaved: sorting by sequence_id alone would pair run_a's input with run_b's output.
+    rows = [
+        _event("run_a", 1, "agent.input", "a-q"),
+        _event("run_b", 2, "agent.input", "b-q"),
+        _event("run_b", 3, "agent.output", "b-a"),
+        _event("run_a", 4, "agent.output", "a-a"),
+        _event("run_c", 5, "agent.input", "c-q"),
+    ]
+    events = tmp_path / "events.jsonl"
+    _write_events(events, rows)
+
+    outputs = []
+    for workers in (1, 2):
+        out = tmp_path / f"messages_{workers}.jsonl"
+        summary = export_to_agent_lightning_messages(events, out, workers=workers)
+        assert (summary.rows_written, summary.skipped_unpaired) == (2, 1)
+        outputs.append(out.read_text(encoding="utf-8"))
+    assert outputs[0] == outputs[1]
+
+    lines = [json.loads(line) for line in outputs[0].splitlines()]
+    assert [r["id"] for r in lines] == ["msgpair_run_a_000001", "msgpair_run_b_000002"]
+    assert [[m["content"] for m in r["messages"]] for r in lines] == [["a-q", "a-a"], ["b-q", "b-a"]]
+
+
+def test_export_fans_out_several_formats_from_one_pass(tmp_path: Path, capsys) -> None:
+    events = tmp_path / "events.jsonl"
+    _write_events(
+        events,
+        [
+            {"run_id": "run_demo", "sequence_id": 1, "kind": "agent.input", "attrs": {"content": "q"}},
+            {"run_id": "run_demo", "sequence_id": 2, "kind": "tool.result", "attrs": {"content": "r"}},
+            {"run_id": "run_demo", "sequence_id": 3, "kind": "agent.output", "attrs": {"content": "a"}},
+        ],
+    )
+    messages = tmp_path / "messages.jsonl"
+    plain = tmp_path / "triplets.jsonl"
+    rewarded = tmp_path / "triplets_rewarded.jsonl"
+
+    rc = main(
+        [
+            "export-agent-lightning",
+            "--events",
+            str(events),
+            "--emit",
+            f"messages={messages}",
+            "--emit",
+            f"triplets={plain}",
+            "--emit",
+            f"triplets:heuristic-basic={rewarded}",
+        ]
+    )
+    assert rc == 0
+    payload = json.loads(capsys.readouterr().out)
+    assert [o["rows_written"] for o in payload["outputs"]] == [1, 1, 1]
+
+    single = tmp_path / "single.jsonl"
+    export_to_agent_lightning_triplets(events, single, reward_mode="heuristic-basic")
+    assert rewarded.read_text(encoding="utf-8") == single.read_text(encoding="utf-8")
+    assert json.loads(plain.read_text(encoding="utf-8"))["reward"] is None
+    assert json.loads(messages.read_text(encoding="utf-8"))["metadata"]["middle_counts"] == {"tool.result": 1}
+
+
+def test_incremental_export_appends_new_turns_with_stable_ids(tmp_path: Path) -> None:
+    events = tmp_path / "events.jsonl"
+    out = tmp_path / "messages.jsonl"
+    _write_events(
+        events,
+        [
+            _event("run_a", 1, "agent.input", "q1"),
+            _event("run_a", 2, "agent.output", "a1"),
+            _event("run_a", 3, "agent.input", "q2"),
+        ],
+    )
+    summary = export_to_agent_lightning_messages(events, out, incremental=True)
+    assert (summary.rows_written, summary.skipped_unpaired, summary.open_turns) == (1, 0, 1)
+    watermark = load_export_watermark(watermark_path_for(out))
+    assert watermark is not None and watermark.runs == {"run_a": 2}
+    # The open turn is re-read next time, so the resume point sits at its input.
+    assert 0 < watermark.offset < events.stat().st_size
+    first = out.read_text(encoding="utf-8")
+
+    with events.open("a", encoding="utf-8") as f:
+        for row in (
+            _event("run_a", 4, "tool.result", "r"),
+            _event("run_a", 5, "agent.output", "a2"),
+            _event("run_b", 1, "agent.input", "b-q"),
+            _event("run_b", 2, "agent.output", "b-a"),
+        ):
+            f.write(json.dumps(row) + "\n")
+    summary = export_to_agent_lightning_messages(events, out, incremental=True)
+    assert (summary.rows_written, summary.open_turns) == (2, 0)
+    assert summary.watermarks == {"run_a": 5, "run_b": 2}
+
+    text = out.read_text(encoding="utf-8")
+    assert text.startswith(first)
+    rows = [json.loads(line) for line in text.splitlines()]
+    assert [r["id"] for r in rows] == ["msgpair_run_a_000001", "msgpair_run_a_000003", "msgpair_run_b_000001"]
+    assert rows[1]["metadata"]["middle_counts"] == {"tool.result": 1}
+
+    full = tmp_path / "full.jsonl"
+    export_to_agent_lightning_messages(events, full)
+    assert full.read_text(encoding="utf-8") == text
+
+    assert export_to_agent_lightning_messages(events, out, incremental=True).rows_written == 0
+    assert out.read_text(encoding="utf-8") == text
+
+
+def test_incremental_resume_offset_skips_trailing_non_turn_events(tmp_path: Path) -> None:
+    events = tmp_path / "events.jsonl"
+    out = tmp_path / "messages.jsonl"
+    # run_idle ends with a heartbeat after its last output and never starts another turn.
+    _write_events(
+        events,
+        [
+            _event("run_idle", 1, "agent.input"),
+            _event("run_idle", 2, "agent.output"),
+            _event("run_idle", 3, "heartbeat"),
+            _event("run_busy", 1, "agent.input"),
+            _event("run_busy", 2, "agent.output"),
+        ],
+    )
+    assert export_to_agent_lightning_messages(events, out, incremental=True).rows_written == 2
+    assert load_export_watermark(watermark_path_for(out)).offset == events.stat().st_size
+
+    with events.open("a", encoding="utf-8") as f:
+        for seq in (3, 4):
+            f.write(json.dumps(_event("run_busy", seq, "agent.input" if seq == 3 else "agent.output")) + "\n")
+        f.flush()
+        open_input = events.stat().st_size
+        f.write(json.dumps(_event("run_busy", 5, "agent.input")) + "\n")
+        f.write(json.dumps(_event("run_idle", 4, "note")) + "\n")
+    assert export_to_agent_lightning_messages(events, out, incremental=True).rows_written == 1
+    # Only run_busy's open turn holds the resume point back.
+    assert load_export_watermark(watermark_path_for(out)).offset == open_input
+
+
+def test_incremental_export_follows_rotated_segments(tmp_path: Path) -> None:
+    events = tmp_path / "events.jsonl"
+    out = tmp_path / "messages.jsonl"
+
+    def write(rows: list[tuple[int, str]]) -> None:
+        # Every flush fills the segment, so each row ends up in its own rotated file.
+        with JsonlTraceWriter(events, rotate_bytes=1) as writer:
+            for seq, kind in rows:
+                writer.append_json(json.dumps(_event("run_a", seq, kind, f"c{seq}")).encode("utf-8"))
+
+    write([(1, "agent.input"), (2, "agent.output"), (3, "agent.input")])
+    assert not events.exists()
+    assert export_to_agent_lightning_messages(events, out, incremental=True).rows_written == 1
+
+    write([(4, "agent.output")])
+    assert export_to_agent_lightning_messages(events, out, incremental=True).rows_written == 1
+    full = tmp_path / "full.jsonl"
+    assert export_to_agent_lightning_messages(events, full).rows_written == 2
+    assert full.read_text(encoding="utf-8") == out.read_text(encoding="utf-8")
+
+
+def test_trajectories_window_turns_and_share_blocks(tmp_path: Path) -> None:
+    rows = []
+    for turn in range(3):
+        base = turn * 4 + 1
+        rows += [
+            _event("run_a", base, "agent.input", f"question {turn} " + "x" * 36),
+            _event("run_a", base + 1, "tool.call", "read"),
+            _event("run_a", base + 2, "tool.result", "file contents"),
+            _event("run_a", base + 3, "agent.output", f"answer {turn} " + "y" * 36),
+        ]
+    # run_b repeats run_a's first turn word for word.
+    rows += [dict(r, run_id="run_b") for r in rows[:4]]
+    events = tmp_path / "events.jsonl"
+    _write_events(events, rows)
+
+    out = tmp_path / "trajectories.jsonl"
+    (summary,) = export_agent_lightning(events, [ExportTarget("trajectories", out, window_tokens=60)])
+    assert summary.rows_written == 4
+
+    lines = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    block_lines = blocks_path_for(out).read_text(encoding="utf-8").splitlines()
+    blocks = {b["id"]: b for b in map(json.loads, block_lines)}
+    assert len(blocks) == 3
+    assert [r["id"] for r in lines] == [
+        "traj_run_a_000001",
+        "traj_run_a_000005",
+        "traj_run_a_000009",
+        "traj_run_b_000001",
+    ]
+    # Each turn is ~26 tokens, so a 60-token window holds the current turn and the previous one.
+    assert [r["metadata"]["turns"] for r in lines] == [1, 2, 2, 1]
+    assert lines[1]["blocks"][0] == lines[0]["blocks"][0]
+    assert lines[2]["blocks"][0] == lines[1]["blocks"][1]
+    assert lines[3]["blocks"] == lines[0]["blocks"]
+    assert all(r["token_estimate"] <= 60 for r in lines)
+    roles = [m["role"] for m in blocks[lines[0]["blocks"][0]]["messages"]]
+    assert roles == ["user", "assistant", "tool", "assistant"]
@@ -0,0 +1,64 @@
+import json
+import random
+from pathlib import Path
+
+from openclaw_tracebridge.cli import main
+from openclaw_tracebridge.exporters.agent_lightning import export_to_agent_lightning_messages
+from openclaw_tracebridge.external_sort import event_sort_key, sort_event_lines
+
+
+def _line(run: str, seq: int, tag: str = "", kind: str = "note", content: str = "") -> bytes:
+    row = {
+        "event_id": f"ev_{run}_{seq}_{tag}",
+        "run_id": run,
+        "sequence_id": seq,
+        "ts": "2026-02-09T00:00:00Z",
+        "kind": kind,
+        "attrs": {"content": content},
+    }
+    return json.dumps(row).encode("utf-8")
+
+
+def test_sort_event_lines_spills_and_stays_stable() -> None:
+    lines = [_line(f"run_{i % 3}", i % 50, tag=str(i)) for i in range(300)]
+    random.Random(7).shuffle(lines)
+
+    in_memory = list(sort_event_lines(lines))
+    spilled = list(sort_event_lines(lines, memory_budget_bytes=1))  # one spill per line
+
+    assert in_memory == spilled
+    assert [event_sort_key(line) for line in spilled] == sorted(event_sort_key(line) for line in lines)
+    # Equal keys keep their input order.
+    expected = [line for _, _, line in sorted((event_sort_key(row), i, row) for i, row in enumerate(lines))]
+    assert spilled == expected
+
+
+def test_export_falls_back_to_external_sort(tmp_path: Path, capsys) -> None:
+    rows = [
+        _line("run_a", 2, kind="agent.output", content="a-out"),
+        _line("run_a", 1, kind="agent.input", content="a-in"),
+        _line("run_b", 2, kind="agent.output", content="b-out"),
+        _line("run_b", 1, kind="agent.input", content="b-in"),
+    ]
+    events = tmp_path / "merged.jsonl"
+    events.write_bytes(b"\n".join(rows) + b"\n")
+
+    out = tmp_path / "messages.jsonl"
+    summary = export_to_agent_lightning_messages(events, out, sort_memory_bytes=1)
+    assert summary.rows_written == 2
+    pairs = [json.loads(line)["messages"] for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [[m["content"] for m in p] for p in pairs] == [["a-in", "a-out"], ["b-in", "b-out"]]
+
+    sorted_path = tmp_path / "sorted.jsonl"
+    assert main(["sort-events", "--events", str(events), "--out", str(sorted_path), "--memory-mb", "1"]) == 0
+    assert [event_sort_key(line) for line in sorted_path.read_bytes().splitlines()] == [
+        ("run_a", 1),
+        ("run_a", 2),
+        ("run_b", 1),
+        ("run_b", 2),
+    ]
+
+    capsys.readouterr()
+    for path, expected in ((events, False), (sorted_path, True)):
+        assert main(["stats", "--events", str(path)]) == 0
+        assert json.loads(capsys.readouterr().out)["sorted"] is expected
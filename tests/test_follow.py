@@ -0,0 +1,101 @@
+import json
+from pathlib import Path
+
+from openclaw_tracebridge.adapters import openclaw_session
+from openclaw_tracebridge.adapters.openclaw_follow import follow_openclaw_session, follow_openclaw_sessions
+from openclaw_tracebridge.adapters.openclaw_session import session_run_id
+from openclaw_tracebridge.cli import main
+from openclaw_tracebridge.io import iter_events
+
+
+def _row(text: str) -> str:
+    return json.dumps({"type": "message", "message": {"role": "user", "content": text}})
+
+
+def test_follow_session_tails_appended_rows(tmp_path: Path) -> None:
+    src = tmp_path / "session.jsonl"
+    out = tmp_path / "events.jsonl"
+    src.write_text(_row("one") + "\n" + _row("two")[:8], encoding="utf-8")
+
+    first = follow_openclaw_session(src, out, run_id="run_follow", poll_interval=0, max_polls=2)
+    assert first.events_written == 1
+
+    with src.open("a", encoding="utf-8") as f:
+        f.write(_row("two")[8:] + "\n")
+    second = follow_openclaw_session(src, out, run_id="run_follow", poll_interval=0, max_polls=1)
+
+    assert second.events_written == 1
+    assert [e.sequence_id for e in iter_events(out)] == [1, 2]
+
+
+def test_follow_append_keeps_existing_output(tmp_path: Path) -> None:
+    old = tmp_path / "old.jsonl"
+    src = tmp_path / "session.jsonl"
+    out = tmp_path / "events.jsonl"
+    old.write_text(_row("old") + "\n", encoding="utf-8")
+    openclaw_session.import_openclaw_session(old, out, run_id="run_old")
+    src.write_text(_row("one") + "\n", encoding="utf-8")
+
+    follow_openclaw_session(src, out, run_id="run_new", poll_interval=0, max_polls=1, append=True)
+
+    assert [e.run_id for e in iter_events(out)] == ["run_old", "run_new"]
+
+
+def test_follow_numbers_events_from_start_sequence_id(tmp_path: Path, capsys) -> None:
+    src = tmp_path / "session.jsonl"
+    out = tmp_path / "events.jsonl"
+    src.write_text(_row("one") + "\n", encoding="utf-8")
+    args = ["import-openclaw-session", "--session-jsonl", str(src), "--out", str(out), "--run-id", "run_s"]
+    follow = ["--follow", "--poll-interval", "0", "--max-polls", "1", "--start-sequence-id", "100"]
+
+    assert main(args + follow) == 0
+    with src.open("a", encoding="utf-8") as f:
+        f.write(_row("two") + "\n")
+    # The resumed poll continues from the checkpoint; the start only applies to a fresh import.
+    assert main(args + follow) == 0
+
+    assert [e.sequence_id for e in iter_events(out)] == [100, 101]
+
+
+def test_follow_sessions_picks_up_new_files(tmp_path: Path) -> None:
+    sessions = tmp_path / "sessions"
+    out_dir = tmp_path / "out"
+    sessions.mkdir()
+    (sessions / "a.jsonl").write_text(_row("a") + "\n", encoding="utf-8")
+
+    assert follow_openclaw_sessions(sessions, out_dir, poll_interval=0, max_polls=1).events_written == 1
+
+    (sessions / "b.jsonl").write_text(_row("b") + "\n", encoding="utf-8")
+    summary = follow_openclaw_sessions(sessions, out_dir, poll_interval=0, max_polls=1)
+
+    assert summary.sessions == 2
+    assert summary.events_written == 1
+    run_b = session_run_id(sessions / "b.jsonl")
+    assert [e.run_id for e in iter_events(out_dir / f"{run_b}.jsonl")] == [run_b]
+
+
+def test_interrupted_follow_resumes_without_duplicate_events(tmp_path: Path, monkeypatch) -> None:
+    src = tmp_path / "session.jsonl"
+    out = tmp_path / "events.jsonl"
+    src.write_text("".join(_row(f"m{i}") + "\n" for i in range(250)), encoding="utf-8")
+    follow_openclaw_session(src, out, run_id="run_follow", poll_interval=0, max_polls=1)
+    with src.open("a", encoding="utf-8") as f:
+        f.write("".join(_row(f"m{i}") + "\n" for i in range(250, 500)))
+
+    # Ctrl-C halfway through the resumed import of the new rows.
+    event_fields = openclaw_session._event_fields
+    calls = 0
+
+    def interrupted_fields(row, **kwargs):
+        nonlocal calls
+        calls += 1
+        if calls == 150:
+            raise KeyboardInterrupt
+        return event_fields(row, **kwargs)
+
+    monkeypatch.setattr(openclaw_session, "_event_fields", interrupted_fields)
+    follow_openclaw_session(src, out, run_id="run_follow", poll_interval=0, max_polls=3)
+    monkeypatch.setattr(openclaw_session, "_event_fields", event_fields)
+
+    follow_openclaw_session(src, out, run_id="run_follow", poll_interval=0, max_polls=1)
+    assert [e.sequence_id for e in iter_events(out)] == list(range(1, 501))
@@ -1,7 +1,20 @@
 import json
+import random
+import re
 from pathlib import Path
 
-from openclaw_tracebridge.adapters.openclaw_session import import_openclaw_session
+import pytest
+
+from openclaw_tracebridge.adapters import openclaw_session
+from openclaw_tracebridge.adapters.openclaw_session import (
+    checkpoint_path_for,
+    discover_session_files,
+    import_openclaw_session,
+    import_openclaw_sessions,
+    load_import_checkpoint,
+    session_run_id,
+)
+from openclaw_tracebridge.cli import main
 from openclaw_tracebridge.io import iter_events
 
 
@@ -133,3 +146,173 @@ def test_import_openclaw_session_debug_profile_includes_raw(tmp_path: Path) -> N
     assert events[0].attrs.get("profile") == "debug"
     assert "content" in events[0].attrs
     assert "raw" in events[0].attrs
+
+
+def test_import_openclaw_sessions_parallel_merged(tmp_path: Path) -> None:
+    sessions = tmp_path / "sessions"
+    sessions.mkdir()
+    row = {"type": "message", "message": {"role": "user", "content": [{"type": "text", "text": "hi"}]}}
+    for name, n in [("a", 3), ("b", 2)]:
+        (sessions / f"{name}.jsonl").write_text(
+            "\n".join(json.dumps(row) for _ in range(n)) + "\n", encoding="utf-8"
+        )
+
+    out = tmp_path / "merged.jsonl"
+    files = discover_session_files(sessions)
+    results = import_openclaw_sessions(files, out_events=out, workers=2)
+    events = list(iter_events(out))
+
+    assert [r.events_written for r in results] == [3, 2]
+    assert [r.run_id for r in results] == [session_run_id(f) for f in files]
+    assert [e.sequence_id for e in events] == [1, 2, 3, 4, 5]
+    assert {e.run_id for e in events[:3]} == {results[0].run_id}
+    assert {e.run_id for e in events[3:]} == {results[1].run_id}
+
+
+def test_import_openclaw_session_resumes_from_checkpoint(tmp_path: Path) -> None:
+    src = tmp_path / "session.jsonl"
+    out = tmp_path / "events.jsonl"
+    ckpt = checkpoint_path_for(out)
+
+    def row(text: str) -> str:
+        return json.dumps({"type": "message", "message": {"role": "user", "content": text}})
+
+    src.write_text(row("one") + "\n" + row("two") + "\n", encoding="utf-8")
+    assert import_openclaw_session(src, out, run_id="run_resume", checkpoint=ckpt) == 2
+
+    partial = row("four")
+    with src.open("a", encoding="utf-8") as f:
+        f.write(row("three") + "\n" + partial[:10])
+    assert import_openclaw_session(src, out, run_id="run_resume", checkpoint=ckpt) == 1
+
+    with src.open("a", encoding="utf-8") as f:
+        f.write(partial[10:] + "\n")
+    assert import_openclaw_session(src, out, run_id="run_resume", checkpoint=ckpt) == 1
+
+    events = list(iter_events(out))
+    assert [e.sequence_id for e in events] == [1, 2, 3, 4]
+    assert load_import_checkpoint(ckpt).offset == src.stat().st_size
+
+    # A rewritten head invalidates the checkpoint and forces a full rebuild.
+    src.write_text(row("fresh") + "\n", encoding="utf-8")
+    assert import_openclaw_session(src, out, run_id="run_resume", checkpoint=ckpt) == 1
+    assert [e.sequence_id for e in iter_events(out)] == [1]
+
+
+def test_interrupted_import_resumes_without_duplicates(tmp_path: Path, monkeypatch) -> None:
+    src = tmp_path / "session.jsonl"
+    out = tmp_path / "events.jsonl"
+    ckpt = checkpoint_path_for(out)
+    rows = [{"type": "message", "message": {"role": "user", "content": f"m{i}"}} for i in range(500)]
+    src.write_text("".join(json.dumps(r) + "\n" for r in rows[:250]), encoding="utf-8")
+    assert import_openclaw_session(src, out, run_id="run_cut", checkpoint=ckpt) == 250
+    with src.open("a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(r) + "\n" for r in rows[250:]))
+
+    # The resumed import fails after flushing part of the new rows but before its checkpoint.
+    event_fields = openclaw_session._event_fields
+    calls = 0
+
+    def failing_fields(row, **kwargs):
+        nonlocal calls
+        calls += 1
+        if calls == 150:
+            raise RuntimeError("interrupted")
+        return event_fields(row, **kwargs)
+
+    monkeypatch.setattr(openclaw_session, "_event_fields", failing_fields)
+    with pytest.raises(RuntimeError):
+        import_openclaw_session(src, out, run_id="run_cut", checkpoint=ckpt)
+    monkeypatch.setattr(openclaw_session, "_event_fields", event_fields)
+
+    assert import_openclaw_session(src, out, run_id="run_cut", checkpoint=ckpt) == 250
+    assert [e.sequence_id for e in iter_events(out)] == list(range(1, 501))
+
+
+def test_append_resume_keeps_existing_events(tmp_path: Path) -> None:
+    r1 = tmp_path / "r1.jsonl"
+    r2 = tmp_path / "r2.jsonl"
+    out = tmp_path / "events.jsonl"
+    row = {"type": "message", "message": {"role": "user", "content": "hi"}}
+    r1.write_text(json.dumps(row) + "\n", encoding="utf-8")
+    r2.write_text((json.dumps(row) + "\n") * 2, encoding="utf-8")
+
+    assert (
+        main(["import-openclaw-session", "--session-jsonl", str(r1), "--out", str(out), "--run-id", "r1"])
+        == 0
+    )
+    argv = ["import-openclaw-session", "--session-jsonl", str(r2), "--out", str(out), "--run-id", "r2"]
+    argv += ["--append", "--resume", "--start-sequence-id", "2"]
+    assert main(argv) == 0
+    assert [(e.run_id, e.sequence_id) for e in iter_events(out)] == [("r1", 1), ("r2", 2), ("r2", 3)]
+
+    # A rewritten session rebuilds only this import's part of the file.
+    r2.write_text(json.dumps({**row, "type": "note"}) + "\n", encoding="utf-8")
+    assert main(argv) == 0
+    assert [(e.run_id, e.sequence_id) for e in iter_events(out)] == [("r1", 1), ("r2", 2)]
+
+
+def test_import_openclaw_session_fast_path_matches_strict(tmp_path: Path) -> None:
+    src = tmp_path / "session.jsonl"
+    rows = [
+        {"type": "session", "id": "s1"},
+        {
+            "type": "message",
+            "message": {
+                "role": "user",
+                "content": [{"type": "text", "text": "héllo"}],
+                "usage": {"totalTokens": 11, "cost": {"total": 0.00001}},
+            },
+        },
+        {
+            "type": "message",
+            "message": {
+                "role": "assistant",
+                "content": [{"type": "toolCall", "name": "read", "arguments": {}}],
+            },
+        },
+        {"type": "message", "message": {"role": "toolResult", "content": "ok"}},
+    ]
+    src.write_text("\n".join(json.dumps(r, ensure_ascii=False) for r in rows) + "\n", encoding="utf-8")
+
+    def normalized(path: Path) -> list[str]:
+        pattern = re.compile(r'"event_id":"[^"]*","run_id"|"ts":"[^"]*"')
+        return [pattern.sub("", line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+    fast = tmp_path / "fast.jsonl"
+    strict = tmp_path / "strict.jsonl"
+    import_openclaw_session(src, fast, run_id="run_same", profile="debug")
+    import_openclaw_session(src, strict, run_id="run_same", profile="debug", strict=True)
+
+    assert normalized(fast) == normalized(strict)
+
+
+def test_imported_event_ids_ignore_global_random_seed(tmp_path: Path) -> None:
+    src = tmp_path / "session.jsonl"
+    src.write_text(json.dumps({"type": "message", "message": {"role": "user", "content": "hi"}}) + "\n")
+
+    ids = []
+    for name in ("a.jsonl", "b.jsonl"):
+        random.seed(1234)
+        import_openclaw_session(src, tmp_path / name, run_id="run_seed")
+        ids += [e.event_id for e in iter_events(tmp_path / name)]
+    assert ids[0] != ids[1]
+    assert all(re.fullmatch(r"ev_[0-9a-f]{12}4[0-9a-f]{3}[89ab][0-9a-f]{15}", i) for i in ids)
+
+
+def test_import_openclaw_session_ulid_ids_sort_across_resumes(tmp_path: Path) -> None:
+    src = tmp_path / "session.jsonl"
+    out = tmp_path / "events.jsonl"
+    ckpt = checkpoint_path_for(out)
+    row = json.dumps({"type": "message", "message": {"role": "user", "content": "hi"}})
+
+    src.write_text(row + "\n" + row + "\n", encoding="utf-8")
+    import_openclaw_session(src, out, run_id="run_ulid", checkpoint=ckpt, id_scheme="ulid")
+    with src.open("a", encoding="utf-8") as f:
+        f.write(row + "\n")
+    import_openclaw_session(src, out, run_id="run_ulid", checkpoint=ckpt, id_scheme="ulid", strict=True)
+
+    ids = [e.event_id for e in iter_events(out)]
+    assert len(ids) == 3
+    assert ids == sorted(ids)
+    assert all(re.fullmatch(r"ev_[0-9A-HJKMNP-TV-Z]{26}", i) for i in ids)
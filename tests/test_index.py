@@ -0,0 +1,156 @@
+import json
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from openclaw_tracebridge import index as index_module
+from openclaw_tracebridge.cli import main
+from openclaw_tracebridge.columnar import jsonl_to_columnar
+from openclaw_tracebridge.index import (
+    build_event_index,
+    index_path_for,
+    iter_selected_events,
+    load_event_index,
+    load_fresh_index,
+    save_event_index,
+)
+from openclaw_tracebridge.io import JsonlTraceWriter, event_segments, iter_events
+from openclaw_tracebridge.schema import EventKind, TraceEvent
+
+
+def _write_events(path: Path) -> None:
+    kinds = [EventKind.AGENT_INPUT, EventKind.TOOL_CALL, EventKind.TOOL_RESULT, EventKind.AGENT_OUTPUT]
+    with JsonlTraceWriter(path, flush_every=100) as writer:
+        seq = 0
+        for run in ("run_a", "run_b"):
+            for i in range(20):
+                seq += 1
+                writer.append(
+                    TraceEvent(
+                        run_id=run,
+                        sequence_id=seq,
+                        ts=datetime(2026, 2, 9, 0, 0, i, tzinfo=UTC),
+                        kind=kinds[i % 4],
+                        attrs={"i": i},
+                    )
+                )
+
+
+def test_index_roundtrip_and_selection(tmp_path: Path) -> None:
+    events = tmp_path / "events.jsonl"
+    _write_events(events)
+
+    index = build_event_index(events, block_size=8)
+    save_event_index(index, index_path_for(events))
+    loaded = load_event_index(index_path_for(events))
+
+    assert len(loaded) == 40
+    assert loaded.runs == ["run_a", "run_b"]
+    assert list(loaded.sequence_id) == list(index.sequence_id)
+    assert load_fresh_index(events) is not None
+
+    selected = list(
+        iter_selected_events(
+            events,
+            kinds=["tool.result"],
+            run_id="run_b",
+            since=datetime(2026, 2, 9, 0, 0, 5, tzinfo=UTC),
+            until=datetime(2026, 2, 9, 0, 0, 15, tzinfo=UTC),
+        )
+    )
+    assert [(e.run_id, e.attrs["i"]) for e in selected] == [("run_b", 6), ("run_b", 10), ("run_b", 14)]
+
+    by_seq = loaded.select_rows(start_sequence_id=18, end_sequence_id=22)
+    assert [loaded.sequence_id[r] for r in by_seq] == [18, 19, 20, 21, 22]
+
+
+def test_query_falls_back_to_scan_when_index_is_stale(tmp_path: Path) -> None:
+    events = tmp_path / "events.jsonl"
+    out = tmp_path / "out.jsonl"
+    _write_events(events)
+    assert main(["index", "--events", str(events)]) == 0
+
+    with events.open("a", encoding="utf-8") as f:
+        f.write(
+            TraceEvent(run_id="run_b", sequence_id=41, kind=EventKind.TOOL_RESULT).model_dump_json() + "\n"
+        )
+    assert load_fresh_index(events) is None
+
+    rc = main(
+        ["query", "--events", str(events), "--kind", "tool.result", "--run-id", "run_b", "--out", str(out)]
+    )
+    assert rc == 0
+    assert len(out.read_text(encoding="utf-8").splitlines()) == 6
+
+
+class _RecordingArray(list):
+    def __init__(self, values) -> None:
+        super().__init__(values)
+        self.touched: set[int] = set()
+
+    def __getitem__(self, i):
+        self.touched.add(i)
+        return super().__getitem__(i)
+
+
+def test_select_rows_tests_block_ranges_once(tmp_path: Path) -> None:
+    events = tmp_path / "events.jsonl"
+    _write_events(events)
+    index = build_event_index(events, block_size=8)
+    since = datetime(2026, 2, 9, 0, 0, 8, tzinfo=UTC)
+    until = datetime(2026, 2, 9, 0, 0, 15, tzinfo=UTC)
+    expected = [r for r in range(len(index)) if 8 <= (r % 20) <= 15]
+
+    index.ts_us = _RecordingArray(index.ts_us)
+    assert index.select_rows(since=since, until=until) == expected
+    # Block 0 (ts 0-7) lies outside the window and block 1 (ts 8-15) inside it: neither is
+    # checked row by row.
+    assert not index.ts_us.touched & set(range(16))
+
+    rows = index.select_rows(kinds=["tool.call", "tool.result"], since=since, until=until)
+    assert rows == [r for r in expected if index.kinds[index.kind[r]] in ("tool.call", "tool.result")]
+
+
+def test_index_rejects_columnar_segment(tmp_path: Path) -> None:
+    events = tmp_path / "events.jsonl"
+    segment = tmp_path / "events.tbcol"
+    _write_events(events)
+    jsonl_to_columnar(events, segment)
+
+    with pytest.raises(SystemExit, match="columnar"):
+        main(["index", "--events", str(segment)])
+    assert not index_path_for(segment).exists()
+
+
+def test_query_reads_rotated_segments_through_their_indexes(tmp_path: Path) -> None:
+    events = tmp_path / "events.jsonl"
+    out = tmp_path / "out.jsonl"
+    with JsonlTraceWriter(events, flush_every=5, rotate_bytes=1) as writer:
+        for seq in range(1, 13):
+            writer.append(TraceEvent(run_id="run_r", sequence_id=seq, kind=EventKind.TOOL_RESULT))
+    assert len(event_segments(events)) == 3
+
+    assert main(["index", "--events", str(events)]) == 0
+    assert all(load_fresh_index(segment) is not None for segment in event_segments(events))
+    assert main(["query", "--events", str(events), "--start-sequence-id", "4", "--out", str(out)]) == 0
+    rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [r["sequence_id"] for r in rows] == list(range(4, 13))
+
+
+def test_iter_events_filters_through_a_fresh_index(tmp_path: Path, monkeypatch) -> None:
+    events = tmp_path / "events.jsonl"
+    segment = tmp_path / "events.tbcol"
+    _write_events(events)
+    jsonl_to_columnar(events, segment)
+    save_event_index(build_event_index(events), index_path_for(events))
+    filters = {"kinds": ["tool.result"], "run_id": "run_b", "start_sequence_id": 30}
+    expected = list(iter_events(segment, **filters))
+    assert [e.sequence_id for e in expected] == [31, 35, 39]
+
+    # With a fresh sidecar no line is projected and filtered; matching rows are read directly.
+    def no_scan(*args, **kwargs):
+        raise AssertionError("scanned the events file")
+
+    monkeypatch.setattr(index_module, "project_event_line", no_scan)
+    assert list(iter_events(events, **filters)) == expected
@@ -0,0 +1,171 @@
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from openclaw_tracebridge.io import (
+    AsyncTraceWriter,
+    JsonlTraceWriter,
+    event_segments,
+    iter_event_fields,
+    iter_events,
+)
+from openclaw_tracebridge.schema import EventKind, TraceEvent
+
+
+def _event(seq: int) -> TraceEvent:
+    return TraceEvent(run_id="run_io", sequence_id=seq, kind=EventKind.NOTE, attrs={"pad": "x" * 40})
+
+
+def test_writer_group_commit_by_bytes(tmp_path: Path) -> None:
+    out = tmp_path / "events.jsonl"
+    writer = JsonlTraceWriter(out, flush_every=1000, flush_bytes=600, fsync="batch")
+
+    writer.append(_event(1))
+    assert not out.exists() or out.stat().st_size == 0
+
+    for seq in range(2, 6):
+        writer.append(_event(seq))
+    assert out.stat().st_size > 0
+
+    writer.close()
+    assert [e.sequence_id for e in iter_events(out)] == [1, 2, 3, 4, 5]
+
+
+def test_writer_rotates_numbered_segments(tmp_path: Path) -> None:
+    out = tmp_path / "events.jsonl"
+    with JsonlTraceWriter(out, rotate_bytes=500) as writer:
+        for seq in range(1, 11):
+            writer.append(_event(seq))
+
+    segments = event_segments(out)
+    assert len(segments) > 2
+    assert segments[0].name == "events.00001.jsonl"
+    assert [e.sequence_id for seg in segments for e in iter_events(seg)] == list(range(1, 11))
+    # Readers of the base path walk the rotated segments too.
+    assert [e.sequence_id for e in iter_events(out)] == list(range(1, 11))
+    assert [r["sequence_id"] for r in iter_event_fields(out, ("sequence_id",))] == list(range(1, 11))
+
+
+def _fill_stalled_writer(path: Path, policy: str) -> AsyncTraceWriter:
+    # A batch size above max_queue and a long interval keep the drain thread asleep until close.
+    writer = AsyncTraceWriter(
+        path, max_queue=5, drop_policy=policy, sample_every=2, batch_size=100, flush_interval_s=60
+    )
+    for seq in range(1, 9):
+        writer.append(_event(seq))
+    return writer
+
+
+def test_async_writer_drop_policies(tmp_path: Path) -> None:
+    expected = {
+        "oldest": [4, 5, 6, 7, 8],
+        "newest": [1, 2, 3, 4, 5],
+        "sampled": [2, 3, 4, 5, 7],
+    }
+    for policy, kept in expected.items():
+        out = tmp_path / f"{policy}.jsonl"
+        writer = _fill_stalled_writer(out, policy)
+        writer.close()
+
+        stats = writer.stats()
+        assert stats.dropped == 3
+        assert stats.written == 5
+        assert stats.max_queue_depth == 5
+        assert [e.sequence_id for e in iter_events(out)] == kept
+
+
+def test_async_writer_drains_in_background(tmp_path: Path) -> None:
+    out = tmp_path / "events.jsonl"
+    with AsyncTraceWriter(out, batch_size=4, flush_interval_s=0.01) as writer:
+        for seq in range(1, 51):
+            assert writer.append(_event(seq))
+
+    stats = writer.stats()
+    assert stats.dropped == 0
+    assert stats.queue_depth == 0
+    assert stats.write_batches > 0
+    assert [e.sequence_id for e in iter_events(out)] == list(range(1, 51))
+
+
+def test_async_writer_survives_unserializable_event(tmp_path: Path) -> None:
+    out = tmp_path / "events.jsonl"
+    writer = AsyncTraceWriter(out, batch_size=4, flush_interval_s=0.01)
+    bad = TraceEvent(run_id="run_io", sequence_id=1, kind=EventKind.NOTE, attrs={"obj": object()})
+    assert writer.append(bad)
+    for seq in range(2, 12):
+        writer.append(_event(seq))
+    writer.close()
+
+    stats = writer.stats()
+    assert (stats.written, stats.dropped, stats.write_errors) == (10, 1, 1)
+    assert [e.sequence_id for e in iter_events(out)] == list(range(2, 12))
+
+
+def test_async_writer_commits_partial_batch_when_idle(tmp_path: Path) -> None:
+    out = tmp_path / "events.jsonl"
+    writer = AsyncTraceWriter(out, batch_size=100, flush_interval_s=0.02)
+    writer.append(_event(1))
+    deadline = time.monotonic() + 2
+    while writer.stats().written == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [e.sequence_id for e in iter_events(out)] == [1]
+    writer.close()
+
+
+def test_async_writer_close_races_with_append(tmp_path: Path) -> None:
+    out = tmp_path / "events.jsonl"
+    writer = AsyncTraceWriter(out, flush_interval_s=0.01)
+    line = _event(1).model_dump_json().encode("utf-8")
+    release = threading.Event()
+
+    class _StallingQueue(deque):
+        # Holds the producer between its _stopping check and the enqueue.
+        def append(self, item) -> None:
+            release.wait(5)
+            super().append(item)
+
+    writer._queue = _StallingQueue()
+    producer = threading.Thread(target=writer.append_json, args=(line,))
+    producer.start()
+    closer = threading.Thread(target=writer.close)
+    closer.start()
+    time.sleep(0.2)
+    release.set()
+    producer.join()
+    closer.join()
+    assert not writer.append_json(line)
+
+    stats = writer.stats()
+    # Both offers are accounted for: the racing one written, the one after close dropped.
+    assert (stats.written, stats.dropped) == (1, 1)
+    assert len(out.read_bytes().splitlines()) == 1
+
+
+def test_iter_event_fields_skips_attrs_and_matches_full_parse(tmp_path: Path) -> None:
+    out = tmp_path / "events.jsonl"
+    with JsonlTraceWriter(out, flush_every=10) as writer:
+        for seq in range(1, 4):
+            writer.append(
+                TraceEvent(
+                    run_id="run_io",
+                    sequence_id=seq,
+                    kind=EventKind.TOOL_RESULT,
+                    attrs={"raw": {"kind": "fake", "token_estimate": 99, "nested": {"attrs": [1]}}},
+                    token_estimate=seq * 10,
+                    cost_usd_micros=seq,
+                )
+            )
+    # Hand-written rows with a different key order take the full-parse path.
+    with out.open("a", encoding="utf-8") as f:
+        f.write('{"kind": "note", "attrs": {}, "sequence_id": 4, "run_id": "run_io", "token_estimate": 1}\n')
+
+    fields = ("kind", "sequence_id", "token_estimate", "cost_usd_micros")
+    records = list(iter_event_fields(out, fields))
+
+    assert records == [
+        {"kind": "tool.result", "sequence_id": 1, "token_estimate": 10, "cost_usd_micros": 1},
+        {"kind": "tool.result", "sequence_id": 2, "token_estimate": 20, "cost_usd_micros": 2},
+        {"kind": "tool.result", "sequence_id": 3, "token_estimate": 30, "cost_usd_micros": 3},
+        {"kind": "note", "sequence_id": 4, "token_estimate": 1, "cost_usd_micros": None},
+    ]
@@ -0,0 +1,202 @@
+import asyncio
+import json
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from openclaw_tracebridge import judge
+from openclaw_tracebridge.cli import main
+from openclaw_tracebridge.exporters import agent_lightning
+from openclaw_tracebridge.exporters.agent_lightning import ExportTarget, export_agent_lightning
+from openclaw_tracebridge.judge import JudgeConfig, judge_rewards
+from openclaw_tracebridge.rewards import RewardInput
+
+
+class _StubJudge(BaseHTTPRequestHandler):
+    # Scores a reply by its length; the very first request gets a 503 to exercise retries.
+    calls = 0
+    lock = threading.Lock()
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with _StubJudge.lock:
+            _StubJudge.calls += 1
+            first = _StubJudge.calls == 1
+        if first:
+            self.send_response(503)
+            self.end_headers()
+            return
+        reply = body["messages"][1]["content"].rsplit("\n", 1)[-1]
+        if reply in ("junk", "cut"):
+            # A 200 with a non-JSON body, or one whose connection drops mid-body.
+            self.send_response(200)
+            self.send_header("Content-Length", "100")
+            self.end_headers()
+            self.wfile.write(b"not json" if reply == "cut" else b"not json".ljust(100))
+            return
+        content = json.dumps({"choices": [{"message": {"content": f"{len(reply) / 10:.1f}"}}]})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(content.encode("utf-8"))
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def _serve() -> ThreadingHTTPServer:
+    _StubJudge.calls = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubJudge)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_judge_retries_dedupes_and_caches(tmp_path: Path) -> None:
+    server = _serve()
+    try:
+        config = JudgeConfig(
+            base_url=f"http://127.0.0.1:{server.server_port}/v1",
+            cache_path=tmp_path / "judge.sqlite3",
+            concurrency=4,
+            backoff_s=0.01,
+        )
+        items = [RewardInput("abc", input_text="q"), RewardInput("abcdef", input_text="q")]
+        items.append(items[0])
+        assert judge_rewards(items, config) == [0.3, 0.6, 0.3]
+        assert _StubJudge.calls == 3  # one 503, then one request per distinct row
+
+        assert judge_rewards(items, config) == [0.3, 0.6, 0.3]
+        assert _StubJudge.calls == 3
+    finally:
+        server.shutdown()
+
+
+def test_judge_survives_bad_bodies_and_running_loops(tmp_path: Path) -> None:
+    server = _serve()
+    try:
+        config = JudgeConfig(
+            base_url=f"http://127.0.0.1:{server.server_port}/v1",
+            cache_path=None,
+            max_retries=1,
+            backoff_s=0.01,
+        )
+        items = [RewardInput("junk"), RewardInput("cut"), RewardInput("abcd")]
+
+        async def judge_from_async_host() -> list[float | None]:
+            return judge_rewards(items, config)
+
+        assert asyncio.run(judge_from_async_host()) == [None, None, 0.4]
+    finally:
+        server.shutdown()
+
+
+def test_export_with_judge_reward_mode(tmp_path: Path, capsys) -> None:
+    events = tmp_path / "events.jsonl"
+    rows = []
+    for turn in range(5):
+        turn_events = ((2 * turn + 1, "agent.input", "q"), (2 * turn + 2, "agent.output", "x" * (turn + 1)))
+        for seq, kind, content in turn_events:
+            rows.append({"run_id": "run_j", "sequence_id": seq, "kind": kind, "attrs": {"content": content}})
+    events.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+    server = _serve()
+    try:
+        out = tmp_path / "triplets.jsonl"
+        args = [
+            "export-agent-lightning",
+            "--events",
+            str(events),
+            "--out",
+            str(out),
+            "--format",
+            "triplets",
+            "--reward-mode",
+            "judge",
+            "--judge-url",
+            f"http://127.0.0.1:{server.server_port}/v1",
+            "--judge-cache",
+            str(tmp_path / "judge.sqlite3"),
+        ]
+        assert main(args) == 0
+        rewards = [json.loads(line)["reward"] for line in out.read_text(encoding="utf-8").splitlines()]
+        assert rewards == [0.1, 0.2, 0.3, 0.4, 0.5]
+        calls = _StubJudge.calls
+
+        # Re-exporting pays for no judgment twice.
+        assert main(args) == 0
+        assert _StubJudge.calls == calls
+        assert json.loads(capsys.readouterr().out.splitlines()[-1])["rows_written"] == 5
+    finally:
+        server.shutdown()
+
+
+def test_judge_config_reaches_spawned_export_workers(tmp_path: Path, monkeypatch) -> None:
+    events = tmp_path / "events.jsonl"
+    rows = []
+    for run in ("run_x", "run_y"):
+        rows.append({"run_id": run, "sequence_id": 1, "kind": "agent.input", "attrs": {"content": "q"}})
+        rows.append({"run_id": run, "sequence_id": 2, "kind": "agent.output", "attrs": {"content": "abc"}})
+    events.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+    # Spawned workers (the macOS default) start from a fresh interpreter, so only state passed
+    # with the job reaches them.
+    spawn = partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context("spawn"))
+    monkeypatch.setattr(agent_lightning, "ProcessPoolExecutor", spawn)
+
+    server = _serve()
+    try:
+        judge = JudgeConfig(
+            base_url=f"http://127.0.0.1:{server.server_port}/v1",
+            cache_path=tmp_path / "judge.sqlite3",
+            backoff_s=0.01,
+        )
+        out = tmp_path / "triplets.jsonl"
+        export_agent_lightning(events, [ExportTarget("triplets", out, "judge", judge=judge)], workers=2)
+        rewards = [json.loads(line)["reward"] for line in out.read_text(encoding="utf-8").splitlines()]
+        assert rewards == [0.3, 0.3]
+    finally:
+        server.shutdown()
+
+
+def test_export_opens_the_judge_cache_once(tmp_path: Path, monkeypatch) -> None:
+    events = tmp_path / "events.jsonl"
+    rows = []
+    for turn in range(600):
+        rows.append(
+            {"run_id": "run_c", "sequence_id": 2 * turn + 1, "kind": "agent.input", "attrs": {"content": "q"}}
+        )
+        rows.append(
+            {
+                "run_id": "run_c",
+                "sequence_id": 2 * turn + 2,
+                "kind": "agent.output",
+                "attrs": {"content": "ab"},
+            }
+        )
+    events.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+    opened = []
+
+    class _CountingCache(judge.JudgeCache):
+        def __init__(self, path: Path) -> None:
+            opened.append(path)
+            super().__init__(path)
+
+    monkeypatch.setattr(judge, "JudgeCache", _CountingCache)
+    monkeypatch.setattr(agent_lightning, "JudgeCache", _CountingCache)
+
+    server = _serve()
+    try:
+        config = JudgeConfig(
+            base_url=f"http://127.0.0.1:{server.server_port}/v1",
+            cache_path=tmp_path / "judge.sqlite3",
+            backoff_s=0.01,
+        )
+        out = tmp_path / "triplets.jsonl"
+        export_agent_lightning(events, [ExportTarget("triplets", out, "judge", judge=config)])
+        assert len(out.read_text(encoding="utf-8").splitlines()) == 600
+        # 600 rows are three reward batches, all scored through one connection.
+        assert opened == [config.cache_path]
+    finally:
+        server.shutdown()
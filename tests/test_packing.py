@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+
+from openclaw_tracebridge.cli import main
+from openclaw_tracebridge.packing import bucket_dataset, pack_dataset, row_tokens
+
+
+def _write_rows(path: Path, sizes: list[int]) -> None:
+    rows = [
+        {
+            "id": f"msgpair_{i:06d}",
+            "messages": [{"role": "user", "content": "q"}, {"role": "assistant", "content": "a"}],
+            "metadata": {"input_token_estimate": size // 2, "output_token_estimate": size - size // 2},
+        }
+        for i, size in enumerate(sizes)
+    ]
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+
+def _bins(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_ffd_packs_tightly_and_streaming_stays_within_budget(tmp_path: Path) -> None:
+    src = tmp_path / "messages.jsonl"
+    sizes = [2, 5, 4, 7, 1, 3, 8, 12]
+    _write_rows(src, sizes)
+
+    out = tmp_path / "packed.jsonl"
+    summary = pack_dataset(src, out, token_budget=10)
+    # 2+5+4+7+1+3+8 = 30 fits three bins exactly; the 12-token row is oversized.
+    assert (summary.input_rows, summary.bins, summary.oversized_rows) == (8, 4, 1)
+    assert summary.padding_tokens == 0
+    bins = _bins(out)
+    assert [b["tokens"] for b in bins] == [12, 10, 10, 10]
+    for b in bins:
+        assert b["offsets"][0] == 0 and b["offsets"][-1] == b["tokens"]
+        assert [row_tokens(r) for r in b["rows"]] == [
+            hi - lo for lo, hi in zip(b["offsets"], b["offsets"][1:])
+        ]
+    ids = [f"msgpair_{i:06d}" for i in range(8)]
+    assert sorted(r["id"] for b in bins for r in b["rows"]) == ids
+
+    streamed = tmp_path / "streamed.jsonl"
+    summary = pack_dataset(src, streamed, token_budget=10, strategy="streaming", open_bins=2)
+    assert summary.input_rows == 8
+    assert all(b["tokens"] <= 10 for b in _bins(streamed) if len(b["rows"]) > 1)
+    assert sorted(r["id"] for b in _bins(streamed) for r in b["rows"]) == ids
+
+
+def test_bucket_dataset_and_cli(tmp_path: Path, capsys) -> None:
+    src = tmp_path / "messages.jsonl"
+    _write_rows(src, [100, 600, 512, 5000, 40])
+
+    counts = bucket_dataset(src, tmp_path / "buckets", edges=(512, 1024))
+    assert counts == {"le000512.jsonl": 3, "le001024.jsonl": 1, "gt001024.jsonl": 1}
+
+    out = tmp_path / "packed.jsonl.gz"
+    rc = main(["pack-dataset", "--input", str(src), "--out", str(out), "--token-budget", "1024"])
+    assert rc == 0
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["ok"] is True
+    # 5000 alone; 600 and 512 cannot share a 1024-token bin.
+    assert (payload["bins"], payload["oversized_rows"]) == (3, 1)
@@ -2,6 +2,7 @@ import json
 from pathlib import Path
 
 from openclaw_tracebridge.cli import main
+from openclaw_tracebridge.replay import _hash_to_unit, split_jsonl_for_replay
 
 
 def _write_rows(path: Path, n: int = 20) -> None:
@@ -98,3 +99,23 @@ def test_replay_manifest(tmp_path: Path) -> None:
     assert payload["schema"] == "tracebridge.replay.manifest.v0"
     assert payload["rows"] == 5
     assert len(payload["sha256"]) == 64
+
+
+def test_replay_split_sample_matches_full_sort(tmp_path: Path) -> None:
+    # Duplicate ids give tied sample scores; the bounded heap must break ties by input order
+    # and write the sample in score order, exactly like sorting every row would.
+    inp = tmp_path / "input.jsonl"
+    rows = [{"id": f"k{i % 60:03d}", "v": i} for i in range(200)]
+    inp.write_text("\n\n".join(json.dumps(r) for r in rows) + "\n", encoding="utf-8")
+
+    summary = split_jsonl_for_replay(
+        inp, tmp_path / "a.jsonl", tmp_path / "b.jsonl", sample_size=25, sample_seed=5, split_ratio=0.99
+    )
+    assert (summary.input_rows, summary.sampled_rows) == (200, 25)
+
+    ranked = sorted(range(200), key=lambda i: _hash_to_unit(f"sample:5:{rows[i]['id']}"))[:25]
+    out_a = [r["v"] for r in _load_jsonl(tmp_path / "a.jsonl")]
+    out_b = [r["v"] for r in _load_jsonl(tmp_path / "b.jsonl")]
+    assert sorted(out_a + out_b) == sorted(ranked)
+    assert out_a == [i for i in ranked if i in out_a]
+    assert out_b == [i for i in ranked if i in out_b]
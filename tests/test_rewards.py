@@ -0,0 +1,68 @@
+import json
+from pathlib import Path
+
+from openclaw_tracebridge import rewards
+from openclaw_tracebridge.exporters.agent_lightning import export_to_agent_lightning_triplets
+from openclaw_tracebridge.rewards import KeywordMatcher, RewardInput, register_reward_mode, score_rewards
+
+
+def test_keyword_matcher_agrees_with_naive_scan() -> None:
+    keywords = ["error", "err", "errno", "exception", "failed", "fail-safe", "time.out", "timeout"]
+    keywords += [f"code{i:03d}" for i in range(300)]
+    matcher = KeywordMatcher(keywords)
+    texts = [
+        "All good",
+        "ERRNO 5",
+        "the request TimeOut'd",
+        "time.out",
+        "timeXout",
+        "saw Code042 twice",
+        "code4",
+        "",
+    ]
+    for text in texts:
+        assert matcher.search(text) == any(k in text.lower() for k in keywords), text
+    assert matcher.findall("Errno 2, then an exception") == {"errno", "exception"}
+    assert not KeywordMatcher([]).search("error")
+
+
+def test_batch_scoring_and_registered_mode_in_export(tmp_path: Path) -> None:
+    batch = [
+        RewardInput("done", {"tool.result": 1}),
+        RewardInput("request FAILED", {"system.event": 2}),
+        RewardInput(""),
+    ]
+    assert score_rewards("heuristic-basic", batch) == [0.85, 0.25, 0.4]
+    assert score_rewards("heuristic-text", batch) == [0.7, 0.4, 0.5]
+    assert score_rewards("none", batch) == [None, None, None]
+
+    @register_reward_mode("test-length")
+    def _length(items):
+        return [float(len(item.output_text)) for item in items]
+
+    try:
+        events = tmp_path / "events.jsonl"
+        rows = [
+            {"run_id": "run_demo", "sequence_id": 1, "kind": "agent.input", "attrs": {"content": "q"}},
+            {"run_id": "run_demo", "sequence_id": 2, "kind": "agent.output", "attrs": {"content": "four"}},
+        ]
+        events.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+        out = tmp_path / "triplets.jsonl"
+        export_to_agent_lightning_triplets(events, out, reward_mode="test-length")
+        row = json.loads(out.read_text(encoding="utf-8"))
+        assert (row["reward"], row["metadata"]["reward_mode"]) == (4.0, "test-length")
+    finally:
+        rewards._REWARD_MODES.pop("test-length")
+
+
+def test_score_rewards_passes_options_to_the_mode() -> None:
+    @register_reward_mode("test-scaled")
+    def _scaled(items, *, scale=1.0):
+        return [scale * len(item.output_text) for item in items]
+
+    try:
+        batch = [RewardInput("ab"), RewardInput("abcd")]
+        assert score_rewards("test-scaled", batch) == [2.0, 4.0]
+        assert score_rewards("test-scaled", batch, scale=0.5) == [1.0, 2.0]
+    finally:
+        rewards._REWARD_MODES.pop("test-scaled")
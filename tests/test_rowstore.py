@@ -0,0 +1,51 @@
+import gzip
+import json
+from pathlib import Path
+
+from openclaw_tracebridge.cli import main
+from openclaw_tracebridge.exporters.agent_lightning import export_to_agent_lightning_messages
+from openclaw_tracebridge.rowstore import RowStore, offsets_path_for
+
+
+def test_convert_jsonl_to_rowstore_random_access(tmp_path: Path, capsys) -> None:
+    rows = [{"id": f"row_{i:04d}", "text": "é" * (i % 7)} for i in range(500)]
+    src = tmp_path / "rows.jsonl.gz"
+    with gzip.open(src, "wt", encoding="utf-8") as f:
+        f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows))
+    out = tmp_path / "rows.tbrows"
+    assert main(["convert-dataset", "--input", str(src), "--out", str(out)]) == 0
+    assert json.loads(capsys.readouterr().out)["rows"] == 500
+    assert offsets_path_for(out).stat().st_size == 8 + 8 * 501
+
+    with RowStore(out) as store:
+        assert len(store) == 500
+        assert store[0] == rows[0] and store[-1] == rows[-1] and store[123] == rows[123]
+        view = store.row_bytes(6)
+        assert isinstance(view, memoryview) and json.loads(bytes(view)) == rows[6]
+        view.release()
+        order = store.shuffled_indices(seed=3)
+        assert sorted(order) == list(range(500)) and list(order) != list(range(500))
+        assert [r["id"] for r in store.iter_shuffled(seed=3)] == [rows[i]["id"] for i in order]
+
+    back = tmp_path / "back.jsonl"
+    assert main(["convert-dataset", "--input", str(out), "--out", str(back)]) == 0
+    assert back.read_bytes() == gzip.decompress(src.read_bytes())
+
+
+def test_export_writes_rowstore_target(tmp_path: Path) -> None:
+    events = tmp_path / "events.jsonl"
+    rows = []
+    for run in ("run_a", "run_b"):
+        for turn in range(3):
+            for seq, kind in ((2 * turn + 1, "agent.input"), (2 * turn + 2, "agent.output")):
+                attrs = {"content": f"{kind} {turn}"}
+                rows.append({"run_id": run, "sequence_id": seq, "kind": kind, "attrs": attrs})
+    events.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+    out = tmp_path / "messages.tbrows"
+    summary = export_to_agent_lightning_messages(events, out, workers=2)
+    assert summary.rows_written == 6
+    with RowStore(out) as store:
+        assert [row["id"] for row in store] == [
+            f"msgpair_{run}_{2 * t + 1:06d}" for run in ("run_a", "run_b") for t in range(3)
+        ]
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import openclaw_tracebridge as tracebridge
+from openclaw_tracebridge.io import iter_events
+from openclaw_tracebridge.runtime_emit import TraceEmitter, bench_emit
+
+
+def test_emit_roundtrip_through_default_emitter(tmp_path: Path) -> None:
+    out = tmp_path / "events.jsonl"
+    assert tracebridge.emit("note", {"x": 1}) is False
+
+    emitter = tracebridge.configure(out, run_id="run_emit", drain_interval_s=0.01)
+    assert tracebridge.emit("agent.input", {"content": "hi"}, token_estimate=1)
+    assert tracebridge.emit("not.a.kind")
+    assert tracebridge.emit("note", {"obj": object()})
+    assert tracebridge.emit("agent.output", {"content": "hello"}, cost_usd_micros=5)
+    tracebridge.shutdown()
+
+    events = list(iter_events(out))
+    assert [(e.sequence_id, str(e.kind)) for e in events] == [(1, "agent.input"), (4, "agent.output")]
+    assert {e.run_id for e in events} == {"run_emit"}
+    assert events[1].cost_usd_micros == 5
+    stats = emitter.stats()
+    assert (stats.rejected, stats.written, stats.write_errors) == (2, 2, 0)
+
+
+def test_emitter_fixed_sampling(tmp_path: Path) -> None:
+    emitter = TraceEmitter(tmp_path / "events.jsonl", sample_every=4, adaptive_sampling=False)
+    accepted = sum(emitter.emit("heartbeat") for _ in range(100))
+    emitter.close()
+
+    stats = emitter.stats()
+    assert accepted == 25
+    assert stats.sampled_out == 75
+    assert stats.written == 25
+
+
+def test_bench_emit_reports_per_event_cost(tmp_path: Path) -> None:
+    result = bench_emit(tmp_path / "bench.jsonl", events=20_000)
+    assert result["written"] == 20_000
+    # Loose bound so shared CI runners do not flake; the documented budget is 5µs.
+    assert result["ns_per_event"] < 50_000
+
+
+def test_emitter_counts_failed_writes(tmp_path: Path) -> None:
+    blocked = tmp_path / "events.jsonl"
+    blocked.mkdir()  # opening it for append fails on every flush
+    emitter = TraceEmitter(blocked, drain_interval_s=0.01)
+    for _ in range(3):
+        assert emitter.emit("heartbeat")
+    emitter.close()
+
+    stats = emitter.stats()
+    assert (stats.written, stats.write_errors) == (0, 3)
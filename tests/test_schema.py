@@ -1,7 +1,64 @@
-from openclaw_tracebridge.schema import EventKind, TraceEvent
+import random
+from datetime import UTC, datetime, timedelta
+
+from openclaw_tracebridge.schema import (
+    EventKind,
+    MonotonicIdGenerator,
+    TraceEvent,
+    dump_event_json,
+    event_id_factory,
+    new_event_id,
+    new_run_id,
+    new_ulid_event_id,
+    ulid_lower_bound,
+    ulid_timestamp,
+)
 
 
 def test_trace_event_defaults() -> None:
     e = TraceEvent(run_id="run_x", sequence_id=1, kind=EventKind.NOTE)
     assert e.schema_version == "tracebridge.event.v1"
     assert e.event_id.startswith("ev_")
+
+
+def test_event_ids_ignore_global_random_seed() -> None:
+    random.seed(1234)
+    first = new_event_id()
+    random.seed(1234)
+    assert new_event_id() != first
+
+    random.seed(1234)
+    first = MonotonicIdGenerator().new(1_000)
+    random.seed(1234)
+    assert MonotonicIdGenerator().new(1_000) != first
+
+
+def test_dump_event_json_matches_model_dump_json() -> None:
+    ts = datetime(2026, 2, 9, 0, 0, 1, 250, tzinfo=UTC)
+    fields = {
+        "run_id": "run_x",
+        "sequence_id": 7,
+        "kind": EventKind.TOOL_RESULT,
+        "attrs": {"content": 'é   "q"', "cost": 1e-05, "tiny": 1e-07, "raw": {"n": [1, None, True]}},
+        "token_estimate": 3,
+        "cost_usd_micros": 10,
+    }
+
+    fast = dump_event_json(event_id="ev_fixed", ts=ts, **fields)
+    model = TraceEvent(event_id="ev_fixed", ts=ts, **fields).model_dump_json().encode("utf-8")
+
+    assert fast == model
+
+
+def test_ulid_ids_are_monotonic_and_time_ordered() -> None:
+    gen = MonotonicIdGenerator()
+    ids = [gen.new(1_000) for _ in range(5)] + [gen.new(999), gen.new(2_000)]
+    assert ids == sorted(ids) and len(set(ids)) == len(ids)
+    assert all(len(i) == 26 for i in ids)
+    assert ulid_timestamp(ids[0]) == datetime(1970, 1, 1, 0, 0, 1, tzinfo=UTC)
+
+    event_id = new_ulid_event_id()
+    created = ulid_timestamp(event_id)
+    assert ulid_lower_bound(created) <= event_id < ulid_lower_bound(created + timedelta(milliseconds=1))
+    assert event_id_factory("ulid")() > event_id
+    assert new_run_id(id_scheme="ulid").startswith("run_")
@@ -0,0 +1,78 @@
+import hashlib
+import json
+from pathlib import Path
+
+import pytest
+
+from openclaw_tracebridge.cli import main
+from openclaw_tracebridge.exporters.agent_lightning import ExportTarget, export_agent_lightning
+from openclaw_tracebridge.sharding import ShardSpec, load_shard_index, shard_path
+
+
+def test_export_to_byte_balanced_shards_with_index(tmp_path: Path) -> None:
+    events = tmp_path / "events.jsonl"
+    rows = []
+    for turn in range(12):
+        for seq, kind, content in (
+            (2 * turn + 1, "agent.input", "q"),
+            (2 * turn + 2, "agent.output", "a" * (10 + 40 * (turn % 3))),
+        ):
+            rows.append({"run_id": "run_s", "sequence_id": seq, "kind": kind, "attrs": {"content": content}})
+    events.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+    out = tmp_path / "messages.jsonl"
+    (summary,) = export_agent_lightning(events, [ExportTarget("messages", out, shards=ShardSpec(shards=3))])
+    assert summary.rows_written == 12
+    assert not out.exists()
+
+    shards = load_shard_index(out)
+    assert [s.path for s in shards] == [f"messages.0000{i}.jsonl" for i in range(3)]
+    assert sum(s.rows for s in shards) == 12
+    ids, longest = [], 0
+    for i, shard in enumerate(shards):
+        data = shard_path(out, i).read_bytes()
+        assert (len(data), hashlib.sha256(data).hexdigest()) == (shard.bytes, shard.sha256)
+        ids += [json.loads(line)["id"] for line in data.decode("utf-8").splitlines()]
+        longest = max(longest, *(len(line) for line in data.splitlines(keepends=True)))
+    # Least-loaded assignment keeps shards within one row of each other.
+    assert max(s.bytes for s in shards) - min(s.bytes for s in shards) <= longest
+    assert sorted(ids) == sorted(f"msgpair_run_s_{2 * t + 1:06d}" for t in range(12))
+
+
+def test_replay_split_rolling_row_shards(tmp_path: Path, capsys) -> None:
+    inp = tmp_path / "input.jsonl"
+    inp.write_text("".join(json.dumps({"id": f"row_{i:03d}"}) + "\n" for i in range(50)), encoding="utf-8")
+    out_a, out_b = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+    args = ["replay-split", "--input", str(inp), "--out-a", str(out_a), "--out-b", str(out_b)]
+    args += ["--shard-rows", "10"]
+    assert main(args) == 0
+    payload = json.loads(capsys.readouterr().out)
+
+    for out, expected in ((out_a, payload["out_a_rows"]), (out_b, payload["out_b_rows"])):
+        shards = load_shard_index(out)
+        full, rest = divmod(expected, 10)
+        assert [s.rows for s in shards] == [10] * full + ([rest] if rest else [])
+
+    with pytest.raises(SystemExit):
+        main(args + ["--shards", "2"])
+
+
+def test_reexport_removes_stale_shards_and_indexes_sidecars(tmp_path: Path) -> None:
+    events = tmp_path / "events.jsonl"
+    rows = []
+    for seq in range(1, 13):
+        kind = "agent.input" if seq % 2 else "agent.output"
+        rows.append({"run_id": "run_s", "sequence_id": seq, "kind": kind, "attrs": {"content": f"c{seq}"}})
+    events.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+    out = tmp_path / "messages.tbrows"
+    export_agent_lightning(events, [ExportTarget("messages", out, shards=ShardSpec(shards=3))])
+    assert shard_path(out, 2).exists()
+    export_agent_lightning(events, [ExportTarget("messages", out, shards=ShardSpec(shards=2))])
+
+    shards = load_shard_index(out)
+    assert [s.path for s in shards] == ["messages.00000.tbrows", "messages.00001.tbrows"]
+    assert [s.sidecars for s in shards] == [[f"{s.path}.offsets"] for s in shards]
+    listed = {name for s in shards for name in [s.path, *s.sidecars]}
+    on_disk = {p.name for p in tmp_path.glob("messages.*")} - {"messages.tbrows.shards.json"}
+    assert on_disk == listed